@@ -1,26 +1,97 @@
 # api/main.py
 from __future__ import annotations
-import os
-from typing import List, Optional, Dict, Any
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from pathlib import Path
+import hashlib, json, logging, os, shutil, tarfile, threading, time, zipfile
+from typing import List, Optional, Dict, Any, Literal
+from fastapi import FastAPI, Header, HTTPException, Query, Request, Response, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 
 import config as CFG
-from rag.embed_store import load_summaries, init_vector_store
-from rag.retriever import debug_candidates, semantic_search
-from tools.summary_tool import get_summary_by_title
-from chatbot import chat  # folosește RAG-first strict + tool
+from rag.embed_store import load_summaries, init_vector_store, catalog_fingerprint
+from rag.retriever import semantic_search, ranked_search, _norm_query
+from chatbot import chat_result, chat_result_async, routing_stats, prompt_cache_stats, canonical_salt  # RAG-first strict + tool
+from tools import reco_store
+from tools.summary_tool import list_titles
+from stt import batch as stt_batch
+from stt import jobs as stt_jobs
+from stt import whisper_pool
+from stt.audio import SAMPLE_RATE, probe_duration
+from stt.streaming import StreamingSession
+from stt.transcribe import SUPPORTED_AUDIO_TYPES
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import HTMLResponse, FileResponse
+from fastapi.responses import HTMLResponse, FileResponse, JSONResponse, PlainTextResponse, StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from infra import metrics, profiling, tracing
+from infra.clients import openai_client
+from infra.admission import AdmissionController, AdmissionRejected, PriorityClass
 
-# --- bootstrap RAG o singură dată ---
+log = logging.getLogger("smartlib.api")
+
+# --- bootstrap RAG în lifespan (nu la import): /livez răspunde imediat, /readyz după warm-up ---
 PERSIST_DIR = CFG.PERSIST_DIR
-summaries = load_summaries()
-collection = init_vector_store(summaries, persist_path=PERSIST_DIR)
+state: Dict[str, Any] = {"phase": "starting", "collection": None, "books": 0, "warmup_ms": {}, "error": None}
+
+def _warm_up() -> None:
+    """Încarcă indexul și amorsează cache-urile; reîncearcă cu backoff până reușește."""
+    delay = 2.0
+    while True:
+        steps: Dict[str, float] = {}
+
+        def step(name: str, fn):
+            t0 = time.perf_counter()
+            out = fn()
+            steps[name] = round((time.perf_counter() - t0) * 1000.0, 1)
+            return out
+
+        try:
+            state["phase"] = "loading_index"
+            summaries = step("load_summaries", load_summaries)
+            coll = step("init_vector_store", lambda: init_vector_store(summaries, persist_path=PERSIST_DIR))
+            step("index_count", coll.count)
+            state["phase"] = "priming_caches"
+            titles = step("catalog", list_titles)
+            step("reco_store", reco_store.reload)
+            salt = canonical_salt()
+            step("book_hashes", lambda: [reco_store.book_hash(t, salt) for t in titles])
+            if CFG.WARMUP_QUERY:
+                # embeddings (conexiune TLS + client) și segmentele HNSW; eșecul nu blochează readiness
+                try:
+                    step("warmup_query", lambda: semantic_search(CFG.WARMUP_QUERY, coll, top_k=1))
+                except Exception as e:
+                    log.warning("warm-up query a eșuat: %s", e)
+            if whisper_pool.preload_sizes():
+                # modelele STT offline (FWHISPER_PRELOAD): încărcate o dată, nu la prima transcriere
+                try:
+                    step("whisper", lambda: whisper_pool.warm_up(whisper_pool.preload_sizes()))
+                except Exception as e:
+                    log.warning("warm-up whisper a eșuat: %s", e)
+        except Exception as e:
+            state.update(phase="retrying", error=f"{type(e).__name__}: {e}", warmup_ms=steps)
+            log.error("warm-up eșuat (reîncerc în %.0fs): %s", delay, e)
+            time.sleep(delay)
+            delay = min(delay * 2, 60.0)
+            continue
+        state.update(phase="ready", collection=coll, books=len(summaries), warmup_ms=steps, error=None)
+        log.info("API gata: %d cărți, warm-up %s", len(summaries), steps)
+        return
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # warm-up în fundal: procesul e „viu” imediat, „gata” când indexul e încărcat
+    threading.Thread(target=_warm_up, name="warm-up", daemon=True).start()
+    yield
+    tracing.set_exporter(tracing.NullExporter())   # închide fișierul de trace-uri
+
+def _collection():
+    coll = state["collection"]
+    if coll is None:
+        raise HTTPException(status_code=503, detail="Serviciul pornește (warm-up).", headers={"Retry-After": "5"})
+    return coll
 
 # --- FastAPI ---
-app = FastAPI(title="Smart Librarian API", version="1.0")
+app = FastAPI(title="Smart Librarian API", version="1.0", lifespan=lifespan)
 
 # CORS pentru frontend (vite rulează pe 5173 de obicei)
 ALLOWED_ORIGINS = [
@@ -35,11 +106,63 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Trace-Id", "ETag", "Location"],
+)
+
+# ---- admission control: limită de concurență + coadă mărginită, /search înaintea /recommend ----
+admission = AdmissionController(
+    max_concurrent=CFG.ADMISSION_MAX_CONCURRENT,
+    max_queue=CFG.ADMISSION_MAX_QUEUE,
+    classes={
+        "cheap": PriorityClass("cheap", priority=0, max_wait_s=CFG.ADMISSION_MAX_WAIT_S_CHEAP),
+        "full": PriorityClass("full", priority=1, max_wait_s=CFG.ADMISSION_MAX_WAIT_S_FULL),
+    },
 )
+ADMISSION_ROUTES = {"/search": "cheap", "/recommend": "full"}   # restul (stats, metrics, static) nu intră în coadă
+metrics.register_collector(admission.metric_lines)
+
+@app.middleware("http")
+async def admission_control(request: Request, call_next):
+    cls = ADMISSION_ROUTES.get(request.url.path) if CFG.ADMISSION_ENABLED else None
+    if cls is None:
+        return await call_next(request)
+    try:
+        async with admission.admit(cls) as waited:
+            tracing.set_attr("queue_wait_ms", round(waited * 1000.0, 3))
+            return await call_next(request)
+    except AdmissionRejected as e:
+        tracing.set_attr("admission", e.reason)
+        return JSONResponse(
+            status_code=429,
+            content={"detail": "Serverul e ocupat, reîncearcă în curând.", "reason": e.reason},
+            headers={"Retry-After": str(e.retry_after_s)},
+        )
+
+_UNTRACED_PREFIXES = ("/metrics", "/static", "/livez", "/readyz")   # scrape-uri / fișiere statice: doar zgomot în trace-uri
+
+@app.middleware("http")
+async def trace_requests(request: Request, call_next):
+    # span rădăcină per cerere; trace id din `traceparent` (W3C) / `X-Trace-Id`, întors în `X-Trace-Id`.
+    # contextvars ajung în endpoint (și în threadpool-ul lui), deci retriever / tool / LLM devin copii.
+    if request.url.path.startswith(_UNTRACED_PREFIXES):
+        return await call_next(request)
+    trace_id, parent_id = tracing.parse_traceparent(request.headers.get("traceparent"))
+    if trace_id is None:
+        hdr = (request.headers.get("x-trace-id") or "").strip().lower()
+        trace_id = hdr if len(hdr) == 32 and all(c in "0123456789abcdef" for c in hdr) else None
+    with tracing.start_trace(
+        f"{request.method} {request.url.path}", trace_id=trace_id, parent_id=parent_id,
+    ) as sp:
+        response = await call_next(request)
+        if sp is not None:
+            sp.set_attr("status_code", response.status_code)
+            response.headers["X-Trace-Id"] = sp.trace_id
+    return response
 # ---- Schemas ----
 class RecommendReq(BaseModel):
     query: str
     top_k: int = 5
+    mode: Optional[Literal["auto", "llm", "degraded"]] = None   # None = ANSWER_MODE din config
 
 class TopItem(BaseModel):
     title: str
@@ -58,6 +181,56 @@ class RecommendResp(BaseModel):
     confidence: str                           # High / Medium / Low (euristic)
     d1: float                                 # distanța primului rezultat
     gap: float                                # d2 - d1 (∞ dacă nu există d2)
+    mode: str = "llm"                         # llm | precomputed | degraded | blocked | empty
+    model: Optional[str] = None               # modelul care a redactat răspunsul
+    usage: Dict[str, int] = {}                # tokeni (prompt / completion / total / cached)
+    timings_ms: Dict[str, float] = {}         # durate per etapă din chat_result()
+    profile: Optional[Dict[str, Any]] = None  # doar la profilare (X-Profile + X-Admin-Token)
+
+class SearchItem(BaseModel):
+    rank: int                                 # poziția în clasamentul complet (1 = cel mai apropiat)
+    title: str
+    distance: float
+    snippet: str
+    themes: List[str] = []
+
+class SearchResp(BaseModel):
+    query: str
+    offset: int
+    limit: int
+    total: int                                # rezultate în clasament (după filtre, max SEARCH_MAX_RESULTS)
+    next_offset: Optional[int] = None         # None = ultima pagină
+    items: List[SearchItem]
+    confidence: str                           # High / Medium / Low, pe clasamentul complet
+    d1: float
+    gap: float
+
+class TranscribeJobResp(BaseModel):
+    id: str
+    status: str                               # queued
+    status_url: str                           # GET pentru progres / rezultat
+
+class TranscribeSegment(BaseModel):
+    seq: int                                  # ordinea sosirii (= poziția pentru `since`)
+    start: float                              # secunde în fișierul original
+    end: float
+    text: str
+
+class TranscribeStatus(BaseModel):
+    id: str
+    status: str                               # queued | running | done | error
+    progress: float                           # 0..1
+    engine: str
+    language: str
+    duration_s: Optional[float] = None
+    segments: List[TranscribeSegment] = []    # segmente parțiale (de la `since`), în ordinea sosirii
+    segments_total: int = 0
+    text: Optional[str] = None                # textul final (status=done)
+    cached: bool = False                      # servit din cache-ul de transcrieri
+    error: Optional[str] = None
+    recommendation: Optional[RecommendResp] = None   # doar cu ?recommend=true
+    queued_ms: float
+    run_ms: Optional[float] = None
 
 # ---- Heuristici simple de încredere ----
 MAX_GOOD_DISTANCE = 1.00
@@ -76,38 +249,361 @@ def _confidence_from_pairs(pairs: list[tuple[str, float]]) -> tuple[str, float,
     return conf, d1, gap
 
 # ---- Routes ----
+def _profile_mode(flag: Optional[str], token: Optional[str]) -> Optional[str]:
+    """'1' / 'sample' / 'cprofile' -> modul de profilare; fără flag -> None; token greșit -> 403."""
+    flag = (flag or "").strip().lower()
+    if not flag or flag in {"0", "false", "no", "off"}:
+        return None
+    if not profiling.check_token(token):
+        raise HTTPException(status_code=403, detail="Profilarea necesită X-Admin-Token valid.")
+    return flag if flag in profiling.PROFILE_MODES else "sample"
+
 @app.post("/recommend", response_model=RecommendResp)
-def recommend(req: RecommendReq):
+def recommend(
+    req: RecommendReq,
+    profile: Optional[str] = Query(None, description="sample | cprofile (necesită X-Admin-Token)"),
+    x_profile: Optional[str] = Header(None),
+    x_admin_token: Optional[str] = Header(None),
+):
     q = (req.query or "").strip()
     k = max(1, min(req.top_k, 8))
+    prof_mode = _profile_mode(profile or x_profile, x_admin_token)
 
-    # 1) Top-K (titluri + distanțe)
-    pairs = list(debug_candidates(q, collection, top_k=k))
-    topk = [TopItem(title=t, distance=float(d)) for (t, d) in pairs]
-
-    # 2) Dovezi/snippete pentru top-K
-    ev_raw = semantic_search(q, collection, top_k=k) or []
-    evidence = [EvidenceItem(title=e["title"], distance=float(e["distance"]), snippet=e["snippet"]) for e in ev_raw]
+    # o singură trecere prin pipeline: Top-K, dovezi, titlu și răspuns vin din același rezultat
+    report = None
+    if prof_mode:
+        # fără coalescing: profilul trebuie să conțină execuția acestei cereri, nu așteptarea alteia
+        with profiling.profile_request(prof_mode) as report:
+            res = chat_result(q, _collection(), mode=req.mode, top_k=k, coalesce=False)
+    else:
+        with metrics.stage("recommend"):
+            res = chat_result(q, _collection(), mode=req.mode, top_k=k)
+    return _recommend_resp(res, profile=report)
 
-    # 3) Recomandarea finală (RAG-first + tool) – text markdown
-    answer_md = chat(q, collection)
+def _recommend_resp(res, profile: Optional[Dict[str, Any]] = None) -> RecommendResp:
+    pairs = res.topk
+    topk = [TopItem(title=t, distance=float(d)) for (t, d) in pairs]
+    evidence = [EvidenceItem(title=e["title"], distance=float(e["distance"]), snippet=e["snippet"]) for e in res.evidence]
 
-    # 4) Încredere RAG
+    # Încredere RAG
     confidence, d1, gap = _confidence_from_pairs(pairs)
 
-    # 5) Titlul ales (primul din Top-K; LLM-ul e doar pentru formulare)
-    title = pairs[0][0] if pairs else None
-
     return RecommendResp(
-        title=title,
-        answer_markdown=answer_md,
+        title=res.title,
+        answer_markdown=res.answer_markdown,
         topk=topk,
         evidence=evidence,
         confidence=confidence,
         d1=float(d1),
         gap=float(gap if gap != float("inf") else 1e9),
+        mode=res.mode,
+        model=res.model,
+        usage=res.usage,
+        timings_ms=res.timings,
+        profile=profile,
     )
 
+@app.get("/search", response_model=SearchResp)
+def search(
+    response: Response,
+    q: str = Query(..., min_length=1, description="întrebarea / interesul cititorului"),
+    offset: int = Query(0, ge=0),
+    limit: int = Query(10, ge=1, le=50),
+    theme: List[str] = Query([], description="filtre de teme (toate trebuie să apară), ex. ?theme=magie&theme=război"),
+    if_none_match: Optional[str] = Header(None),
+):
+    # doar retrieval (fără moderare / LLM): clasament paginat, cache-uibil de CDN
+    coll = _collection()
+    themes = sorted({t.strip().lower() for t in theme if t.strip()})
+    etag_src = "|".join([catalog_fingerprint() or "", _norm_query(q), ",".join(themes), str(offset), str(limit)])
+    etag = f'W/"{hashlib.sha1(etag_src.encode("utf-8")).hexdigest()[:20]}"'
+    cache_headers = {
+        "ETag": etag,
+        "Cache-Control": f"public, max-age={CFG.SEARCH_CACHE_MAX_AGE_S}, stale-while-revalidate={CFG.SEARCH_CACHE_MAX_AGE_S}",
+    }
+    if if_none_match and etag in {t.strip() for t in if_none_match.split(",")}:
+        return Response(status_code=304, headers=cache_headers)
+
+    ranked = ranked_search(q, coll, max_results=CFG.SEARCH_MAX_RESULTS, themes=themes)
+    page = ranked[offset:offset + limit]
+    confidence, d1, gap = _confidence_from_pairs([(it["title"], it["distance"]) for it in ranked[:2]])
+    response.headers.update(cache_headers)
+    return SearchResp(
+        query=q,
+        offset=offset,
+        limit=limit,
+        total=len(ranked),
+        next_offset=offset + limit if offset + limit < len(ranked) else None,
+        items=[
+            SearchItem(rank=offset + i + 1, title=it["title"], distance=it["distance"],
+                       snippet=it["snippet"], themes=it.get("themes", []))
+            for i, it in enumerate(page)
+        ],
+        confidence=confidence,
+        d1=float(d1) if d1 != float("inf") else 1e9,
+        gap=float(gap if gap != float("inf") else 1e9),
+    )
+
+async def _receive_upload(request: Request, name: str, max_mb: float) -> Path:
+    """Scrie corpul cererii în STT_UPLOAD_DIR/name pe bucăți; 413 peste `max_mb`, 400 dacă e gol."""
+    max_bytes = int(max_mb * 1024 * 1024)
+    too_big = HTTPException(status_code=413, detail=f"Fișier prea mare (limita {max_mb:g} MB).")
+    declared = request.headers.get("content-length", "")
+    if declared.isdigit() and int(declared) > max_bytes:
+        raise too_big
+    upload_dir = Path(CFG.STT_UPLOAD_DIR)
+    upload_dir.mkdir(parents=True, exist_ok=True)
+    path = upload_dir / name
+    try:
+        size = 0
+        with open(path, "wb") as f:
+            async for chunk in request.stream():
+                size += len(chunk)
+                if size > max_bytes:
+                    raise too_big
+                await run_in_threadpool(f.write, chunk)
+        if size == 0:
+            raise HTTPException(status_code=400, detail="Corpul cererii trebuie să conțină fișierul audio.")
+    except BaseException:
+        path.unlink(missing_ok=True)
+        raise
+    return path
+
+@app.post("/transcribe", status_code=202, response_model=TranscribeJobResp)
+async def transcribe(
+    request: Request,
+    response: Response,
+    engine: Literal["offline", "openai", "race"] = Query("offline"),
+    language: str = Query("auto", min_length=2, max_length=8, description="auto sau cod ISO (ro, en, ...)"),
+    recommend: bool = Query(False, description="transcrierea intră direct în /recommend"),
+    top_k: int = Query(5, ge=1, le=8),
+    mode: Optional[Literal["auto", "llm", "degraded"]] = Query(None),
+):
+    # corpul cererii = fișierul audio (orice format); e scris pe disc pe bucăți, nu ținut în memorie
+    if engine != "offline" and not CFG.OPENAI_API_KEY:
+        raise HTTPException(status_code=400, detail=f"engine={engine} indisponibil: lipsește OPENAI_API_KEY.")
+    if recommend:
+        _collection()   # 503 acum, nu după transcriere
+
+    job_id = stt_jobs.new_id()
+    path = await _receive_upload(request, f"{job_id}.upload", CFG.STT_UPLOAD_MAX_MB)
+    try:
+        # durata din antetul containerului, înainte de orice decodare (necunoscută -> verificată în job)
+        dur = await run_in_threadpool(probe_duration, path)
+        if dur is not None and dur > CFG.STT_MAX_SECONDS_API:
+            raise HTTPException(status_code=413, detail=f"Audio prea lung: ~{int(dur)}s (limita {CFG.STT_MAX_SECONDS_API}s).")
+    except BaseException:
+        path.unlink(missing_ok=True)
+        raise
+
+    def _recommend_then(text: str) -> Dict[str, Any]:
+        res = chat_result(text, _collection(), mode=mode, top_k=top_k)
+        return _recommend_resp(res).model_dump()
+
+    try:
+        stt_jobs.submit(
+            job_id, path, engine=engine, language=language,
+            client=openai_client() if CFG.OPENAI_API_KEY else None,   # online / fallback pentru offline „gibberish”
+            then=_recommend_then if recommend else None, trace_id=tracing.current_trace_id(),
+        )
+    except stt_jobs.JobRejected as e:
+        path.unlink(missing_ok=True)
+        raise HTTPException(status_code=429, detail="Prea multe transcrieri în așteptare.",
+                            headers={"Retry-After": str(e.retry_after_s)})
+    status_url = f"/transcribe/{job_id}"
+    response.headers["Location"] = status_url
+    return TranscribeJobResp(id=job_id, status="queued", status_url=status_url)
+
+def _archive_members(path: Path, dest: Path) -> List[tuple[str, Path]]:
+    """
+    Fișierele audio dintr-o arhivă zip / tar, dezarhivate pe disc în `dest` (nu în memorie), câte unul;
+    (nume din arhivă, cale). Limite: STT_BATCH_MAX_FILES, STT_BATCH_MAX_MB dezarhivat.
+    """
+    max_bytes = int(CFG.STT_BATCH_MAX_MB * 1024 * 1024)
+    is_audio = lambda n: n.rsplit(".", 1)[-1].lower() in SUPPORTED_AUDIO_TYPES and not n.endswith("/")
+    if zipfile.is_zipfile(path):
+        with zipfile.ZipFile(path) as z:
+            infos = [i for i in z.infolist() if is_audio(i.filename)]
+            _check_archive(len(infos), sum(i.file_size for i in infos), max_bytes)
+            return _extract_members(dest, [(i.filename, lambda i=i: z.open(i)) for i in infos], max_bytes)
+    if tarfile.is_tarfile(path):
+        with tarfile.open(path) as t:
+            infos = [m for m in t.getmembers() if m.isfile() and is_audio(m.name)]
+            _check_archive(len(infos), sum(m.size for m in infos), max_bytes)
+            return _extract_members(dest, [(m.name, lambda m=m: t.extractfile(m)) for m in infos], max_bytes)
+    raise HTTPException(status_code=415, detail="Corpul cererii trebuie să fie o arhivă .zip sau .tar(.gz).")
+
+def _extract_members(dest: Path, members: list, max_bytes: int) -> List[tuple[str, Path]]:
+    # numele din arhivă nu devin căi (../, absolute): fișierul pe disc = index + extensie
+    dest.mkdir(parents=True, exist_ok=True)
+    out, total = [], 0
+    for n, (name, open_member) in enumerate(members):
+        target = dest / f"{n:04d}.{name.rsplit('.', 1)[-1].lower()}"
+        with open_member() as src, open(target, "wb") as f:
+            shutil.copyfileobj(src, f, 1024 * 1024)
+        total += target.stat().st_size   # dimensiunea reală, nu cea declarată în antet
+        _check_archive(len(members), total, max_bytes)
+        out.append((name, target))
+    return out
+
+def _check_archive(count: int, total: int, max_bytes: int) -> None:
+    if count == 0:
+        raise HTTPException(status_code=400, detail="Arhiva nu conține fișiere audio.")
+    if count > CFG.STT_BATCH_MAX_FILES:
+        raise HTTPException(status_code=413, detail=f"Prea multe fișiere: {count} (limita {CFG.STT_BATCH_MAX_FILES}).")
+    if total > max_bytes:
+        raise HTTPException(status_code=413, detail=f"Arhiva dezarhivată depășește {CFG.STT_BATCH_MAX_MB:g} MB.")
+
+@app.post("/transcribe/batch")
+async def transcribe_batch(
+    request: Request,
+    language: str = Query("auto", min_length=2, max_length=8),
+):
+    # corpul = arhivă zip / tar cu fișiere audio; răspuns NDJSON: o linie per fișier, pe măsură ce se termină,
+    # apoi {"summary": {...}} cu debitul în secunde de audio per secundă de ceas
+    batch_id = stt_jobs.new_id()
+    path = await _receive_upload(request, f"batch-{batch_id}.archive", CFG.STT_BATCH_MAX_MB)
+    work = Path(CFG.STT_UPLOAD_DIR) / f"batch-{batch_id}"
+    try:
+        members = await run_in_threadpool(_archive_members, path, work)
+    except BaseException:
+        shutil.rmtree(work, ignore_errors=True)
+        raise
+    finally:
+        path.unlink(missing_ok=True)
+
+    mode = stt_batch.pick_mode()
+
+    def lines():
+        # fișierele dezarhivate sunt șterse la final și la deconectarea clientului (generator închis)
+        try:
+            summary = stt_batch.BatchSummary(mode)
+            for rec in stt_batch.run_batch(members, language=language, mode=mode):
+                summary.add(rec)
+                yield json.dumps(rec, ensure_ascii=False) + "\n"
+            yield json.dumps({"summary": summary.as_dict()}) + "\n"
+        finally:
+            shutil.rmtree(work, ignore_errors=True)
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+@app.get("/transcribe/{job_id}", response_model=TranscribeStatus)
+def transcribe_status(job_id: str, since: int = Query(0, ge=0, description="segmente deja primite (polling incremental)")):
+    view = stt_jobs.status(job_id, since=since)
+    if view is None:
+        raise HTTPException(status_code=404, detail="Job inexistent sau expirat.")
+    return view
+
+@app.websocket("/ws/transcribe")
+async def ws_transcribe(
+    ws: WebSocket,
+    language: str = "ro",
+    sample_rate: int = SAMPLE_RATE,
+    encoding: str = "pcm16",
+    recommend: bool = True,
+    top_k: int = 5,
+    mode: Optional[str] = None,
+    auto_end_ms: int = 0,
+):
+    # client -> cadre binare PCM mono (pcm16 / f32, little-endian) + text {"type": "end"} la final;
+    # server -> ready, partial, final (error cu "segment" = doar segmentul acela a eșuat), transcript,
+    # apoi (recommend) retrieval și recommendation
+    await ws.accept()
+    if encoding not in {"pcm16", "f32"} or not 8000 <= sample_rate <= 48000 or mode not in {None, "auto", "llm", "degraded"}:
+        await ws.send_json({"type": "error", "detail": "Parametri invalizi (encoding pcm16|f32, sample_rate 8000-48000)."})
+        await ws.close(code=1003)
+        return
+    top_k = max(1, min(top_k, 8))
+    with tracing.start_trace("WS /ws/transcribe", language=language, recommend=recommend):
+        session = StreamingSession(ws.send_json, language=language, sample_rate=sample_rate,
+                                   encoding=encoding, auto_end_ms=max(0, auto_end_ms))
+        try:
+            await ws.send_json({"type": "ready", "sample_rate": sample_rate, "encoding": encoding})
+            while True:
+                msg = await ws.receive()
+                if msg["type"] == "websocket.disconnect":
+                    await session.close()
+                    return
+                if msg.get("bytes"):
+                    if await session.feed(msg["bytes"]):
+                        break   # limită de durată / liniște lungă după vorbire (auto_end_ms)
+                elif msg.get("text"):
+                    try:
+                        cmd = json.loads(msg["text"])
+                    except ValueError:
+                        cmd = {}
+                    if isinstance(cmd, dict) and cmd.get("type") in {"end", "stop"}:
+                        break
+
+            text = await session.finish()
+            await ws.send_json({"type": "transcript", "text": text, "duration_s": round(session.duration, 2)})
+            if recommend and text:
+                coll = state["collection"]
+                if coll is None:
+                    await ws.send_json({"type": "error", "detail": "Serviciul pornește (warm-up)."})
+                else:
+                    # retrieval imediat (fără LLM): clientul vede cărțile cât timp se redactează răspunsul
+                    items = await run_in_threadpool(semantic_search, text, coll, top_k)
+                    await ws.send_json({"type": "retrieval", "items": [
+                        {"title": it["title"], "distance": float(it["distance"]), "snippet": it["snippet"]} for it in items
+                    ]})
+                    res = await chat_result_async(text, coll, mode=mode, top_k=top_k)
+                    await ws.send_json({"type": "recommendation", **_recommend_resp(res).model_dump()})
+            await ws.close()
+        except WebSocketDisconnect:
+            await session.close()
+        except Exception as e:
+            log.warning("ws/transcribe: %s", e)
+            await session.close()
+            try:
+                await ws.send_json({"type": "error", "detail": f"{type(e).__name__}: {e}"})
+                await ws.close(code=1011)
+            except Exception:
+                pass
+
+@app.get("/livez")
+def livez() -> Dict[str, Any]:
+    # procesul rulează și bucla răspunde (fără dependențe externe)
+    return {"status": "ok"}
+
+@app.get("/readyz")
+def readyz():
+    # gata de trafic: index încărcat + cache-uri amorsate
+    body = {k: state[k] for k in ("phase", "books", "warmup_ms", "error")}
+    return JSONResponse(status_code=200 if state["phase"] == "ready" else 503, content=body)
+
+@app.get("/stats/routing")
+def stats_routing() -> Dict[str, Any]:
+    # decizii de rutare + histograme de latență per model (vezi infra/model_router.py)
+    return routing_stats()
+
+@app.get("/stats/prompt-cache")
+def stats_prompt_cache() -> Dict[str, Any]:
+    # tokeni de input serviți din cache-ul providerului (usage.prompt_tokens_details.cached_tokens)
+    return prompt_cache_stats()
+
+@app.get("/admin/profiles/{profile_id}")
+def admin_profile(profile_id: str, x_admin_token: Optional[str] = Header(None)):
+    # .collapsed -> flamegraph.pl / speedscope; .pstats -> snakeviz / python -m pstats
+    if not profiling.check_token(x_admin_token):
+        raise HTTPException(status_code=403, detail="X-Admin-Token invalid.")
+    path = profiling.profile_path(profile_id)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Profil inexistent.")
+    return FileResponse(str(path), filename=path.name, media_type="application/octet-stream")
+
+@app.get("/stats/admission")
+def stats_admission() -> Dict[str, Any]:
+    # coada de admitere: în execuție, în așteptare per clasă, timp mediu de servire
+    return admission.snapshot()
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def prometheus_metrics():
+    # format text Prometheus: durate per etapă, tokeni, cost estimat, cache hit ratio, breaker-e
+    if not CFG.METRICS_ENABLED:
+        return PlainTextResponse("# metrics disabled (METRICS_ENABLED=0)\n", status_code=404)
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
 STATIC_DIR = os.path.join(os.path.dirname(__file__), "static")
 os.makedirs(STATIC_DIR, exist_ok=True)
 app.mount("/static", StaticFiles(directory=STATIC_DIR), name="static")
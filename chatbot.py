@@ -1,27 +1,57 @@
 # chatbot.py — RAG strict: titlul final = top-1 din vector store
 
-from typing import Optional, List, Tuple
-import json
-from openai import OpenAI
+from typing import Optional, List, Tuple, Dict
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+import json, threading, time
 
-from config import CHAT_MODEL, OPENAI_API_KEY, MODERATION_ENABLED
-from rag.retriever import auto_search_books, semantic_search   # <-- avem și snippete
-from tools.summary_tool import TOOL_SPEC, get_summary_by_title
+from config import (
+    CHAT_MODEL, MODERATION_ENABLED, REQUEST_DEADLINE_S,
+    ANSWER_MODE, LLM_MAX_INFLIGHT, LLM_LATENCY_BUDGET_S,
+    RECO_STORE_ENABLED, RECO_INTRO, MODEL_ROUTING_ENABLED, MODEL_TIERS,
+)
+from rag.retriever import semantic_search, _norm_query   # <-- avem și snippete
+from infra.singleflight import SingleFlight
+from infra.resilience import deadline, resilient_call, DeadlineExceeded
+from infra.model_router import ModelRouter
+from infra import metrics, tracing
+from infra.clients import openai_client
+from tools.summary_tool import TOOL_SPEC, get_summary_by_title, get_catalog_entry
+from tools import reco_store
 from safety.moderation import moderate_text, explain_categories
+from safety.prefilter import is_blocked, is_blocked_fallback
 
-client = OpenAI(api_key=OPENAI_API_KEY)
-
-FALLBACK_BAD_WORDS = {
-    "nigger","nigga","hitler","nazist","nazi","jidan","țigan","tigan",
-    "hate","ură","fuck","shit","idiot","prost","imbecil","handicapat"
-}
 
 # praguri doar pentru mesaje de “încredere”, nu influențează alegerea (care e strict top-1)
 MAX_SHOW_ITEMS = 5
 
+# Prefix static (identic între cereri) pentru prompt caching la provider:
+# instrucțiuni + formatul răspunsului. Nimic dinamic aici — titlul, snippetul și
+# întrebarea vin în ultimul mesaj user. Orice modificare invalidează cache-ul.
+# Atenție: providerul cache-uiește doar prompturi de >= PROMPT_CACHE_MIN_TOKENS; prefixul static de aici
+# (~300 tokeni cu TOOL_SPEC) e sub prag, deci cached_tokens > 0 apare doar când întregul prompt
+# (prefix + mesajul user [+ tool call și rezultat]) se repetă și trece de prag — vezi prompt_cache_stats().
+SYSTEM_PROMPT = (
+    "Ești Smart Librarian, un bibliotecar care recomandă cărți din catalogul local.\n"
+    "Titlul final a fost ales de sistem pe baza RAG și este FIXAT: îl primești în mesajul "
+    "utilizatorului ca CHOSEN_TITLE=<titlu>.\n"
+    "Pasul 1: TREBUIE să apelezi funcția get_summary_by_title cu EXACT titlul din CHOSEN_TITLE.\n"
+    "Pasul 2: după ce primești rezultatul tool-ului, generezi răspunsul final.\n"
+    "Reguli:\n"
+    "- Nu inventa titluri și nu schimba titlul decis.\n"
+    "- Nu adăuga altă carte.\n"
+    "- Răspunde în limba întrebării (implicit română).\n"
+    "Formatează răspunsul final astfel:\n"
+    "1) Recomandă cartea din CHOSEN_TITLE în 4–6 fraze (conversațional), începând cu „Îți recomand: **<titlu>**”.\n"
+    "2) Apoi o secțiune „📖 Rezumat detaliat:” cu exact textul primit de la tool.\n"
+    "3) O secțiune „🔎 Dovezi RAG (căutare semantică):” cu 1–2 fraze, folosind RAG_SNIPPET din mesajul utilizatorului.\n"
+    "Mesajul utilizatorului are forma:\n"
+    "CHOSEN_TITLE=<titlu>\nRAG_SNIPPET=<fragment>\nÎNTREBARE=<întrebarea cititorului>"
+)
+
 def _fallback_blocklist(text: str) -> bool:
-    t = (text or "").lower()
-    return any(w in t for w in FALLBACK_BAD_WORDS)
+    # regex compilat peste text normalizat (diacritice, leetspeak, litere separate); doar fără Moderation API
+    return is_blocked_fallback(text)
 
 def _blocked_message(reason: str) -> str:
     return (
@@ -47,6 +77,68 @@ def _format_topk_section(pairs: List[Tuple[str, float]], k_selected: Optional[in
         lines.append(f"{i}. **{title}** · dist: `{d:.4f}` · sim: `{sim:.4f}`")
     return "\n\n---\n🔎 Top potriviri (RAG)\n" + "\n".join(lines)
 
+@dataclass
+class ChatResult:
+    """Rezultatul structurat al lui chat_result(); consumatorii nu mai re-parsează markdown-ul."""
+    answer_markdown: str
+    title: Optional[str] = None                                 # titlul ales (top-1 RAG)
+    distance: Optional[float] = None                            # distanța top-1
+    topk: List[Tuple[str, float]] = field(default_factory=list)  # (titlu, distanță)
+    evidence: List[Dict] = field(default_factory=list)           # {title, distance, snippet}
+    model: Optional[str] = None                                 # modelul care a redactat răspunsul
+    mode: str = "llm"                                           # llm | precomputed | degraded | blocked | empty
+    usage: Dict[str, int] = field(default_factory=dict)          # prompt/completion/total/cached tokens
+    timings: Dict[str, float] = field(default_factory=dict)      # ms per etapă
+
+    @property
+    def blocked(self) -> bool:
+        return self.mode == "blocked"
+
+# contabilitate prompt caching (tokeni de input serviți din cache-ul providerului)
+_cache_lock = threading.Lock()
+_prompt_cache = {"requests": 0, "prompt_tokens": 0, "cached_tokens": 0}
+
+PROMPT_CACHE_MIN_TOKENS = 1024   # pragul providerului sub care promptul nu e cache-uit deloc
+
+def _static_prefix_tokens() -> int:
+    # estimare grosieră (~4 caractere / token), suficientă pentru comparația cu pragul
+    return len(SYSTEM_PROMPT + json.dumps(TOOL_SPEC, ensure_ascii=False)) // 4
+
+def prompt_cache_stats() -> dict:
+    with _cache_lock:
+        s = dict(_prompt_cache)
+    s["hit_ratio"] = (s["cached_tokens"] / s["prompt_tokens"]) if s["prompt_tokens"] else 0.0
+    s["static_prefix_tokens_est"] = _static_prefix_tokens()
+    s["cache_min_tokens"] = PROMPT_CACHE_MIN_TOKENS
+    return s
+
+def _add_usage(acc: Optional[Dict[str, int]], resp, model: str = CHAT_MODEL) -> None:
+    u = getattr(resp, "usage", None)
+    if u is None:
+        return
+    details = getattr(u, "prompt_tokens_details", None)
+    cached = int(getattr(details, "cached_tokens", 0) or 0) if details is not None else 0
+    prompt = int(getattr(u, "prompt_tokens", 0) or 0)
+    metrics.record_tokens(model, prompt, int(getattr(u, "completion_tokens", 0) or 0), cached)
+    with _cache_lock:
+        _prompt_cache["requests"] += 1
+        _prompt_cache["prompt_tokens"] += prompt
+        _prompt_cache["cached_tokens"] += cached
+    if acc is None:
+        return
+    for k in ("prompt_tokens", "completion_tokens", "total_tokens"):
+        acc[k] = acc.get(k, 0) + int(getattr(u, k, 0) or 0)
+    acc["cached_tokens"] = acc.get("cached_tokens", 0) + cached
+
+@contextmanager
+def _timed(res: ChatResult, stage: str):
+    t0 = time.perf_counter()
+    try:
+        with metrics.stage(stage):
+            yield
+    finally:
+        res.timings[stage] = res.timings.get(stage, 0.0) + (time.perf_counter() - t0) * 1000.0
+
 def _extract_pairs(auto_obj) -> List[Tuple[str, float]]:
     # acceptă forme variate din retriever
     if not isinstance(auto_obj, dict):
@@ -60,69 +152,343 @@ def _extract_pairs(auto_obj) -> List[Tuple[str, float]]:
             out.append((str(it["title"]), float(it["distance"])))
     return out
 
-def chat(user_query: str, collection) -> str:
-    # 0) Moderation
-    if MODERATION_ENABLED:
-        mod = moderate_text(user_query)
-        if mod.get("flagged"):
-            reason = explain_categories(mod.get("categories", {})) or "conținut interzis"
-            return _blocked_message(reason)
-        if mod.get("error") and _fallback_blocklist(user_query):
-            return _blocked_message("conținut interzis (fallback local)")
-    else:
-        if _fallback_blocklist(user_query):
-            return _blocked_message("conținut interzis")
-
-    # 1) RAG: obține Top-K și alege STRICT top-1
-    auto = auto_search_books(user_query, collection) or {}
-    pairs = _extract_pairs(auto)
+# ---- rutare între modelele permise (latență / erori / nivel) ----
+router = ModelRouter(MODEL_TIERS, default=CHAT_MODEL, enabled=MODEL_ROUTING_ENABLED)
+
+def routing_stats() -> dict:
+    return router.snapshot()
+
+def _complete(model: str, usage: Optional[Dict[str, int]] = None, **kwargs):
+    """Un apel chat.completions prin stratul de reziliență (breaker per model) + măsurători pentru router."""
+    t0 = time.perf_counter()
+    with tracing.span("llm.completion", model=model) as sp:
+        try:
+            resp = resilient_call(router.breaker_name(model), openai_client(max_retries=0).chat.completions.create, model=model, **kwargs)
+        except Exception:
+            router.record(model, time.perf_counter() - t0, ok=False)
+            raise
+        router.record(model, time.perf_counter() - t0, ok=True)
+        _add_usage(usage, resp, model)
+        u = getattr(resp, "usage", None)
+        if sp is not None and u is not None:
+            sp.set_attr("prompt_tokens", getattr(u, "prompt_tokens", None))
+            sp.set_attr("completion_tokens", getattr(u, "completion_tokens", None))
+    return resp
+
+# ---- mod degradat (fără LLM) + load shedding ----
+_llm_lock = threading.Lock()
+_llm_inflight = 0
+_mode_stats = {"llm": 0, "precomputed": 0, "degraded_requested": 0, "degraded_shed": 0, "degraded_error": 0}
+
+def _bump(key: str) -> None:
+    with _llm_lock:
+        _mode_stats[key] += 1
+
+def answer_mode_stats() -> dict:
+    with _llm_lock:
+        return {**_mode_stats, "llm_inflight": _llm_inflight}
+
+def _should_shed() -> bool:
+    """Trecem pe template dacă LLM-ul e supraîncărcat, lent (p95 peste buget) sau cu circuitul deschis."""
+    with _llm_lock:
+        if _llm_inflight >= LLM_MAX_INFLIGHT:
+            return True
+    p95 = router.fastest_healthy_p95()
+    if p95 is not None and p95 > LLM_LATENCY_BUDGET_S:
+        return True
+    return not router.any_healthy()
+
+@contextmanager
+def _llm_slot():
+    global _llm_inflight
+    with _llm_lock:
+        _llm_inflight += 1
+    try:
+        yield
+    finally:
+        with _llm_lock:
+            _llm_inflight -= 1
+
+def _render_degraded(best_title: str, summary_text: str, evidence_snip: str) -> str:
+    """Răspuns determinist construit local din catalog + snippet RAG (fără apel LLM)."""
+    entry = get_catalog_entry(best_title) or {}
+    short = (entry.get("summary") or "").strip()
+    detailed = (summary_text or entry.get("full_summary") or short).strip()
+    parts = [f"Îți recomand: **{best_title}**"]
+    if short and short != detailed:
+        parts.append(short)
+    parts.append(f"📖 Rezumat detaliat:\n{detailed}")
+    if evidence_snip:
+        parts.append(f"🔎 Dovezi RAG (căutare semantică):\n> {evidence_snip}")
+    return "\n\n".join(parts)
+
+# ---- recomandări pre-generate (store offline) ----
+# crește la orice schimbare a promptului canonic => toate intrările devin „stale” și se regenerează
+CANONICAL_PROMPT_VERSION = "v1"
+
+def canonical_salt() -> str:
+    return f"{CHAT_MODEL}|{CANONICAL_PROMPT_VERSION}"
+
+def generate_canonical_body(title: str) -> str:
+    """Corpul canonic (independent de întrebare) al recomandării pentru `title`; folosit de jobul batch."""
+    summary_text = get_summary_by_title(title)
+    resp = _complete(
+        CHAT_MODEL,
+        messages=[
+            {
+                "role": "system",
+                "content": (
+                    "Ești Smart Librarian. Scrii o recomandare generală pentru o carte, validă pentru orice cititor.\n"
+                    "Formatează răspunsul astfel:\n"
+                    "1) Recomandă cartea în 4–6 fraze (conversațional), începând cu „Îți recomand: **<titlu>**”.\n"
+                    "2) Apoi o secțiune „📖 Rezumat detaliat:” cu exact rezumatul primit.\n"
+                    "Nu adăuga altă carte."
+                ),
+            },
+            {"role": "user", "content": f"TITLU={title}\nREZUMAT={summary_text}"},
+        ],
+    )
+    return (resp.choices[0].message.content or "").strip()
+
+def _store_intro(user_query: str, title: str, usage: Optional[Dict[str, int]] = None) -> str:
+    """Opțional: o frază care leagă întrebarea de cartea aleasă (apel LLM mic, ieftin)."""
+    if RECO_INTRO != "llm" or _should_shed():
+        return ""
+    try:
+        resp = _complete(
+            router.route(tier="light")[0], usage,
+            share=0.5, hedge=True, retries=0,
+            max_tokens=80,
+            messages=[
+                {"role": "system", "content": "Scrie o singură frază scurtă, caldă, care leagă întrebarea cititorului de cartea indicată. Nu recomanda altă carte."},
+                {"role": "user", "content": f"CARTE={title}\nÎNTREBARE={(user_query or '').strip()}"},
+            ],
+        )
+        return (resp.choices[0].message.content or "").strip()
+    except Exception:
+        return ""
+
+def _render_from_store(body: str, intro: str, evidence_snip: str) -> str:
+    parts = [intro] if intro else []
+    parts.append(body)
+    if evidence_snip:
+        parts.append(f"🔎 Dovezi RAG (căutare semantică):\n> {evidence_snip}")
+    return "\n\n".join(parts)
+
+# cereri identice concurente (ex. link promo) împart un singur pipeline retrieval + LLM
+_inflight = SingleFlight("chat")
+
+def coalescing_stats() -> dict:
+    return _inflight.stats()
+
+# ---- export Prometheus (GET /metrics) pentru contoarele de mai sus ----
+def _routing_metric_lines() -> List[str]:
+    snap = router.snapshot()
+    name = f"{metrics.PREFIX}_chat_model_latency_seconds"
+    out = [f"# HELP {name} Latența apelurilor chat, per model.", f"# TYPE {name} histogram"]
+    for m, st in snap["models"].items():
+        for le, n in st["buckets"].items():
+            le_s = "+Inf" if le == float("inf") else str(le)
+            out.append(f'{name}_bucket{{model="{m}",le="{le_s}"}} {n}')
+        out.append(f'{name}_sum{{model="{m}"}} {st["sum"]}')
+        out.append(f'{name}_count{{model="{m}"}} {st["count"]}')
+    out += metrics.gauge_lines(
+        "chat_model_healthy", "1 dacă modelul e considerat sănătos de router.",
+        {(("model", m),): 1.0 if st["healthy"] else 0.0 for m, st in snap["models"].items()},
+    )
+    out += metrics.gauge_lines("chat_failovers", "Failover-uri între modele.", {(): snap["failovers"]})
+    return out
+
+metrics.register_collector(_routing_metric_lines)
+metrics.register_stats("chat_coalescing", coalescing_stats)
+metrics.register_stats("prompt_cache", prompt_cache_stats)
+metrics.register_stats("answer_mode", answer_mode_stats)
+metrics.register_stats("reco_store", reco_store.store_stats)
+
+ANSWER_MODES = ("auto", "llm", "degraded")
+
+def _resolve_mode(mode: Optional[str]) -> str:
+    mode = (mode or ANSWER_MODE).strip().lower()
+    if mode not in ANSWER_MODES:
+        raise ValueError(f"mode={mode} invalid. Alege unul din: {', '.join(ANSWER_MODES)}.")
+    return mode
+
+def _flight_key(user_query: str, collection, mode: str, top_k: int) -> tuple:
+    return (id(collection), _norm_query(user_query), mode, top_k)
+
+def chat_result(
+    user_query: str, collection, mode: Optional[str] = None, top_k: int = MAX_SHOW_ITEMS, coalesce: bool = True,
+) -> ChatResult:
+    """
+    Pipeline-ul complet (moderare -> RAG -> LLM + tool) cu rezultat structurat.
+    mode: "auto" (LLM, cu trecere automată pe template la suprasarcină/eroare),
+          "llm" (doar LLM, erorile se propagă), "degraded" (template local, fără LLM).
+    Implicit: ANSWER_MODE din config.
+    coalesce=False: rulează pipeline-ul propriu chiar dacă o cerere identică e deja în zbor (profilare).
+    """
+    mode = _resolve_mode(mode)
+    if not coalesce:
+        return _chat(user_query, collection, mode, top_k)
+    key = _flight_key(user_query, collection, mode, top_k)
+    return _inflight.do(key, _chat, user_query, collection, mode, top_k)
+
+async def chat_result_async(user_query: str, collection, mode: Optional[str] = None, top_k: int = MAX_SHOW_ITEMS) -> ChatResult:
+    mode = _resolve_mode(mode)
+    key = _flight_key(user_query, collection, mode, top_k)
+    return await _inflight.ado(key, _chat, user_query, collection, mode, top_k)
+
+def chat(user_query: str, collection, mode: Optional[str] = None) -> str:
+    """Compatibilitate: doar răspunsul markdown (vezi chat_result pentru detalii)."""
+    return chat_result(user_query, collection, mode=mode).answer_markdown
+
+async def chat_async(user_query: str, collection, mode: Optional[str] = None) -> str:
+    return (await chat_result_async(user_query, collection, mode=mode)).answer_markdown
+
+def _chat(user_query: str, collection, mode: str = "auto", top_k: int = MAX_SHOW_ITEMS) -> ChatResult:
+    # bugetul de timp al cererii; etapele primesc fracțiuni din timpul rămas
+    res = ChatResult(answer_markdown="")
+    t0 = time.perf_counter()
+    with tracing.span_or_trace("chat", mode=mode, top_k=top_k) as sp, \
+            deadline(REQUEST_DEADLINE_S), metrics.stage(f"chat_{mode}"):
+        _chat_pipeline(res, user_query, collection, mode, max(1, top_k))
+        if sp is not None:
+            sp.set_attr("answer_mode", res.mode)
+            sp.set_attr("title", res.title)
+            sp.set_attr("model", res.model)
+    res.timings["total"] = (time.perf_counter() - t0) * 1000.0
+    return res
+
+def _chat_pipeline(res: ChatResult, user_query: str, collection, mode: str, top_k: int) -> None:
+    # 0) Moderation: insultele evidente sunt blocate local, fără apel remote;
+    #    termenii ambigui ajung la Moderation API (lista locală doar dacă API-ul lipsește / eșuează)
+    with _timed(res, "moderation"):
+        if is_blocked(user_query):
+            res.mode, res.answer_markdown = "blocked", _blocked_message("conținut interzis")
+            return
+        if MODERATION_ENABLED:
+            mod = moderate_text(user_query)  # cache LRU pe textul normalizat
+            if mod.get("flagged"):
+                reason = explain_categories(mod.get("categories", {})) or "conținut interzis"
+                res.mode, res.answer_markdown = "blocked", _blocked_message(reason)
+                return
+            if mod.get("error") and _fallback_blocklist(user_query):
+                res.mode, res.answer_markdown = "blocked", _blocked_message("conținut interzis (fallback local)")
+                return
+        elif _fallback_blocklist(user_query):
+            res.mode, res.answer_markdown = "blocked", _blocked_message("conținut interzis")
+            return
+
+    # 1) RAG: o singură căutare dă Top-K, distanțele și snippetele; alegem STRICT top-1
+    with _timed(res, "retrieval"):
+        items = semantic_search(user_query, collection, top_k=max(top_k, MAX_SHOW_ITEMS)) or []
+    pairs = _extract_pairs({"candidates": items})
+    res.topk = pairs[:top_k]
+    res.evidence = [dict(e) for e in items[:top_k]]
     if not pairs:
         # fără potriviri: răspuns bland
-        return "Nu am găsit o potrivire relevantă în biblioteca curentă. Încearcă să formulezi altfel interesul (ex.: teme, gen, ton)."
+        res.mode = "empty"
+        res.answer_markdown = "Nu am găsit o potrivire relevantă în biblioteca curentă. Încearcă să formulezi altfel interesul (ex.: teme, gen, ton)."
+        return
 
     # top-1 (titlu + distanță)
     best_title, best_dist = pairs[0]
+    res.title, res.distance = best_title, best_dist
     topk_section = _format_topk_section(pairs, k_selected=min(len(pairs), MAX_SHOW_ITEMS))
 
-    # snippete pentru titlul ales (arătăm de ce îl propunem)
-    evidence_snip = ""
+    # snippetul titlului ales (arătăm de ce îl propunem)
+    evidence_snip = items[0].get("snippet", "") if items else ""
+
+    with tracing.span("tool.get_summary_by_title", title=best_title):
+        summary_text = get_summary_by_title(best_title)
+
+    # 2) Mod degradat cerut explicit
+    if mode == "degraded":
+        _bump("degraded_requested")
+        res.mode = "degraded"
+        res.answer_markdown = f"{_render_degraded(best_title, summary_text, evidence_snip)}{topk_section}"
+        return
+
+    # 3) Store offline: corpul canonic pre-generat pentru titlu (doar dacă e la zi cu catalogul)
+    if mode == "auto" and RECO_STORE_ENABLED:
+        with _timed(res, "precomputed"):
+            rec = reco_store.lookup(best_title, reco_store.book_hash(best_title, canonical_salt()))
+        if rec is not None:
+            _bump("precomputed")
+            with _timed(res, "llm_intro"):
+                intro = _store_intro(user_query, best_title, res.usage)
+            res.mode, res.model = "precomputed", rec.get("model")
+            res.answer_markdown = f"{_render_from_store(rec['body'], intro, evidence_snip)}{topk_section}"
+            return
+
+    # 4) Load shedding (coadă / latență / circuit) -> template local
+    if mode == "auto" and _should_shed():
+        _bump("degraded_shed")
+        res.mode = "degraded"
+        res.answer_markdown = f"{_render_degraded(best_title, summary_text, evidence_snip)}{topk_section}"
+        return
+
     try:
-        ev = semantic_search(user_query, collection, top_k=MAX_SHOW_ITEMS)
-        for e in ev:
-            if (e.get("title") or "").strip().lower() == best_title.strip().lower():
-                evidence_snip = e.get("snippet", "")
-                break
+        with _llm_slot():
+            text = _llm_answer(res, user_query, best_title, summary_text, evidence_snip)
+        _bump("llm")
+        res.mode = "llm"
     except Exception:
-        pass
+        if mode == "llm":
+            raise
+        _bump("degraded_error")
+        res.mode, res.model = "degraded", None
+        text = _render_degraded(best_title, summary_text, evidence_snip)
+
+    # 5) Atașăm Top-K folosit
+    res.answer_markdown = f"{text}{topk_section}"
+
+def _llm_answer(res: ChatResult, user_query: str, best_title: str, summary_text: str, evidence_snip: str) -> str:
+    # cel mai rapid model sănătos din nivelul întrebării; la eroare trecem pe următorul (failover)
+    models = router.route(user_query)
+    last_exc: Exception | None = None
+    for i, model in enumerate(models):
+        if i:
+            router.record_failover()
+        try:
+            res.model = model
+            return _llm_answer_with(res, model, user_query, best_title, summary_text, evidence_snip)
+        except DeadlineExceeded:
+            raise
+        except Exception as e:
+            last_exc = e
+    raise last_exc
 
-    # 2) Forțăm tool calling pentru titlul ales (LLM NU mai poate alege altceva)
-    system_msg = {
-        "role": "system",
+def _llm_answer_with(res: ChatResult, model: str, user_query: str, best_title: str, summary_text: str, evidence_snip: str) -> str:
+    # Forțăm tool calling pentru titlul ales (LLM NU mai poate alege altceva).
+    # Ordinea mesajelor e aleasă pentru prompt caching: prefixul static (SYSTEM_PROMPT + TOOL_SPEC)
+    # e identic byte cu byte între cereri; conținutul per cerere vine la final, într-un singur mesaj.
+    system_msg = {"role": "system", "content": SYSTEM_PROMPT}
+    user_msg = {
+        "role": "user",
         "content": (
-            "Ești Smart Librarian. Titlul final a fost ales de sistem pe baza RAG și este FIXAT.\n"
-            "TREBUIE să apelezi funcția get_summary_by_title cu EXACT acest titlu, apoi vei genera răspunsul final.\n"
-            "Nu inventa titluri și nu schimba titlul decis."
-        )
+            f"CHOSEN_TITLE={best_title}\n"
+            f"RAG_SNIPPET={evidence_snip or ''}\n"
+            f"ÎNTREBARE={(user_query or '').strip()}"
+        ),
     }
-    chosen_msg = {"role": "system", "content": f"CHOSEN_TITLE={best_title}"}
-    user_msg   = {"role": "user", "content": (user_query or "").strip()}
 
     # forțăm tool-ul explicit
-    first = client.chat.completions.create(
-        model=CHAT_MODEL,
-        messages=[system_msg, chosen_msg, user_msg],
-        tools=TOOL_SPEC,
-        tool_choice={"type": "function", "function": {"name": "get_summary_by_title"}},
-    )
+    with _timed(res, "llm_tool_call"):
+        first = _complete(
+            model, res.usage,
+            share=0.5, hedge=True,
+            messages=[system_msg, user_msg],
+            tools=TOOL_SPEC,
+            tool_choice={"type": "function", "function": {"name": "get_summary_by_title"}},
+        )
     assistant_msg = first.choices[0].message
 
-    # 3) Executăm tool-ul (cu titlul fixat)
-    summary_text = get_summary_by_title(best_title)
+    # 3) Tool-ul (cu titlul fixat) a fost executat local: summary_text
 
-    # 4) Al doilea apel — cere modelului să redacteze folosind rezumatul primit
+    # 4) Al doilea apel — extinde exact promptul primului apel (prefix comun => cache),
+    #    adăugând doar apelul de tool și rezultatul lui
     messages = [
         system_msg,
-        chosen_msg,
         user_msg,
         {
             "role": "assistant",
@@ -135,20 +501,13 @@ def chat(user_query: str, collection) -> str:
             "name": "get_summary_by_title",
             "content": summary_text
         },
-        {
-            "role": "system",
-            "content": (
-                "Formatează răspunsul astfel:\n"
-                f"1) Recomandă **{best_title}** în 4–6 fraze (conversațional).\n"
-                "2) Apoi o secțiune „📖 Rezumat detaliat:” cu exact textul primit de la tool.\n"
-                "3) O secțiune „🔎 Dovezi RAG (căutare semantică):” cu 1–2 fraze, folosind snippetul oferit mai jos.\n"
-                "Nu adăuga altă carte."
-            )
-        },
-        {"role": "system", "content": f"RAG_SNIPPET={evidence_snip or ''}"}
     ]
-    final = client.chat.completions.create(model=CHAT_MODEL, messages=messages)
-    text = final.choices[0].message.content or ""
-
-    # 5) Atașăm Top-K folosit
-    return f"{text}{topk_section}"
+    with _timed(res, "llm_final"):
+        final = _complete(
+            model, res.usage,
+            share=1.0, hedge=True,
+            messages=messages,
+            tools=TOOL_SPEC,        # aceleași tool-uri => același prefix cache-uibil
+            tool_choice="none",
+        )
+    return final.choices[0].message.content or ""
@@ -14,9 +14,13 @@ if CHAT_MODEL not in ALLOWED_CHAT_MODELS:
         f"CHAT_MODEL={CHAT_MODEL} nu este permis. Alege unul din: {sorted(ALLOWED_CHAT_MODELS)}."
     )
 
+# verificată la prima folosire (require_openai_key), nu la import: importul config rămâne fără efecte
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-if not OPENAI_API_KEY:
-    raise ValueError("OPENAI_API_KEY lipsește din .env sau din variabilele de mediu")
+
+def require_openai_key() -> str:
+    if not OPENAI_API_KEY:
+        raise ValueError("OPENAI_API_KEY lipsește din .env sau din variabilele de mediu")
+    return OPENAI_API_KEY
 
 # Embeddings ieftine + Chroma persist
 EMBED_MODEL = "text-embedding-3-small"
@@ -58,4 +62,144 @@ AUDIO_DIR = os.getenv("AUDIO_DIR", "data/tmp_audio")
 MODERATION_ENABLED = os.getenv("MODERATION_ENABLED", "1").strip().lower() not in {"0", "false", "no", "off"}
 
 # (opțional) modelul pentru Moderation API; dacă nu-l folosești direct, îl poate citi safety/moderation.py din env
-MODERATION_MODEL = os.getenv("MODERATION_MODEL", "omni-moderation-latest")
\ No newline at end of file
+MODERATION_MODEL = os.getenv("MODERATION_MODEL", "omni-moderation-latest")
+MODERATION_CACHE_SIZE = _as_int("MODERATION_CACHE_SIZE", 2048)   # LRU pe hash(text normalizat); 0 = dezactivat
+
+# Micro-batching pentru embeddings / moderare (cereri concurente -> un singur apel upstream)
+BATCHING_ENABLED = os.getenv("BATCHING_ENABLED", "1").strip().lower() not in {"0", "false", "no", "off"}
+BATCH_MAX_SIZE = _as_int("BATCH_MAX_SIZE", 16)
+BATCH_MAX_WAIT_MS = _as_float("BATCH_MAX_WAIT_MS", 5.0)
+
+# Reziliență apeluri OpenAI: deadline pe cerere, timeout, retry, hedging, circuit breaker
+REQUEST_DEADLINE_S = _as_float("REQUEST_DEADLINE_S", 30.0)
+OPENAI_TIMEOUT_S = _as_float("OPENAI_TIMEOUT_S", 20.0)
+RETRY_MAX = _as_int("RETRY_MAX", 2)
+RETRY_BASE_S = _as_float("RETRY_BASE_S", 0.25)
+RETRY_MAX_BACKOFF_S = _as_float("RETRY_MAX_BACKOFF_S", 4.0)
+HEDGE_ENABLED = os.getenv("HEDGE_ENABLED", "1").strip().lower() not in {"0", "false", "no", "off"}
+HEDGE_MIN_SAMPLES = _as_int("HEDGE_MIN_SAMPLES", 20)
+HEDGE_POOL_SIZE = _as_int("HEDGE_POOL_SIZE", 0)   # 0 = 2 × ADMISSION_MAX_CONCURRENT (primară + hedge)
+BREAKER_FAILURES = _as_int("BREAKER_FAILURES", 5)
+BREAKER_RESET_S = _as_float("BREAKER_RESET_S", 30.0)
+LATENCY_MAX_AGE_S = _as_float("LATENCY_MAX_AGE_S", 300.0)   # eșantioanele de latență mai vechi nu mai contează (p95)
+STT_TIMEOUT_S = _as_float("STT_TIMEOUT_S", 60.0)
+IMAGES_TIMEOUT_S = _as_float("IMAGES_TIMEOUT_S", 90.0)
+
+# Mod degradat (fără LLM): răspuns din template local când LLM-ul e lent / supraîncărcat / indisponibil
+LLM_MAX_INFLIGHT = _as_int("LLM_MAX_INFLIGHT", 32)          # cereri LLM simultane peste care facem load shedding
+LLM_LATENCY_BUDGET_S = _as_float("LLM_LATENCY_BUDGET_S", 8.0)  # p95 „chat” peste care trecem pe template
+ANSWER_MODE = os.getenv("ANSWER_MODE", "auto").strip().lower()  # auto | llm | degraded
+if ANSWER_MODE not in {"auto", "llm", "degraded"}:
+    raise ValueError("ANSWER_MODE trebuie să fie: auto | llm | degraded")
+
+# Recomandări pre-generate offline (scripts/precompute_recommendations.py)
+RECO_STORE_ENABLED = os.getenv("RECO_STORE_ENABLED", "1").strip().lower() not in {"0", "false", "no", "off"}
+RECO_INTRO = os.getenv("RECO_INTRO", "off").strip().lower()   # off | llm (o frază introductivă per întrebare)
+if RECO_INTRO not in {"off", "llm"}:
+    raise ValueError("RECO_INTRO trebuie să fie: off | llm")
+
+# Rutare între modelele de chat după latență / erori / nivel de calitate
+MODEL_ROUTING_ENABLED = os.getenv("MODEL_ROUTING_ENABLED", "1").strip().lower() not in {"0", "false", "no", "off"}
+
+def _as_models(env_name: str, default: list[str]) -> list[str]:
+    raw = os.getenv(env_name)
+    models = [m.strip() for m in raw.split(",") if m.strip()] if raw else list(default)
+    bad = [m for m in models if m not in ALLOWED_CHAT_MODELS]
+    if bad:
+        raise ValueError(f"{env_name}: modele nepermise {bad}. Alege din: {sorted(ALLOWED_CHAT_MODELS)}.")
+    return models
+
+# „light” = întrebări scurte, factuale („Ce este X?”); „standard” = recomandări deschise
+MODEL_TIERS = {
+    "light": _as_models("CHAT_MODELS_LIGHT", ["gpt-4.1-nano", CHAT_MODEL, "gpt-4.1-mini"]),
+    "standard": _as_models("CHAT_MODELS_STANDARD", [CHAT_MODEL, "gpt-4o-mini", "gpt-4.1-mini"]),
+}
+MODEL_TIERS = {k: list(dict.fromkeys(v)) for k, v in MODEL_TIERS.items()}  # fără dubluri, ordinea păstrată
+
+# Metrici Prometheus (GET /metrics): durate per etapă, tokeni, cost estimat, cache hit ratio
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1").strip().lower() not in {"0", "false", "no", "off"}
+UI_METRICS_PORT = _as_int("UI_METRICS_PORT", 9108)   # /metrics al procesului Streamlit (STT/TTS din UI); 0 = oprit
+
+# Profilare la cerere (header X-Profile / ?profile=..., cu X-Admin-Token); token gol = dezactivat
+PROFILE_ADMIN_TOKEN = os.getenv("PROFILE_ADMIN_TOKEN", "").strip()
+PROFILE_DIR = os.getenv("PROFILE_DIR", "data/profiles")
+PROFILE_SAMPLE_MS = _as_float("PROFILE_SAMPLE_MS", 2.0)   # intervalul sampler-ului (mode=sample)
+PROFILE_KEEP = _as_int("PROFILE_KEEP", 50)                # fișiere de profil păstrate în PROFILE_DIR (cele mai noi)
+
+# Tracing pe span-uri (scripts/trace_summary.py pentru rezumat)
+TRACING_ENABLED = os.getenv("TRACING_ENABLED", "1").strip().lower() not in {"0", "false", "no", "off"}
+TRACE_EXPORTER = os.getenv("TRACE_EXPORTER", "jsonl").strip().lower()   # jsonl | none | (înregistrat în cod)
+TRACE_DIR = os.getenv("TRACE_DIR", "data/traces")
+TRACE_SAMPLE_RATE = _as_float("TRACE_SAMPLE_RATE", 1.0)
+TRACE_FILE_MAX_MB = _as_float("TRACE_FILE_MAX_MB", 10.0)
+TRACE_FILE_BACKUPS = _as_int("TRACE_FILE_BACKUPS", 5)
+
+# Admission control în API (429 + Retry-After la suprasarcină)
+ADMISSION_ENABLED = os.getenv("ADMISSION_ENABLED", "1").strip().lower() not in {"0", "false", "no", "off"}
+ADMISSION_MAX_CONCURRENT = _as_int("ADMISSION_MAX_CONCURRENT", 16)   # cereri executate simultan
+ADMISSION_MAX_QUEUE = _as_int("ADMISSION_MAX_QUEUE", 64)             # cereri în așteptare (toate clasele)
+ADMISSION_MAX_WAIT_S_CHEAP = _as_float("ADMISSION_MAX_WAIT_S_CHEAP", 1.0)   # /search
+ADMISSION_MAX_WAIT_S_FULL = _as_float("ADMISSION_MAX_WAIT_S_FULL", 5.0)     # /recommend
+
+# Warm-up la pornirea API-ului: o interogare care amorsează embeddings + index (gol = fără)
+WARMUP_QUERY = os.getenv("WARMUP_QUERY", "o carte despre prietenie și aventură").strip()
+
+# GET /search (doar retrieval, fără LLM)
+SEARCH_MAX_RESULTS = _as_int("SEARCH_MAX_RESULTS", 50)      # adâncimea maximă a clasamentului (offset + limit)
+SEARCH_CACHE_SIZE = _as_int("SEARCH_CACHE_SIZE", 1024)      # clasamente ținute în memorie (LRU)
+SEARCH_CACHE_MAX_AGE_S = _as_int("SEARCH_CACHE_MAX_AGE_S", 300)   # Cache-Control pentru CDN / browser
+
+# STT: limite de durată + transcriere paralelă pe bucăți pentru audio lung (stt/longform.py)
+STT_MAX_SECONDS_UI = _as_int("STT_MAX_SECONDS_UI", 150)      # limita implicită din Streamlit
+STT_MAX_SECONDS_API = _as_int("STT_MAX_SECONDS_API", 3600)   # limita pentru clienții API
+STT_LONGFORM_MIN_S = _as_float("STT_LONGFORM_MIN_S", 90.0)   # peste această durată, offline lucrează pe bucăți
+STT_CHUNK_S = _as_float("STT_CHUNK_S", 30.0)                 # lungimea țintă a unei bucăți (tăiată la pauză)
+STT_CHUNK_MAX_S = _as_float("STT_CHUNK_MAX_S", 45.0)         # tăietură fixă dacă VAD nu găsește pauză
+STT_CHUNK_OVERLAP_S = _as_float("STT_CHUNK_OVERLAP_S", 1.0)  # suprapunere între bucăți (deduplicată la lipire)
+STT_LONGFORM_WORKERS = _as_int("STT_LONGFORM_WORKERS", 0)    # procese în pool; 0 = auto (nuclee / 2)
+
+# Pool-ul de modele faster-whisper (stt/whisper_pool.py)
+FWHISPER_POOL_SIZE = _as_int("FWHISPER_POOL_SIZE", 0)     # transcrieri offline simultane; 0 = auto (nuclee / 2, max 4)
+FWHISPER_CPU_THREADS = _as_int("FWHISPER_CPU_THREADS", 0) # thread-uri CTranslate2 per worker; 0 = auto
+
+# Cache de transcrieri adresat după conținut (stt/cache.py): memorie (LRU) + disc sub AUDIO_DIR
+STT_CACHE_ENABLED = os.getenv("STT_CACHE_ENABLED", "1").strip().lower() not in {"0", "false", "no", "off"}
+STT_CACHE_DIR = os.getenv("STT_CACHE_DIR", "").strip() or os.path.join(AUDIO_DIR, "stt_cache")
+STT_CACHE_MEMORY_ITEMS = _as_int("STT_CACHE_MEMORY_ITEMS", 512)
+STT_CACHE_DISK_MB = _as_float("STT_CACHE_DISK_MB", 64.0)   # dimensiunea totală pe disc peste care evacuăm (LRU)
+
+# Joburi de transcriere asincrone (POST /transcribe, GET /transcribe/{id})
+STT_UPLOAD_DIR = os.getenv("STT_UPLOAD_DIR", "").strip() or os.path.join(AUDIO_DIR, "uploads")
+STT_UPLOAD_MAX_MB = _as_float("STT_UPLOAD_MAX_MB", 50.0)   # 413 peste limită (verificat în timpul upload-ului)
+STT_JOB_WORKERS = _as_int("STT_JOB_WORKERS", 0)           # joburi transcrise simultan; 0 = FWHISPER_POOL_SIZE
+STT_JOB_MAX_PENDING = _as_int("STT_JOB_MAX_PENDING", 32)   # joburi în coadă + în lucru peste care răspundem 429
+STT_JOB_TTL_S = _as_int("STT_JOB_TTL_S", 3600)            # cât rămâne un job terminat disponibil pentru polling
+
+# STT în timp real (WebSocket /ws/transcribe): segmentare VAD incrementală + rezultate parțiale
+STT_STREAM_SILENCE_MS = _as_int("STT_STREAM_SILENCE_MS", 600)        # pauza care închide un segment
+STT_STREAM_MAX_SEGMENT_S = _as_float("STT_STREAM_MAX_SEGMENT_S", 15.0)   # segment tăiat forțat peste durata asta
+STT_STREAM_PARTIAL_MS = _as_int("STT_STREAM_PARTIAL_MS", 1000)       # audio nou între două rezultate parțiale
+
+# STT engine="race": offline + online pornit după o întârziere; câștigă primul rezultat care trece verificările
+STT_RACE_DELAY_S = _as_float("STT_RACE_DELAY_S", 1.5)          # cât primește offline singur înainte de online
+STT_RACE_MIN_WORDS = _as_int("STT_RACE_MIN_WORDS", 3)
+STT_RACE_MIN_LOGPROB = _as_float("STT_RACE_MIN_LOGPROB", -1.0)  # avg_logprob minim (doar offline)
+STT_RACE_LANGUAGES = [l.strip().lower() for l in os.getenv("STT_RACE_LANGUAGES", "ro,en").split(",") if l.strip()]
+
+# Transcriere în lot (scripts/transcribe_batch.py, POST /transcribe/batch)
+STT_BATCH_SIZE = _as_int("STT_BATCH_SIZE", 8)                     # ferestre per lot (BatchedInferencePipeline)
+STT_BATCH_DECODE_WORKERS = _as_int("STT_BATCH_DECODE_WORKERS", 0)   # thread-uri de decodare; 0 = nuclee CPU
+STT_BATCH_MAX_FILES = _as_int("STT_BATCH_MAX_FILES", 500)         # fișiere per arhivă (API)
+STT_BATCH_MAX_MB = _as_float("STT_BATCH_MAX_MB", 500.0)           # arhiva încărcată + conținutul dezarhivat (API)
+
+# Cache audio TTS adresat după conținut (tts/cache.py): hash(text, motor, voce, format, viteză) -> fișier
+TTS_CACHE_ENABLED = os.getenv("TTS_CACHE_ENABLED", "1").strip().lower() not in {"0", "false", "no", "off"}
+TTS_CACHE_DIR = os.getenv("TTS_CACHE_DIR", "").strip() or os.path.join(AUDIO_DIR, "tts_cache")
+TTS_CACHE_MB = _as_float("TTS_CACHE_MB", 200.0)   # dimensiunea totală a fișierelor audio peste care evacuăm (LRU)
+
+# TTS pe fraze (tts/synth.py): bucăți sintetizate în paralel, prima redată imediat; limita de durată
+# e aplicată textului, pe durata estimată, înainte de sinteză
+TTS_CHUNK_CHARS = _as_int("TTS_CHUNK_CHARS", 400)               # caractere per bucată (fraze întregi)
+TTS_FIRST_CHUNK_CHARS = _as_int("TTS_FIRST_CHUNK_CHARS", 160)   # prima bucată, scurtă: audio cât mai repede
+TTS_PARALLEL = _as_int("TTS_PARALLEL", 4)                       # bucăți tts-1 sintetizate simultan (per proces)
+TTS_OPENAI_CHARS_PER_S = _as_float("TTS_OPENAI_CHARS_PER_S", 14.0)   # ritmul vorbirii tts-1, pentru estimare
@@ -1,8 +1,15 @@
 # img/ai_gen.py
+from __future__ import annotations
 import base64, hashlib
 from pathlib import Path
-from typing import Tuple
-from openai import OpenAI
+from typing import TYPE_CHECKING, Tuple
+
+from config import IMAGES_TIMEOUT_S
+from infra import metrics
+from infra.resilience import resilient_call
+
+if TYPE_CHECKING:
+    from openai import OpenAI
 
 try:
     import requests  # pentru fallback pe URL
@@ -41,21 +48,27 @@ def _images_generate_any(client: OpenAI, prompt: str, size: str, quality: str |
       - fără quality (dacă dă eroare)
     """
     kwargs = dict(model="gpt-image-1", prompt=prompt, size=size)
+    if hasattr(client, "with_options"):
+        client = client.with_options(max_retries=0)
+
+    # generarea e scumpă: fără hedging, un singur retry pe erori tranzitorii
+    def _gen(**kw):
+        return resilient_call("images", client.images.generate, timeout=IMAGES_TIMEOUT_S, retries=1, **kw)
 
     # încearcă cu response_format=b64_json
     try:
         if quality:
             kwargs["quality"] = quality
-        return client.images.generate(response_format="b64_json", **kwargs)
+        return _gen(response_format="b64_json", **kwargs)
     except Exception as e1:
         # încearcă fără response_format
         try:
-            return client.images.generate(**kwargs)
+            return _gen(**kwargs)
         except Exception:
             # încearcă fără quality
             try:
                 kwargs.pop("quality", None)
-                return client.images.generate(**kwargs)
+                return _gen(**kwargs)
             except Exception as e3:
                 raise RuntimeError(f"OpenAI Images API a eșuat: {e3}") from e1
 
@@ -112,15 +125,17 @@ def _filename(kind: str, title: str, size: str) -> str:
 def _generate_image_bytes(prompt: str, client: OpenAI, size: str, quality: str | None) -> bytes:
     size = _choose_size(size)            # acceptă 512x512, 1024x1024, 1024x1536, 1536x1024
     quality = _choose_quality(quality)   # low/medium/high (dacă nu e acceptat, scoatem param)
-    try:
-        resp = _images_generate_any(client, prompt=prompt, size=size, quality=quality)
-    except Exception as e_first:
-        # fallback: dacă 512x512 nu e suportat de endpointul curent → încearcă 1024x1024
-        if size == "512x512":
-            resp = _images_generate_any(client, prompt=prompt, size="1024x1024", quality=quality)
-            size = "1024x1024"
-        else:
-            raise
+    with metrics.stage("image"):
+        try:
+            resp = _images_generate_any(client, prompt=prompt, size=size, quality=quality)
+        except Exception as e_first:
+            # fallback: dacă 512x512 nu e suportat de endpointul curent → încearcă 1024x1024
+            if size == "512x512":
+                resp = _images_generate_any(client, prompt=prompt, size="1024x1024", quality=quality)
+                size = "1024x1024"
+            else:
+                raise
+    metrics.record_cost("image", "gpt-image-1", metrics.image_cost("gpt-image-1", quality))
 
     item = _resp_first_item(resp)
     if not item:
@@ -0,0 +1,144 @@
+# infra/admission.py
+# Admission control pentru API: limită de cereri concurente + coadă de așteptare mărginită,
+# cu clase de prioritate (ex. /search ieftin înaintea /recommend complet) și timp maxim în coadă.
+# Coadă plină / așteptare expirată -> AdmissionRejected (API-ul răspunde 429 + Retry-After).
+from __future__ import annotations
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+import asyncio, heapq, itertools, math, time
+
+from infra import metrics
+
+
+class AdmissionRejected(RuntimeError):
+    """Cererea nu a fost admisă (coadă plină / timp maxim de așteptare depășit / evacuată)."""
+
+    def __init__(self, reason: str, retry_after_s: int):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after_s = retry_after_s
+
+
+@dataclass(frozen=True)
+class PriorityClass:
+    name: str
+    priority: int        # mai mic = servit mai întâi
+    max_wait_s: float    # timp maxim în coadă pentru clasa asta
+
+
+WAIT_SECONDS = metrics.histogram(
+    "admission_wait_seconds", "Timpul petrecut în coada de admitere.", ("cls",),
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+OUTCOMES = metrics.counter("admission_total", "Decizii de admitere per clasă.", ("cls", "outcome"))
+
+
+class AdmissionController:
+    """
+    Un singur controller per proces (bucla asyncio a API-ului). Sloturile eliberate sunt predate
+    direct celui mai prioritar waiter (FIFO în aceeași clasă). Cu coada plină, o cerere mai
+    prioritară evacuează waiter-ul cel mai puțin prioritar în loc să fie respinsă.
+    """
+
+    def __init__(self, max_concurrent: int, max_queue: int, classes: dict[str, PriorityClass]):
+        self.max_concurrent = max(1, max_concurrent)
+        self.max_queue = max(0, max_queue)
+        self.classes = classes
+        self._inflight = 0
+        self._waiters: list[tuple[int, int, asyncio.Future, str]] = []   # heap (prio, seq, fut, cls)
+        self._seq = itertools.count()
+        self._service_ewma = 1.0   # secunde per cerere admisă (estimare pentru Retry-After)
+
+    # ---- stare ----
+    def depth(self, cls: str | None = None) -> int:
+        return sum(1 for _, _, f, c in self._waiters if not f.done() and (cls is None or c == cls))
+
+    def retry_after(self) -> int:
+        backlog = self.depth() + self._inflight
+        return max(1, math.ceil(self._service_ewma * backlog / self.max_concurrent))
+
+    def snapshot(self) -> dict:
+        return {
+            "inflight": self._inflight,
+            "max_concurrent": self.max_concurrent,
+            "max_queue": self.max_queue,
+            "queued": {c: self.depth(c) for c in self.classes},
+            "service_ewma_s": round(self._service_ewma, 4),
+        }
+
+    # ---- coada ----
+    def _prune(self) -> None:
+        while self._waiters and self._waiters[0][2].done():
+            heapq.heappop(self._waiters)
+
+    def _evict_lowest(self, prio: int) -> bool:
+        live = [w for w in self._waiters if not w[2].done()]
+        if not live:
+            return False
+        worst = max(live, key=lambda w: (w[0], w[1]))
+        if worst[0] <= prio:
+            return False
+        worst[2].set_exception(AdmissionRejected("evicted", self.retry_after()))
+        return True
+
+    def _release(self, service_s: float) -> None:
+        self._service_ewma = 0.9 * self._service_ewma + 0.1 * service_s
+        self._prune()
+        while self._waiters:
+            _, _, fut, _ = heapq.heappop(self._waiters)
+            if not fut.done():
+                fut.set_result(True)   # slotul trece direct la waiter; _inflight rămâne același
+                return
+        self._inflight -= 1
+
+    async def _acquire(self, pc: PriorityClass) -> float:
+        t0 = time.perf_counter()
+        if self._inflight < self.max_concurrent and self.depth() == 0:
+            self._inflight += 1
+            return 0.0
+        if self.depth() >= self.max_queue and not self._evict_lowest(pc.priority):
+            raise AdmissionRejected("queue_full", self.retry_after())
+        fut = asyncio.get_running_loop().create_future()
+        entry = (pc.priority, next(self._seq), fut, pc.name)
+        heapq.heappush(self._waiters, entry)
+        try:
+            await asyncio.wait_for(asyncio.shield(fut), timeout=pc.max_wait_s)
+        except asyncio.TimeoutError:
+            if fut.done() and not fut.cancelled() and fut.exception() is None:
+                return time.perf_counter() - t0   # slotul a sosit exact la expirare: îl păstrăm
+            if not fut.done():
+                fut.cancel()
+            raise AdmissionRejected("queue_timeout", self.retry_after())
+        except asyncio.CancelledError:
+            # clientul a închis conexiunea: renunțăm la loc sau predăm slotul primit mai departe
+            if fut.done() and not fut.cancelled() and fut.exception() is None:
+                self._release(0.0)
+            else:
+                fut.cancel()
+            raise
+        return time.perf_counter() - t0
+
+    @asynccontextmanager
+    async def admit(self, cls: str):
+        """`async with controller.admit("full"): ...` — ridică AdmissionRejected dacă nu e admisă."""
+        pc = self.classes[cls]
+        try:
+            waited = await self._acquire(pc)
+        except AdmissionRejected as e:
+            OUTCOMES.inc(cls=cls, outcome=e.reason)
+            raise
+        OUTCOMES.inc(cls=cls, outcome="admitted")
+        WAIT_SECONDS.observe(waited, cls=cls)
+        t0 = time.perf_counter()
+        try:
+            yield waited
+        finally:
+            self._release(time.perf_counter() - t0)
+
+    def metric_lines(self) -> list[str]:
+        out = metrics.gauge_lines(
+            "admission_queue_depth", "Cereri în așteptare, per clasă.",
+            {(("cls", c),): self.depth(c) for c in self.classes},
+        )
+        out += metrics.gauge_lines("admission_inflight", "Cereri admise în execuție.", {(): self._inflight})
+        return out
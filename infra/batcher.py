@@ -0,0 +1,110 @@
+# infra/batcher.py
+# Micro-batching: adună cereri concurente câteva ms (sau până la N) și face un singur apel upstream.
+from __future__ import annotations
+from concurrent.futures import Future
+from contextlib import ExitStack
+from typing import Callable, Generic, List, Optional, TypeVar
+import queue, threading, time
+
+from infra import profiling
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+class MicroBatcher(Generic[T, R]):
+    """
+    `fn` primește o listă de itemi și întoarce o listă de rezultate în aceeași ordine.
+    Fiecare apelant primește un Future cu rezultatul propriului item.
+    Itemii identici (hashable) din același lot sunt trimiși o singură dată.
+    """
+
+    def __init__(
+        self,
+        fn: Callable[[List[T]], List[R]],
+        max_batch: int = 16,
+        max_wait_ms: float = 5.0,
+        name: str = "batch",
+    ):
+        self.fn = fn
+        self.max_batch = max(1, int(max_batch))
+        self.max_wait = max(0.0, float(max_wait_ms)) / 1000.0
+        self.name = name
+        self._q: "queue.Queue[tuple[T, Future, object]]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._worker: Optional[threading.Thread] = None
+        self._stats = {"items": 0, "batches": 0, "upstream_items": 0, "max_batch_seen": 0}
+
+    # ---- API publică ----
+    def submit(self, item: T) -> Future:
+        fut: Future = Future()
+        self._ensure_worker()
+        # sampler-ul cererii profilate (dacă e): lotul care conține itemul apare și în profilul ei
+        self._q.put((item, fut, profiling.current()))
+        return fut
+
+    def call(self, item: T, timeout: Optional[float] = None) -> R:
+        return self.submit(item).result(timeout=timeout)
+
+    def stats(self) -> dict:
+        with self._lock:
+            s = dict(self._stats)
+        s["avg_batch"] = (s["items"] / s["batches"]) if s["batches"] else 0.0
+        return s
+
+    # ---- worker ----
+    def _ensure_worker(self) -> None:
+        if self._worker is not None and self._worker.is_alive():
+            return
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name=f"microbatch-{self.name}", daemon=True)
+                self._worker.start()
+
+    def _collect(self) -> list[tuple[T, Future, object]]:
+        batch = [self._q.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch:
+            left = deadline - time.monotonic()
+            try:
+                batch.append(self._q.get(timeout=left) if left > 0 else self._q.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = self._collect()
+            # apelanții care au renunțat (cancel) nu mai ajung upstream
+            batch = [(it, f, s) for it, f, s in batch if f.set_running_or_notify_cancel()]
+            if not batch:
+                continue
+            uniq: list[T] = []
+            slot: list[int] = []
+            index: dict = {}
+            for it, _, _ in batch:
+                try:
+                    pos = index.setdefault(it, len(uniq))
+                except TypeError:          # item nehashable -> fără deduplicare
+                    pos = len(uniq)
+                if pos == len(uniq):
+                    uniq.append(it)
+                slot.append(pos)
+            with self._lock:
+                self._stats["items"] += len(batch)
+                self._stats["batches"] += 1
+                self._stats["upstream_items"] += len(uniq)
+                self._stats["max_batch_seen"] = max(self._stats["max_batch_seen"], len(batch))
+            try:
+                with ExitStack() as stack:
+                    for sampler in {id(s): s for _, _, s in batch if s is not None}.values():
+                        stack.enter_context(profiling.attached(sampler))
+                    results = self.fn(uniq)
+                if len(results) != len(uniq):
+                    raise RuntimeError(f"{self.name}: upstream a întors {len(results)} rezultate pentru {len(uniq)} itemi")
+            except BaseException as e:
+                for _, f, _ in batch:
+                    f.set_exception(e)
+                continue
+            for (_, f, _), pos in zip(batch, slot):
+                f.set_result(results[pos])
@@ -0,0 +1,28 @@
+# infra/clients.py
+# Clienți upstream creați leneș, la prima folosire (importul `openai` durează și nu vrem
+# efecte secundare la import). Un client per set de opțiuni, partajat în proces.
+from __future__ import annotations
+from typing import TYPE_CHECKING
+import threading
+
+import config as CFG
+
+if TYPE_CHECKING:
+    from openai import OpenAI
+
+_lock = threading.Lock()
+_clients: dict[tuple, "OpenAI"] = {}
+
+
+def openai_client(**options) -> "OpenAI":
+    """Client OpenAI partajat; ex. openai_client(max_retries=0) când retry-urile le face infra.resilience."""
+    key = tuple(sorted(options.items()))
+    c = _clients.get(key)
+    if c is not None:
+        return c
+    with _lock:
+        c = _clients.get(key)
+        if c is None:
+            from openai import OpenAI
+            c = _clients[key] = OpenAI(api_key=CFG.require_openai_key(), **options)
+    return c
@@ -0,0 +1,349 @@
+# infra/metrics.py
+# Instrumentare ușoară (fără dependențe): histograme de durată per etapă, tokeni, cost estimat,
+# cache hit ratio. Export în formatul text Prometheus (GET /metrics în api/main.py; în UI, serve()).
+# Cu METRICS_ENABLED=0, stage() întoarce un context no-op partajat (cost ~zero).
+from __future__ import annotations
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from typing import Callable, Iterable, Optional
+import threading, time
+
+import config as CFG
+from infra import tracing
+
+ENABLED = CFG.METRICS_ENABLED
+PREFIX = "smartlib"
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Prețuri estimative (USD). Tokeni: per 1M; audio: per minut; TTS: per 1M caractere; imagini: per bucată.
+PRICES_PER_1M_TOKENS = {
+    "gpt-4o-mini":            {"input": 0.15, "cached": 0.075, "output": 0.60},
+    "gpt-4.1-mini":           {"input": 0.40, "cached": 0.10,  "output": 1.60},
+    "gpt-4.1-nano":           {"input": 0.10, "cached": 0.025, "output": 0.40},
+    "text-embedding-3-small": {"input": 0.02, "cached": 0.02,  "output": 0.0},
+}
+PRICES_PER_AUDIO_MINUTE = {"gpt-4o-mini-transcribe": 0.003, "whisper-1": 0.006}
+PRICES_PER_1M_TTS_CHARS = {"tts-1": 15.0}
+PRICES_PER_IMAGE = {("gpt-image-1", "low"): 0.011, ("gpt-image-1", "medium"): 0.042, ("gpt-image-1", "high"): 0.167}
+
+
+def _fmt_labels(names: tuple[str, ...], values: tuple, extra: str = "") -> str:
+    parts = [f'{n}="{_esc(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _esc(v) -> str:
+    return str(v).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _num(v: float) -> str:
+    v = float(v)
+    if v == float("inf"):
+        return "+Inf"
+    return str(int(v)) if v.is_integer() and abs(v) < 1e15 else repr(v)
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str, labelnames: Iterable[str] = ()):
+        self.name = f"{PREFIX}_{name}"
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values: dict[tuple, object] = {}
+
+    def header(self) -> list[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = tuple(labels.get(n, "") for n in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def render(self) -> list[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return self.header() + [f"{self.name}{_fmt_labels(self.labelnames, k)} {_num(v)}" for k, v in items]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, value: float, **labels) -> None:
+        key = tuple(labels.get(n, "") for n in self.labelnames)
+        with self._lock:
+            self._values[key] = float(value)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Iterable[str] = (), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels) -> None:
+        key = tuple(labels.get(n, "") for n in self.labelnames)
+        with self._lock:
+            st = self._values.get(key)
+            if st is None:
+                st = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            for i, le in enumerate(self.buckets):
+                if value <= le:
+                    st[0][i] += 1
+                    break
+            else:
+                st[0][-1] += 1
+            st[1] += value
+            st[2] += 1
+
+    def render(self) -> list[str]:
+        with self._lock:
+            items = sorted((k, ([*v[0]], v[1], v[2])) for k, v in self._values.items())
+        out = self.header()
+        for key, (counts, total, n) in items:
+            cum = 0
+            for le, c in zip([*self.buckets, float("inf")], counts):
+                cum += c
+                le_label = 'le="' + _num(le) + '"'
+                out.append(f"{self.name}_bucket{_fmt_labels(self.labelnames, key, le_label)} {cum}")
+            out.append(f"{self.name}_sum{_fmt_labels(self.labelnames, key)} {_num(total)}")
+            out.append(f"{self.name}_count{_fmt_labels(self.labelnames, key)} {n}")
+        return out
+
+
+# ---------------- registru ----------------
+_metrics: list[_Metric] = []
+_collectors: list[Callable[[], list[str]]] = []
+_reg_lock = threading.Lock()
+
+
+def _register(m: _Metric) -> _Metric:
+    with _reg_lock:
+        _metrics.append(m)
+    return m
+
+
+def counter(name: str, help: str, labelnames: Iterable[str] = ()) -> Counter:
+    return _register(Counter(name, help, labelnames))
+
+
+def gauge(name: str, help: str, labelnames: Iterable[str] = ()) -> Gauge:
+    return _register(Gauge(name, help, labelnames))
+
+
+def histogram(name: str, help: str, labelnames: Iterable[str] = (), buckets=DEFAULT_BUCKETS) -> Histogram:
+    return _register(Histogram(name, help, labelnames, buckets))
+
+
+def register_collector(fn: Callable[[], list[str]]) -> None:
+    """`fn` întoarce linii Prometheus calculate la scrape (ex. din stats() existente)."""
+    with _reg_lock:
+        _collectors.append(fn)
+
+
+def gauge_lines(name: str, help: str, samples: dict[tuple[tuple[str, str], ...], float]) -> list[str]:
+    """Helper pentru collectori: {((label, valoare), ...): număr} -> linii gauge."""
+    full = f"{PREFIX}_{name}"
+    out = [f"# HELP {full} {help}", f"# TYPE {full} gauge"]
+    for labels, v in samples.items():
+        names = tuple(k for k, _ in labels)
+        values = tuple(val for _, val in labels)
+        out.append(f"{full}{_fmt_labels(names, values)} {_num(v if v is not None else float('nan'))}")
+    return out
+
+
+def render() -> str:
+    with _reg_lock:
+        metrics, collectors = list(_metrics), list(_collectors)
+    lines: list[str] = []
+    for m in metrics:
+        lines += m.render()
+    for fn in collectors:
+        try:
+            lines += fn()
+        except Exception:
+            continue  # un collector defect nu strică tot scrape-ul
+    return "\n".join(lines) + "\n"
+
+
+_server = None
+
+
+def serve(port: int, host: str = "0.0.0.0") -> bool:
+    """
+    Endpoint /metrics separat, pe un thread de fundal, pentru procese fără API (UI Streamlit).
+    Idempotent per proces; False dacă portul e ocupat (ex. mai multe procese pe aceeași mașină).
+    """
+    global _server
+    if _server is not None:
+        return True
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class _Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?", 1)[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):   # fără log per scrape
+            pass
+
+    with _reg_lock:
+        if _server is not None:
+            return True
+        try:
+            _server = ThreadingHTTPServer((host, int(port)), _Handler)
+        except OSError:
+            return False
+    threading.Thread(target=_server.serve_forever, name="metrics-http", daemon=True).start()
+    return True
+
+
+# ---------------- metrici standard ----------------
+STAGE_SECONDS = histogram("stage_duration_seconds", "Durata etapelor din pipeline.", ("stage",))
+STAGE_ERRORS = counter("stage_errors_total", "Etape încheiate cu excepție.", ("stage",))
+TOKENS = counter("tokens_total", "Tokeni consumați, pe model și tip (input/cached/output).", ("model", "kind"))
+COST_USD = counter("cost_usd_total", "Cost estimat (USD), pe etapă și model.", ("stage", "model"))
+CACHE_REQUESTS = counter("cache_requests_total", "Cereri către cache-uri interne (hit/miss).", ("cache", "result"))
+
+
+# captură per cerere (profilare): lista de etape a cererii curente, dacă e activă
+_capture: ContextVar[Optional[list]] = ContextVar("stage_capture", default=None)
+
+
+def _stage_cm(name: str):
+    t0 = time.perf_counter()
+    try:
+        with tracing.span(name):
+            yield
+    except BaseException:
+        if ENABLED:
+            STAGE_ERRORS.inc(stage=name)
+        raise
+    finally:
+        t1 = time.perf_counter()
+        if ENABLED:
+            STAGE_SECONDS.observe(t1 - t0, stage=name)
+        cap = _capture.get()
+        if cap is not None:
+            cap.append({"stage": name, "start": t0, "ms": (t1 - t0) * 1000.0})
+
+
+_stage_ctx = contextmanager(_stage_cm)
+_NOOP = nullcontext()
+
+
+def stage(name: str):
+    """`with stage("embedding"): ...` — histogramă de durată + contor de erori + span (dacă cererea e urmărită)."""
+    if ENABLED or _capture.get() is not None or tracing.active():
+        return _stage_ctx(name)
+    return _NOOP
+
+
+@contextmanager
+def capture_stages():
+    """Colectează etapele (stage()) parcurse în contextul curent; start relativ la intrarea în bloc (ms)."""
+    items: list = []
+    t0 = time.perf_counter()
+    token = _capture.set(items)
+    try:
+        yield items
+    finally:
+        _capture.reset(token)
+        for it in items:
+            it["start"] = round((it["start"] - t0) * 1000.0, 3)
+            it["ms"] = round(it["ms"], 3)
+        items.sort(key=lambda it: it["start"])
+
+
+def record_tokens(model: str, prompt: int = 0, completion: int = 0, cached: int = 0, stage_name: str = "chat") -> None:
+    if not ENABLED:
+        return
+    fresh = max(0, prompt - cached)
+    TOKENS.inc(fresh, model=model, kind="input")
+    if cached:
+        TOKENS.inc(cached, model=model, kind="cached")
+    if completion:
+        TOKENS.inc(completion, model=model, kind="output")
+    p = PRICES_PER_1M_TOKENS.get(model)
+    if p:
+        usd = (fresh * p["input"] + cached * p["cached"] + completion * p["output"]) / 1e6
+        COST_USD.inc(usd, stage=stage_name, model=model)
+
+
+def record_cost(stage_name: str, model: str, usd: float) -> None:
+    if ENABLED and usd:
+        COST_USD.inc(usd, stage=stage_name, model=model)
+
+
+def audio_minutes_cost(model: str, seconds: float) -> float:
+    return PRICES_PER_AUDIO_MINUTE.get(model, 0.0) * max(0.0, seconds) / 60.0
+
+
+def tts_cost(model: str, chars: int) -> float:
+    return PRICES_PER_1M_TTS_CHARS.get(model, 0.0) * max(0, chars) / 1e6
+
+
+def image_cost(model: str, quality: str | None) -> float:
+    return PRICES_PER_IMAGE.get((model, (quality or "low").lower()), 0.0)
+
+
+def record_cache(cache: str, hit: bool) -> None:
+    if ENABLED:
+        CACHE_REQUESTS.inc(cache=cache, result="hit" if hit else "miss")
+
+
+def _cache_ratio_lines() -> list[str]:
+    with CACHE_REQUESTS._lock:
+        vals = dict(CACHE_REQUESTS._values)
+    caches = sorted({k[0] for k in vals})
+    samples = {}
+    for c in caches:
+        hit, miss = vals.get((c, "hit"), 0.0), vals.get((c, "miss"), 0.0)
+        samples[(("cache", c),)] = hit / (hit + miss) if (hit + miss) else 0.0
+    return gauge_lines("cache_hit_ratio", "Fracțiunea de hit-uri per cache (de la pornire).", samples)
+
+
+register_collector(_cache_ratio_lines)
+
+
+_stats_sources: list[tuple[str, Callable[[], dict]]] = []
+
+
+def register_stats(component: str, fn: Callable[[], dict]) -> None:
+    """Exportă câmpurile numerice dintr-un `stats()` existent ca smartlib_component_stat{component, field}."""
+    with _reg_lock:
+        _stats_sources.append((component, fn))
+
+
+def _component_stat_lines() -> list[str]:
+    with _reg_lock:
+        sources = list(_stats_sources)
+    samples = {}
+    for component, fn in sources:
+        try:
+            s = fn() or {}
+        except Exception:
+            continue
+        for k, v in sorted(s.items()):
+            if isinstance(v, (int, float)) and not isinstance(v, bool):
+                samples[(("component", component), ("field", k))] = float(v)
+    return gauge_lines("component_stat", "Contoare interne ale componentelor (cache-uri, batchere, coalescing).", samples)
+
+
+register_collector(_component_stat_lines)
@@ -0,0 +1,183 @@
+# infra/model_router.py
+# Rutare între modelele de chat permise, după latență rulantă, rată de eroare și nivel de calitate.
+from __future__ import annotations
+from collections import deque
+import random, re, threading, time
+
+import config as CFG
+from infra.resilience import circuit_state
+
+# limitele (secunde) histogramelor de latență per model; ultima găleată = +Inf
+LATENCY_BUCKETS = (0.25, 0.5, 1.0, 2.0, 4.0, 8.0, 16.0)
+
+# întrebări scurte, factuale („Ce este X?”) -> nivelul „light” (nano e suficient)
+_LIGHT_RE = re.compile(
+    r"^\s*(ce\s+(este|e)|cine\s+(este|e|a\s+scris)|despre\s+ce\s+(este|e)|what\s+is|who\s+(is|wrote))\b",
+    re.IGNORECASE,
+)
+
+
+def classify_tier(query: str, max_light_words: int = 8) -> str:
+    q = (query or "").strip()
+    if _LIGHT_RE.match(q) and len(q.split()) <= max_light_words:
+        return "light"
+    return "standard"
+
+
+class _ModelStats:
+    def __init__(self, window: int):
+        # (moment, valoare): ultimele `window`, fără cele mai vechi de max_age (vezi ModelRouter._expire)
+        self.latencies: deque[tuple[float, float]] = deque(maxlen=window)
+        self.outcomes: deque[tuple[float, bool]] = deque(maxlen=window)
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.errors = 0
+
+
+class ModelRouter:
+    """
+    `route()` întoarce modelele candidate în ordinea de încercare (failover):
+    întâi cele sănătoase din nivel, sortate după p50 rulant; modelele fără eșantioane
+    sunt considerate rapide (se măsoară la prima folosire). O mică fracțiune de cereri
+    (explore) testează alt model sănătos, ca statisticile să rămână actuale.
+    Un model nesănătos din cauza ratei de eroare redevine candidat după `cooldown` secunde fără apeluri
+    (o probă); latențele și rezultatele mai vechi de `max_age` secunde nu mai contează.
+    """
+
+    def __init__(
+        self,
+        tiers: dict[str, list[str]],
+        default: str,
+        window: int = 100,
+        max_error_rate: float = 0.5,
+        explore: float = 0.05,
+        enabled: bool = True,
+        max_age: float | None = None,
+        cooldown: float | None = None,
+    ):
+        self.tiers = {k: list(v) for k, v in tiers.items()}
+        self.default = default
+        self.max_error_rate = max_error_rate
+        self.explore = explore
+        self.enabled = enabled
+        self.max_age = CFG.LATENCY_MAX_AGE_S if max_age is None else max_age
+        self.cooldown = CFG.BREAKER_RESET_S if cooldown is None else cooldown
+        models = {default, *[m for ms in self.tiers.values() for m in ms]}
+        self._stats = {m: _ModelStats(window) for m in models}
+        self._decisions: dict[tuple[str, str], int] = {}
+        self._failovers = 0
+        self._lock = threading.Lock()
+
+    # ---- sănătate / scor ----
+    @staticmethod
+    def breaker_name(model: str) -> str:
+        return f"chat:{model}"
+
+    def _expire(self, st: _ModelStats) -> None:
+        # apelat sub _lock
+        if self.max_age <= 0:
+            return
+        cutoff = time.monotonic() - self.max_age
+        for dq in (st.latencies, st.outcomes):
+            while dq and dq[0][0] < cutoff:
+                dq.popleft()
+
+    def healthy(self, model: str) -> bool:
+        # circuit_state raportează „half-open” după reset_timeout: modelul primește o probă
+        if circuit_state(self.breaker_name(model)) == "open":
+            return False
+        with self._lock:
+            st = self._stats.get(model)
+            if st is None:
+                return True
+            self._expire(st)
+            if len(st.outcomes) < 5:
+                return True
+            err = 1.0 - (sum(ok for _, ok in st.outcomes) / len(st.outcomes))
+            idle = time.monotonic() - st.outcomes[-1][0]
+        return err <= self.max_error_rate or idle >= self.cooldown
+
+    def _p(self, model: str, q: float) -> float | None:
+        with self._lock:
+            st = self._stats.get(model)
+            if st is None:
+                return None
+            self._expire(st)
+            if not st.latencies:
+                return None
+            data = sorted(v for _, v in st.latencies)
+        return data[min(len(data) - 1, int(q * len(data)))]
+
+    # ---- API publică ----
+    def route(self, query: str = "", tier: str | None = None) -> list[str]:
+        if not self.enabled:
+            return [self.default]
+        tier = tier or classify_tier(query)
+        models = self.tiers.get(tier) or [self.default]
+
+        def score(m: str) -> tuple:
+            # nemăsurat = optimist (0s), ca să fie încercat și măsurat; la egalitate, ordinea din nivel
+            p50 = self._p(m, 0.50)
+            return (p50 or 0.0, models.index(m))
+
+        healthy = sorted([m for m in models if self.healthy(m)], key=score)
+        sick = [m for m in models if m not in healthy]
+        if len(healthy) > 1 and random.random() < self.explore:
+            healthy.insert(0, healthy.pop(random.randrange(1, len(healthy))))
+        order = healthy + sick   # nesănătoase doar ca ultimă opțiune
+        with self._lock:
+            key = (tier, order[0])
+            self._decisions[key] = self._decisions.get(key, 0) + 1
+        return order
+
+    def record(self, model: str, seconds: float, ok: bool) -> None:
+        with self._lock:
+            st = self._stats.setdefault(model, _ModelStats(100))
+            now = time.monotonic()
+            st.outcomes.append((now, bool(ok)))
+            if not ok:
+                st.errors += 1
+                return
+            st.latencies.append((now, seconds))
+            st.count += 1
+            st.total += seconds
+            for i, le in enumerate(LATENCY_BUCKETS):
+                if seconds <= le:
+                    st.buckets[i] += 1
+                    break
+            else:
+                st.buckets[-1] += 1
+
+    def record_failover(self) -> None:
+        with self._lock:
+            self._failovers += 1
+
+    def fastest_healthy_p95(self, tier: str = "standard") -> float | None:
+        """p95 al celui mai rapid model sănătos din nivel (None dacă nu avem măsurători)."""
+        vals = [self._p(m, 0.95) for m in self.tiers.get(tier, []) if self.healthy(m)]
+        vals = [v for v in vals if v is not None]
+        return min(vals) if vals else None
+
+    def any_healthy(self, tier: str = "standard") -> bool:
+        return any(self.healthy(m) for m in self.tiers.get(tier, [self.default]))
+
+    def snapshot(self) -> dict:
+        models = {}
+        for m in sorted(self._stats):
+            p50, p95 = self._p(m, 0.50), self._p(m, 0.95)
+            with self._lock:
+                st = self._stats[m]
+                cum, buckets = 0, {}
+                for le, n in zip([*LATENCY_BUCKETS, float("inf")], st.buckets):
+                    cum += n
+                    buckets[le] = cum
+                models[m] = {
+                    "count": st.count, "sum": st.total, "errors": st.errors,
+                    "buckets": buckets, "p50": p50, "p95": p95,
+                }
+            models[m]["healthy"] = self.healthy(m)
+        with self._lock:
+            decisions = [{"tier": t, "model": m, "count": n} for (t, m), n in sorted(self._decisions.items())]
+            failovers = self._failovers
+        return {"models": models, "decisions": decisions, "failovers": failovers}
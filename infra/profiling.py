@@ -0,0 +1,210 @@
+# infra/profiling.py
+# Profilare la cerere pentru o singură cerere API (opt-in, protejată de token de admin).
+#   mode="sample"  -> sampler pe thread-ul cererii și pe thread-urile care lucrează pentru ea
+#                     (pool-ul upstream din infra/resilience.py, micro-batcher-ele), prin attached();
+#                     stive „collapsed” compatibile flamegraph.pl / speedscope / inferno
+#   mode="cprofile" -> profiler determinist (cProfile, doar thread-ul cererii), fișier .pstats (snakeviz, pstats)
+# Se păstrează ultimele PROFILE_KEEP fișiere.
+from __future__ import annotations
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Optional
+import cProfile, hmac, io, pstats, sys, threading, time, uuid
+
+import config as CFG
+from infra import metrics
+
+PROFILE_MODES = ("sample", "cprofile")
+
+
+def enabled() -> bool:
+    return bool(CFG.PROFILE_ADMIN_TOKEN)
+
+
+def check_token(token: Optional[str]) -> bool:
+    return enabled() and hmac.compare_digest((token or "").encode(), CFG.PROFILE_ADMIN_TOKEN.encode())
+
+
+def profile_path(profile_id: str) -> Optional[Path]:
+    """Fișierul salvat pentru `profile_id` (None dacă nu există / id invalid)."""
+    if not profile_id or not all(c.isalnum() or c in "-_" for c in profile_id):
+        return None
+    for ext in (".collapsed", ".pstats"):
+        p = Path(CFG.PROFILE_DIR) / f"{profile_id}{ext}"
+        if p.exists():
+            return p
+    return None
+
+
+# ---------------- sampler ----------------
+def _frame_label(frame) -> str:
+    # pe funcție (nu pe linie), ca stivele să se comaseze în flamegraph
+    co = frame.f_code
+    return f"{co.co_name} ({Path(co.co_filename).name}:{co.co_firstlineno})"
+
+
+class _Sampler(threading.Thread):
+    """
+    Eșantionează la interval fix stivele thread-urilor atașate cererii; stivele identice se numără.
+    Thread-ul cererii e rădăcina; celelalte apar sub „[thread-name]” ca să rămână separate în flamegraph.
+    """
+
+    def __init__(self, thread_id: int, interval_s: float):
+        super().__init__(name="profile-sampler", daemon=True)
+        self.thread_id = thread_id
+        self.interval_s = interval_s
+        self.stacks: dict[str, int] = {}
+        self.samples = 0
+        self._threads: dict[int, int] = {thread_id: 1}   # thread id -> câte atașări active
+        self._lock = threading.Lock()
+        self._stop_evt = threading.Event()
+
+    def attach(self, tid: int) -> None:
+        with self._lock:
+            self._threads[tid] = self._threads.get(tid, 0) + 1
+
+    def detach(self, tid: int) -> None:
+        with self._lock:
+            n = self._threads.get(tid, 0) - 1
+            if n > 0:
+                self._threads[tid] = n
+            else:
+                self._threads.pop(tid, None)
+
+    def run(self) -> None:
+        while not self._stop_evt.wait(self.interval_s):
+            with self._lock:
+                tids = list(self._threads)
+            frames = sys._current_frames()
+            names_by_tid = {t.ident: t.name for t in threading.enumerate()}
+            for tid in tids:
+                frame = frames.get(tid)
+                if frame is None:
+                    continue
+                names = []
+                while frame is not None:
+                    names.append(_frame_label(frame))
+                    frame = frame.f_back
+                if tid != self.thread_id:
+                    names.append(f"[{names_by_tid.get(tid, tid)}]")
+                key = ";".join(reversed(names))
+                self.stacks[key] = self.stacks.get(key, 0) + 1
+                self.samples += 1
+
+    def stop(self) -> None:
+        self._stop_evt.set()
+        self.join(timeout=1.0)
+
+
+_active: ContextVar[Optional[_Sampler]] = ContextVar("profile_sampler", default=None)
+
+
+def current() -> Optional[_Sampler]:
+    """Sampler-ul cererii profilate din contextul curent (None în afara profilării)."""
+    return _active.get()
+
+
+@contextmanager
+def attached(sampler: Optional[_Sampler] = None):
+    """
+    Thread-ul curent lucrează pentru o cerere profilată: îl includem în eșantionare cât ține blocul.
+    Fără argument, folosește sampler-ul din context (pool-uri care rulează cu copy_context()).
+    """
+    sampler = sampler if sampler is not None else _active.get()
+    if sampler is None:
+        yield
+        return
+    tid = threading.get_ident()
+    sampler.attach(tid)
+    try:
+        yield
+    finally:
+        sampler.detach(tid)
+
+
+def _prune(out_dir: Path) -> None:
+    # retenție: doar ultimele PROFILE_KEEP fișiere (după mtime)
+    keep = max(1, CFG.PROFILE_KEEP)
+    files = [p for p in out_dir.glob("*") if p.suffix in (".collapsed", ".pstats")]
+    if len(files) <= keep:
+        return
+    files.sort(key=lambda p: p.stat().st_mtime, reverse=True)
+    for p in files[keep:]:
+        try:
+            p.unlink()
+        except OSError:
+            pass
+
+
+def _top_frames_from_stacks(stacks: dict[str, int], limit: int) -> list[dict]:
+    # timp „self” = frunza stivei; procent din eșantioane
+    total = sum(stacks.values()) or 1
+    leaves: dict[str, int] = {}
+    for key, n in stacks.items():
+        leaf = key.rsplit(";", 1)[-1]
+        leaves[leaf] = leaves.get(leaf, 0) + n
+    top = sorted(leaves.items(), key=lambda kv: kv[1], reverse=True)[:limit]
+    return [{"frame": f, "samples": n, "pct": round(100.0 * n / total, 1)} for f, n in top]
+
+
+def _top_frames_from_stats(prof: cProfile.Profile, limit: int) -> list[dict]:
+    st = pstats.Stats(prof, stream=io.StringIO())
+    rows = []
+    for (fname, line, func), (_cc, ncalls, tottime, cumtime, _callers) in st.stats.items():
+        rows.append({
+            "frame": f"{func} ({Path(fname).name}:{line})",
+            "calls": ncalls,
+            "self_ms": round(tottime * 1000.0, 3),
+            "cum_ms": round(cumtime * 1000.0, 3),
+        })
+    rows.sort(key=lambda r: r["cum_ms"], reverse=True)
+    return rows[:limit]
+
+
+@contextmanager
+def profile_request(mode: str = "sample", top: int = 25):
+    """
+    Rulează blocul sub profiler și colectează etapele (metrics.stage) ale cererii.
+    Produce un dict completat la ieșire: id, mode, file, duration_ms, stages, top_frames.
+    """
+    if mode not in PROFILE_MODES:
+        raise ValueError(f"profile mode={mode} invalid. Alege unul din: {', '.join(PROFILE_MODES)}.")
+    out_dir = Path(CFG.PROFILE_DIR)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    report: dict = {"id": f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}", "mode": mode}
+
+    sampler: Optional[_Sampler] = None
+    prof: Optional[cProfile.Profile] = None
+    token = None
+    t0 = time.perf_counter()
+    with metrics.capture_stages() as stages:
+        if mode == "sample":
+            sampler = _Sampler(threading.get_ident(), CFG.PROFILE_SAMPLE_MS / 1000.0)
+            token = _active.set(sampler)
+            sampler.start()
+        else:
+            prof = cProfile.Profile()
+            prof.enable()
+        try:
+            yield report
+        finally:
+            if sampler is not None:
+                sampler.stop()
+                _active.reset(token)
+            if prof is not None:
+                prof.disable()
+    report["duration_ms"] = round((time.perf_counter() - t0) * 1000.0, 3)
+    report["stages"] = stages
+
+    if sampler is not None:
+        path = out_dir / f"{report['id']}.collapsed"
+        path.write_text("".join(f"{k} {n}\n" for k, n in sampler.stacks.items()), encoding="utf-8")
+        report["samples"] = sampler.samples
+        report["top_frames"] = _top_frames_from_stacks(sampler.stacks, top)
+    else:
+        path = out_dir / f"{report['id']}.pstats"
+        prof.dump_stats(str(path))
+        report["top_frames"] = _top_frames_from_stats(prof, top)
+    report["file"] = str(path)
+    _prune(out_dir)
@@ -0,0 +1,335 @@
+# infra/resilience.py
+# Strat comun pentru apelurile upstream (OpenAI): deadline pe cerere împărțit pe etape,
+# cerere „hedged” după p95, retry cu backoff exponențial și circuit breaker.
+from __future__ import annotations
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from contextvars import ContextVar, copy_context
+from typing import Any, Callable, Optional
+import random, threading, time
+
+import config as CFG
+from infra import metrics, profiling
+
+
+class DeadlineExceeded(TimeoutError):
+    """Bugetul de timp al cererii s-a epuizat înainte de apelul upstream."""
+
+
+class CircuitOpenError(RuntimeError):
+    """Upstream-ul e marcat nesănătos; apelul e refuzat imediat (fail fast)."""
+
+
+# ---------------- deadline pe cerere ----------------
+_deadline: ContextVar[Optional[float]] = ContextVar("request_deadline", default=None)
+
+
+@contextmanager
+def deadline(seconds: float | None):
+    """Setează un deadline absolut pentru blocul curent; cel existent, dacă e mai strict, rămâne."""
+    if not seconds or seconds <= 0:
+        yield
+        return
+    new = time.monotonic() + float(seconds)
+    cur = _deadline.get()
+    token = _deadline.set(new if cur is None else min(cur, new))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining() -> Optional[float]:
+    """Secunde rămase din deadline-ul curent (None dacă nu există deadline)."""
+    d = _deadline.get()
+    return None if d is None else d - time.monotonic()
+
+
+def stage_timeout(share: float = 1.0, default: float | None = None) -> float:
+    """
+    Timeout pentru o etapă: `share` din timpul rămas, plafonat la `default`.
+    Fără deadline activ întoarce `default` (OPENAI_TIMEOUT_S).
+    """
+    default = CFG.OPENAI_TIMEOUT_S if default is None else default
+    left = remaining()
+    if left is None:
+        return default
+    if left <= 0:
+        raise DeadlineExceeded("deadline-ul cererii a expirat")
+    return max(0.05, min(default, left * max(0.0, min(1.0, share))))
+
+
+# ---------------- latențe (p95 rulant) ----------------
+class LatencyTracker:
+    """Ultimele `window` eșantioane, dar nu mai vechi de `max_age` secunde: fără trafic nou, p95 expiră."""
+
+    def __init__(self, window: int = 200, max_age: float | None = None):
+        self._samples: deque[tuple[float, float]] = deque(maxlen=window)
+        self.max_age = CFG.LATENCY_MAX_AGE_S if max_age is None else max_age
+        self._lock = threading.Lock()
+
+    def _fresh(self) -> list[float]:
+        # apelat sub _lock
+        if self.max_age > 0:
+            cutoff = time.monotonic() - self.max_age
+            while self._samples and self._samples[0][0] < cutoff:
+                self._samples.popleft()
+        return [v for _, v in self._samples]
+
+    def add(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append((time.monotonic(), seconds))
+
+    def quantile(self, q: float) -> Optional[float]:
+        with self._lock:
+            data = sorted(self._fresh())
+        if not data:
+            return None
+        return data[min(len(data) - 1, int(q * len(data)))]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._fresh())
+
+
+# ---------------- circuit breaker ----------------
+class CircuitBreaker:
+    """closed -> open după N eșecuri consecutive; după `reset_timeout` lasă o probă (half-open)."""
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def before_call(self, name: str) -> None:
+        with self._lock:
+            if self.state == "closed":
+                return
+            if self.state == "open" and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self.state = "half-open"
+                self._probing = False
+            if self.state == "half-open" and not self._probing:
+                self._probing = True
+                return
+            raise CircuitOpenError(f"{name}: upstream indisponibil (circuit {self.state})")
+
+    def current_state(self) -> str:
+        """Starea văzută din afară: „open” devine „half-open” după reset_timeout, chiar fără apeluri,
+        ca cei care decid după stare (load shedding, rutare) să lase să treacă o probă."""
+        with self._lock:
+            if self.state == "open" and time.monotonic() - self._opened_at >= self.reset_timeout:
+                return "half-open"
+            return self.state
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.state = "closed"
+            self._failures = 0
+            self._probing = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self.state == "half-open" or self._failures >= self.failure_threshold:
+                self.state = "open"
+                self._opened_at = time.monotonic()
+            self._probing = False
+
+
+# ---------------- registru per upstream ----------------
+class _Upstream:
+    def __init__(self, name: str):
+        self.name = name
+        self.latency = LatencyTracker()
+        self.breaker = CircuitBreaker(CFG.BREAKER_FAILURES, CFG.BREAKER_RESET_S)
+        self.stats = {"calls": 0, "failures": 0, "retries": 0, "hedges": 0, "hedge_wins": 0, "rejected": 0}
+
+
+_upstreams: dict[str, _Upstream] = {}
+_reg_lock = threading.Lock()
+# primară + hedge pentru fiecare cerere admisă simultan: apelurile nu stau la coadă în executor
+# cât timp ceasul deadline-ului / p95 merge deja (HEDGE_POOL_SIZE=0 -> derivat din limita de admitere)
+POOL_SIZE = CFG.HEDGE_POOL_SIZE if CFG.HEDGE_POOL_SIZE > 0 else 2 * max(1, CFG.ADMISSION_MAX_CONCURRENT)
+_pool = ThreadPoolExecutor(max_workers=POOL_SIZE, thread_name_prefix="upstream")
+
+
+def _upstream(name: str) -> _Upstream:
+    with _reg_lock:
+        up = _upstreams.get(name)
+        if up is None:
+            up = _upstreams[name] = _Upstream(name)
+        return up
+
+
+def latency_quantile(name: str, q: float = 0.95) -> Optional[float]:
+    """Cuantila latenței observate pentru upstream-ul `name` (None fără eșantioane)."""
+    with _reg_lock:
+        up = _upstreams.get(name)
+    return None if up is None else up.latency.quantile(q)
+
+
+def circuit_state(name: str) -> str:
+    with _reg_lock:
+        up = _upstreams.get(name)
+    return "closed" if up is None else up.breaker.current_state()
+
+
+def resilience_stats() -> dict:
+    with _reg_lock:
+        ups = list(_upstreams.values())
+    out = {}
+    for up in ups:
+        out[up.name] = {
+            **up.stats,
+            "state": up.breaker.current_state(),
+            "p50": up.latency.quantile(0.50),
+            "p95": up.latency.quantile(0.95),
+        }
+    return out
+
+
+def _is_retryable(e: BaseException) -> bool:
+    if isinstance(e, (TimeoutError, ConnectionError)):
+        return True
+    if type(e).__name__ in {"APITimeoutError", "APIConnectionError", "RateLimitError", "InternalServerError"}:
+        return True
+    status = getattr(e, "status_code", None)
+    return isinstance(status, int) and (status == 429 or status >= 500)
+
+
+def _direct(fn: Callable[..., Any], args: tuple, kwargs: dict, timeout: float, pass_timeout: bool) -> Any:
+    # pe thread-urile din _pool (copy_context): apelul apare în profilul cererii, dacă e profilată
+    with profiling.attached():
+        return fn(*args, **({**kwargs, "timeout": timeout} if pass_timeout else kwargs))
+
+
+def _attempt(fn: Callable[..., Any], args: tuple, kwargs: dict, timeout: float, pass_timeout: bool) -> Any:
+    if pass_timeout:
+        return _direct(fn, args, kwargs, timeout, True)
+    # funcții fără parametru `timeout` (ex. embedding function Chroma): așteptăm din afară
+    return _pool.submit(copy_context().run, _direct, fn, args, kwargs, timeout, False).result(timeout=timeout)
+
+
+def _hedged(up: _Upstream, fn, args, kwargs, timeout: float, pass_timeout: bool) -> Any:
+    """Prima încercare; dacă depășește p95, pornește a doua și întoarce primul succes."""
+    p95 = up.latency.quantile(0.95)
+    if p95 is None or len(up.latency) < CFG.HEDGE_MIN_SAMPLES or p95 >= timeout:
+        return _attempt(fn, args, kwargs, timeout, pass_timeout)
+
+    started = time.monotonic()
+    running = threading.Event()
+
+    def primary():
+        running.set()
+        return _direct(fn, args, kwargs, timeout, pass_timeout)
+
+    first = _pool.submit(copy_context().run, primary)
+    # p95 se măsoară de la pornirea efectivă: așteptarea în executor nu declanșează hedge-uri false
+    running.wait(timeout)
+    done, _ = wait([first], timeout=max(0.0, min(p95, timeout - (time.monotonic() - started))))
+    if done:
+        return first.result()
+
+    with _reg_lock:
+        up.stats["hedges"] += 1
+    left = max(0.05, timeout - (time.monotonic() - started))
+    second = _pool.submit(copy_context().run, _direct, fn, args, kwargs, left, pass_timeout)
+    pending = {first, second}
+    last_exc: BaseException | None = None
+    while pending:
+        left = timeout - (time.monotonic() - started)
+        done, pending = wait(pending, timeout=max(0.0, left), return_when=FIRST_COMPLETED)
+        if not done:
+            raise TimeoutError(f"{up.name}: timeout după {timeout:.2f}s (hedged)")
+        for f in done:
+            if f.exception() is None:
+                if f is second:
+                    with _reg_lock:
+                        up.stats["hedge_wins"] += 1
+                return f.result()
+            last_exc = f.exception()
+    raise last_exc  # ambele încercări au eșuat
+
+
+def resilient_call(
+    name: str,
+    fn: Callable[..., Any],
+    *args,
+    share: float = 1.0,
+    timeout: float | None = None,
+    retries: int | None = None,
+    hedge: bool = False,
+    pass_timeout: bool = True,
+    **kwargs,
+) -> Any:
+    """
+    Apelează `fn(*args, **kwargs)` cu timeout derivat din deadline, retry cu backoff exponențial
+    pe erori tranzitorii, hedging opțional (doar pentru apeluri idempotente) și circuit breaker per `name`.
+    """
+    up = _upstream(name)
+    retries = CFG.RETRY_MAX if retries is None else max(0, retries)
+    hedge = hedge and CFG.HEDGE_ENABLED
+
+    for attempt in range(retries + 1):
+        try:
+            up.breaker.before_call(name)
+        except CircuitOpenError:
+            with _reg_lock:
+                up.stats["rejected"] += 1
+            raise
+        t = stage_timeout(share, timeout)
+        t0 = time.monotonic()
+        with _reg_lock:
+            up.stats["calls"] += 1
+        try:
+            if hedge:
+                result = _hedged(up, fn, args, kwargs, t, pass_timeout)
+            else:
+                result = _attempt(fn, args, kwargs, t, pass_timeout)
+        except Exception as e:
+            retryable = _is_retryable(e)
+            if retryable:
+                up.breaker.record_failure()
+            else:
+                up.breaker.record_success()  # upstream a răspuns (eroare de client, nu de sănătate)
+            with _reg_lock:
+                up.stats["failures"] += 1
+            if not retryable or attempt >= retries:
+                raise
+            backoff = min(CFG.RETRY_MAX_BACKOFF_S, CFG.RETRY_BASE_S * (2 ** attempt))
+            backoff *= random.uniform(0.5, 1.0)  # jitter
+            left = remaining()
+            if left is not None and left <= backoff:
+                raise
+            with _reg_lock:
+                up.stats["retries"] += 1
+            time.sleep(backoff)
+            continue
+        up.latency.add(time.monotonic() - t0)
+        up.breaker.record_success()
+        return result
+
+
+_STATE_CODE = {"closed": 0.0, "half-open": 1.0, "open": 2.0}
+
+
+def _metric_lines() -> list[str]:
+    stats = resilience_stats()
+    out = metrics.gauge_lines(
+        "upstream_circuit_state", "Starea circuit breaker-ului (0=closed, 1=half-open, 2=open).",
+        {(("upstream", n),): _STATE_CODE.get(s["state"], 0.0) for n, s in stats.items()},
+    )
+    for field in ("calls", "failures", "retries", "hedges", "hedge_wins", "rejected"):
+        out += metrics.gauge_lines(
+            f"upstream_{field}", f"Apeluri upstream: {field} (cumulativ).",
+            {(("upstream", n),): s.get(field, 0) for n, s in stats.items()},
+        )
+    return out
+
+
+metrics.register_collector(_metric_lines)
@@ -0,0 +1,66 @@
+# infra/singleflight.py
+# Single-flight: cererile identice concurente împart o singură execuție și primesc același rezultat.
+from __future__ import annotations
+from concurrent.futures import Future
+from typing import Any, Callable, Hashable
+import asyncio, contextvars, threading
+
+
+class SingleFlight:
+    """
+    Dedupe pe cheie pentru apeluri în zbor. Funcționează și din thread-uri (`do`)
+    și din asyncio (`ado`); ambele variante împart același registru, deci un apelant
+    async se poate atașa la un calcul pornit de un thread și invers.
+    """
+
+    def __init__(self, name: str = "singleflight"):
+        self.name = name
+        self._lock = threading.Lock()
+        self._inflight: dict[Hashable, Future] = {}
+        self._stats = {"calls": 0, "executions": 0, "coalesced": 0}
+
+    def _join_or_lead(self, key: Hashable) -> tuple[Future, bool]:
+        with self._lock:
+            self._stats["calls"] += 1
+            fut = self._inflight.get(key)
+            if fut is not None:
+                self._stats["coalesced"] += 1
+                return fut, False
+            fut = Future()
+            fut.set_running_or_notify_cancel()  # un waiter anulat nu poate anula rezultatul comun
+            self._inflight[key] = fut
+            self._stats["executions"] += 1
+            return fut, True
+
+    def _finish(self, key: Hashable, fut: Future, fn: Callable[..., Any], *args, **kwargs) -> None:
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as e:
+            with self._lock:
+                self._inflight.pop(key, None)
+            fut.set_exception(e)
+            return
+        with self._lock:
+            self._inflight.pop(key, None)
+        fut.set_result(result)
+
+    def do(self, key: Hashable, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Execută `fn` o singură dată pentru toți apelanții concurenți cu aceeași cheie."""
+        fut, leader = self._join_or_lead(key)
+        if leader:
+            self._finish(key, fut, fn, *args, **kwargs)
+        return fut.result()
+
+    async def ado(self, key: Hashable, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Varianta asyncio: `fn` (sincron, blocant) rulează în executorul implicit al buclei."""
+        fut, leader = self._join_or_lead(key)
+        if leader:
+            loop = asyncio.get_running_loop()
+            # run_in_executor nu copiază contextvars: trace-ul / deadline-ul apelantului merg explicit
+            ctx = contextvars.copy_context()
+            loop.run_in_executor(None, lambda: ctx.run(self._finish, key, fut, fn, *args, **kwargs))
+        return await asyncio.wrap_future(fut)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {**self._stats, "inflight": len(self._inflight)}
@@ -0,0 +1,194 @@
+# infra/tracing.py
+# Tracing pe span-uri (părinte/copil) cu trace id propagat prin contextvars:
+# API -> moderare -> retriever -> tool -> apeluri LLM. Fără colector extern: exporterul implicit
+# scrie câte o linie JSON per span într-un fișier rotit (data/traces/spans.jsonl).
+# Rezumat: python scripts/trace_summary.py
+from __future__ import annotations
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Callable, Optional
+import json, logging, logging.handlers, os, random, re, threading, time
+
+import config as CFG
+
+
+class Span:
+    __slots__ = ("trace_id", "span_id", "parent_id", "name", "start", "end", "attrs", "status", "error")
+
+    def __init__(self, name: str, trace_id: str, parent_id: Optional[str], attrs: dict):
+        self.trace_id = trace_id
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.name = name
+        self.start = time.time()
+        self.end: Optional[float] = None
+        self.attrs = attrs
+        self.status = "ok"
+        self.error: Optional[str] = None
+
+    def set_attr(self, key: str, value: Any) -> None:
+        self.attrs[key] = value
+
+    def to_dict(self) -> dict:
+        end = self.end if self.end is not None else time.time()
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start": round(self.start, 6),
+            "duration_ms": round((end - self.start) * 1000.0, 3),
+            "status": self.status,
+            "error": self.error,
+            "attrs": self.attrs,
+        }
+
+
+# ---------------- exportere ----------------
+class NullExporter:
+    def export(self, span: dict) -> None:
+        pass
+
+    def shutdown(self) -> None:
+        pass
+
+
+class JsonlExporter:
+    """O linie JSON per span; rotire după dimensiune (RotatingFileHandler, thread-safe)."""
+
+    def __init__(self, path: str | Path, max_bytes: int, backups: int):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self._handler = logging.handlers.RotatingFileHandler(
+            path, maxBytes=max_bytes, backupCount=backups, encoding="utf-8", delay=True,
+        )
+        self._handler.setFormatter(logging.Formatter("%(message)s"))
+        self._logger = logging.getLogger(f"smartlib.traces.{path}")
+        self._logger.propagate = False
+        self._logger.setLevel(logging.INFO)
+        self._logger.addHandler(self._handler)
+
+    def export(self, span: dict) -> None:
+        self._logger.info(json.dumps(span, ensure_ascii=False, default=str))
+
+    def shutdown(self) -> None:
+        self._logger.removeHandler(self._handler)
+        self._handler.close()
+
+
+def _jsonl_from_config() -> JsonlExporter:
+    return JsonlExporter(
+        Path(CFG.TRACE_DIR) / "spans.jsonl",
+        max_bytes=int(CFG.TRACE_FILE_MAX_MB * 1024 * 1024),
+        backups=CFG.TRACE_FILE_BACKUPS,
+    )
+
+
+EXPORTERS: dict[str, Callable[[], Any]] = {"jsonl": _jsonl_from_config, "none": NullExporter}
+
+_exporter: Any = None
+_exp_lock = threading.Lock()
+
+
+def register_exporter(name: str, factory: Callable[[], Any]) -> None:
+    """Exporter nou selectabil prin TRACE_EXPORTER=<name>; obiectul are export(dict) și shutdown()."""
+    EXPORTERS[name] = factory
+
+
+def set_exporter(exporter: Any) -> None:
+    global _exporter
+    with _exp_lock:
+        old, _exporter = _exporter, exporter
+    if old is not None and old is not exporter:
+        old.shutdown()
+
+
+def _get_exporter():
+    global _exporter
+    if _exporter is None:
+        with _exp_lock:
+            if _exporter is None:
+                factory = EXPORTERS.get(CFG.TRACE_EXPORTER)
+                if factory is None:
+                    raise ValueError(f"TRACE_EXPORTER={CFG.TRACE_EXPORTER} necunoscut. Alege din: {sorted(EXPORTERS)}.")
+                _exporter = factory()
+    return _exporter
+
+
+# ---------------- API ----------------
+_current: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+_TRACEPARENT_RE = re.compile(r"^[0-9a-f]{2}-([0-9a-f]{32})-([0-9a-f]{16})-[0-9a-f]{2}$")
+
+
+def active() -> bool:
+    """True dacă cererea curentă e urmărită (există un span deschis)."""
+    return _current.get() is not None
+
+
+def current_trace_id() -> Optional[str]:
+    sp = _current.get()
+    return sp.trace_id if sp is not None else None
+
+
+def set_attr(key: str, value: Any) -> None:
+    sp = _current.get()
+    if sp is not None:
+        sp.set_attr(key, value)
+
+
+def parse_traceparent(header: Optional[str]) -> tuple[Optional[str], Optional[str]]:
+    """W3C traceparent -> (trace_id, parent_span_id); invalid -> (None, None)."""
+    m = _TRACEPARENT_RE.match((header or "").strip().lower())
+    return (m.group(1), m.group(2)) if m else (None, None)
+
+
+@contextmanager
+def _open(name: str, trace_id: str, parent_id: Optional[str], attrs: dict):
+    sp = Span(name, trace_id, parent_id, attrs)
+    token = _current.set(sp)
+    try:
+        yield sp
+    except BaseException as e:
+        sp.status = "error"
+        sp.error = f"{type(e).__name__}: {e}"[:300]
+        raise
+    finally:
+        sp.end = time.time()
+        _current.reset(token)
+        try:
+            _get_exporter().export(sp.to_dict())
+        except Exception:
+            pass  # tracing-ul nu strică niciodată cererea
+
+
+@contextmanager
+def start_trace(name: str, trace_id: Optional[str] = None, parent_id: Optional[str] = None, **attrs):
+    """
+    Span rădăcină pentru o cerere. Cu un trace_id primit (ex. din traceparent) cererea e urmărită mereu;
+    altfel se aplică TRACE_SAMPLE_RATE. Neeșantionat / dezactivat -> yield None (span-urile copil devin no-op).
+    """
+    sampled = CFG.TRACING_ENABLED and (trace_id is not None or random.random() < CFG.TRACE_SAMPLE_RATE)
+    if not sampled:
+        yield None
+        return
+    with _open(name, trace_id or os.urandom(16).hex(), parent_id, attrs) as sp:
+        yield sp
+
+
+@contextmanager
+def span(name: str, **attrs):
+    """Span copil al span-ului curent; fără trace activ nu face nimic (yield None)."""
+    parent = _current.get()
+    if parent is None:
+        yield None
+        return
+    with _open(name, parent.trace_id, parent.span_id, attrs) as sp:
+        yield sp
+
+
+def span_or_trace(name: str, **attrs):
+    """Copil al trace-ului curent sau, dacă nu există (ex. apel direct din UI), un trace nou."""
+    return span(name, **attrs) if active() else start_trace(name, **attrs)
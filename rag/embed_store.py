@@ -2,12 +2,17 @@
 from __future__ import annotations
 from pathlib import Path
 import re, unicodedata, json, yaml
-import chromadb
-from chromadb.utils import embedding_functions
-from config import PERSIST_DIR, OPENAI_API_KEY, EMBED_MODEL  # asigură-te că există în config
+from config import PERSIST_DIR, EMBED_MODEL, require_openai_key
+from infra import metrics
+from infra.resilience import resilient_call
 
 BOOKS_YAML = Path("data/book_summaries.yaml")
 
+# funcția de embedding a colecției active (folosită de retriever pentru embeddings în lot)
+_EMBED_FN = None
+# amprenta catalogului indexat (ETag pentru /search, invalidare cache-uri)
+_FINGERPRINT: str | None = None
+
 def _norm_title(s: str) -> str:
     return " ".join(unicodedata.normalize("NFKC", s or "").strip().lower().split())
 
@@ -51,16 +56,39 @@ def _fingerprint(rows: list[dict]) -> str:
     import hashlib
     return hashlib.sha1(raw.encode("utf-8")).hexdigest()
 
+def embed_texts(texts: list[str]) -> list[list[float]]:
+    """Embeddings pentru o listă de texte, într-un singur apel upstream."""
+    if _EMBED_FN is None:
+        raise RuntimeError("Vector store neinițializat: apelează init_vector_store() întâi.")
+    with metrics.stage("embedding_api"):
+        embs = resilient_call("embeddings", _EMBED_FN, list(texts), hedge=True, pass_timeout=False)
+    # funcția chroma nu expune usage -> estimare ~4 caractere / token
+    metrics.record_tokens(EMBED_MODEL, prompt=sum(len(t or "") for t in texts) // 4, stage_name="embedding")
+    return [list(map(float, e)) for e in embs]
+
+def has_embedder() -> bool:
+    return _EMBED_FN is not None
+
+def catalog_fingerprint() -> str | None:
+    """sha1 al conținutului indexat de ultimul init_vector_store() (None înainte de inițializare)."""
+    return _FINGERPRINT
+
 def init_vector_store(summaries: list[dict], persist_path: str = PERSIST_DIR):
+    global _EMBED_FN, _FINGERPRINT
     fp_new = _fingerprint(summaries)
     fp_file = Path(persist_path) / "books.sha1"
     fp_old = fp_file.read_text(encoding="utf-8").strip() if fp_file.exists() else None
 
+    # chromadb se importă aici (greu: onnx, sqlite, telemetrie), nu la importul modulului
+    import chromadb
+    from chromadb.utils import embedding_functions
+
     client = chromadb.PersistentClient(path=persist_path)
     ef = embedding_functions.OpenAIEmbeddingFunction(
-        api_key=OPENAI_API_KEY,
+        api_key=require_openai_key(),
         model_name=EMBED_MODEL,
     )
+    _EMBED_FN = ef
 
     # (Re)creează colecția dacă e nevoie
     try:
@@ -107,4 +135,5 @@ def init_vector_store(summaries: list[dict], persist_path: str = PERSIST_DIR):
         if coll is None:
             coll = client.get_or_create_collection(name="books", embedding_function=ef)
 
+    _FINGERPRINT = fp_new
     return coll
@@ -1,7 +1,17 @@
 # rag/retriever.py
 from __future__ import annotations
-from typing import List, Tuple, Dict
-import re, unicodedata
+from collections import OrderedDict
+from typing import List, Tuple, Dict, Optional, Sequence
+import re, threading, unicodedata
+
+from config import BATCHING_ENABLED, BATCH_MAX_SIZE, BATCH_MAX_WAIT_MS, SEARCH_CACHE_SIZE
+from infra import metrics
+from infra.batcher import MicroBatcher
+from infra.resilience import stage_timeout
+from rag.embed_store import catalog_fingerprint, embed_texts, has_embedder
+
+# embeddings pentru interogări concurente -> un singur apel upstream (input listă)
+_embed_batcher = MicroBatcher(embed_texts, max_batch=BATCH_MAX_SIZE, max_wait_ms=BATCH_MAX_WAIT_MS, name="embeddings")
 
 # ---------- helpers ----------
 def _nfkc(s: str) -> str:
@@ -12,6 +22,19 @@ def _norm_query(s: str) -> str:
     s = re.sub(r"\s+", " ", s).lower()
     return s
 
+def _fold(s: str) -> str:
+    # fără diacritice, lowercase: „Război” == „razboi”
+    s = unicodedata.normalize("NFKD", s or "")
+    return "".join(ch for ch in s if not unicodedata.combining(ch)).strip().lower()
+
+def _split_themes(themes_txt: str) -> List[str]:
+    return [t.strip() for t in (themes_txt or "").split(",") if t.strip()]
+
+def _has_themes(book_themes: List[str], wanted: Sequence[str]) -> bool:
+    # toate temele cerute trebuie să apară (potrivire parțială, fără diacritice)
+    folded = [_fold(t) for t in book_themes]
+    return all(any(_fold(w) in t for t in folded) for w in wanted)
+
 def _best_snippet(doc: str, query: str, max_len: int = 220) -> str:
     if not doc:
         return ""
@@ -24,16 +47,27 @@ def _best_snippet(doc: str, query: str, max_len: int = 220) -> str:
     snippet = txt[start:start+max_len].strip()
     return snippet
 
+def _query(collection, q: str, n_results: int, include: list[str]) -> dict:
+    if BATCHING_ENABLED and has_embedder():
+        with metrics.stage("embedding"):
+            emb = _embed_batcher.call(q, timeout=stage_timeout(0.15))
+        with metrics.stage("vector_query"):
+            return collection.query(query_embeddings=[emb], n_results=n_results, include=include)
+    # chroma calculează embedding-ul intern: etapa include și embedding-ul
+    with metrics.stage("vector_query"):
+        return collection.query(query_texts=[q], n_results=n_results, include=include)
+
+def embed_batch_stats() -> dict:
+    return _embed_batcher.stats()
+
+metrics.register_stats("embed_batcher", embed_batch_stats)
+
 # ---------- public API ----------
 def debug_candidates(query: str, collection, top_k: int = 5) -> List[Tuple[str, float]]:
     q = _norm_query(query)
     if not q:
         return []
-    res = collection.query(
-        query_texts=[q],
-        n_results=top_k,
-        include=["distances", "metadatas"],
-    )
+    res = _query(collection, q, top_k, ["distances", "metadatas"])
     titles = (res.get("metadatas") or [[]])[0]
     dists  = (res.get("distances") or [[]])[0]
     out = []
@@ -42,26 +76,58 @@ def debug_candidates(query: str, collection, top_k: int = 5) -> List[Tuple[str,
         out.append((t, float(dist)))
     return out
 
-def semantic_search(query: str, collection, top_k: int = 5) -> List[Dict]:
+def semantic_search(query: str, collection, top_k: int = 5, themes: Optional[Sequence[str]] = None) -> List[Dict]:
     q = _norm_query(query)
     if not q:
         return []
-    res = collection.query(
-        query_texts=[q],
-        n_results=top_k,
-        include=["distances", "metadatas", "documents"],
-    )
+    wanted = [t for t in (themes or []) if t and t.strip()]
+    # cu filtre de teme: clasăm tot catalogul și filtrăm după metadate (Chroma nu are „contains” pe metadate)
+    n_results = collection.count() if wanted else top_k
+    if n_results <= 0:
+        return []
+    res = _query(collection, q, n_results, ["distances", "metadatas", "documents"])
     metas = (res.get("metadatas") or [[]])[0]
     dists = (res.get("distances") or [[]])[0]
     docs  = (res.get("documents") or [[]])[0]
     items = []
-    for meta, dist, doc in zip(metas, dists, docs):
-        title = (meta or {}).get("title", "")
-        items.append({
-            "title": title,
-            "distance": float(dist),
-            "snippet": _best_snippet(doc or "", q),
-        })
+    with metrics.stage("snippet"):
+        for meta, dist, doc in zip(metas, dists, docs):
+            meta = meta or {}
+            book_themes = _split_themes(meta.get("themes_txt", ""))
+            if wanted and not _has_themes(book_themes, wanted):
+                continue
+            items.append({
+                "title": meta.get("title", ""),
+                "distance": float(dist),
+                "snippet": _best_snippet(doc or "", q),
+                "themes": book_themes,
+            })
+            if len(items) >= top_k:
+                break
+    return items
+
+# clasamente complete pentru /search (paginare fără re-interogare); cheia include amprenta catalogului
+_rank_cache: "OrderedDict[tuple, List[Dict]]" = OrderedDict()
+_rank_lock = threading.Lock()
+
+def ranked_search(query: str, collection, max_results: int, themes: Optional[Sequence[str]] = None) -> List[Dict]:
+    """Clasamentul (până la `max_results`) pentru interogare + filtre; LRU per conținut de catalog."""
+    wanted = tuple(sorted({_fold(t) for t in (themes or []) if t and t.strip()}))
+    key = (catalog_fingerprint(), id(collection), _norm_query(query), wanted, max_results)
+    with _rank_lock:
+        hit = _rank_cache.get(key)
+        if hit is not None:
+            _rank_cache.move_to_end(key)
+    metrics.record_cache("search", hit is not None)
+    if hit is not None:
+        return hit
+    items = semantic_search(query, collection, top_k=max_results, themes=list(wanted))
+    if SEARCH_CACHE_SIZE > 0:
+        with _rank_lock:
+            _rank_cache[key] = items
+            _rank_cache.move_to_end(key)
+            while len(_rank_cache) > SEARCH_CACHE_SIZE:
+                _rank_cache.popitem(last=False)
     return items
 
 def auto_search_books(query: str, collection, top_k: int = 5) -> dict:
@@ -1,23 +1,97 @@
 # safety/moderation.py
-from openai import OpenAI
-import os
+from collections import OrderedDict
+import os, threading
+
+from config import BATCHING_ENABLED, BATCH_MAX_SIZE, BATCH_MAX_WAIT_MS, MODERATION_CACHE_SIZE
+from infra import metrics
+from infra.clients import openai_client
+from infra.batcher import MicroBatcher
+from infra.resilience import resilient_call, stage_timeout
+from safety.prefilter import text_key
 
 _MODEL = os.getenv("MODERATION_MODEL", "omni-moderation-latest")
-_client = OpenAI(api_key=os.getenv("OPENAI_API_KEY", ""))
 
-def moderate_text(text: str) -> dict:
-    """Returnează dict cu 'flagged', 'categories', 'scores' + 'error' dacă a eșuat."""
-    try:
-        resp = _client.moderations.create(model=_MODEL, input=text or "")
-        r = resp.results[0]
-        return {
+# LRU pentru rezultatele Moderation API, cheie = hash(text normalizat)
+_CACHE_SIZE = max(0, MODERATION_CACHE_SIZE)
+_cache: "OrderedDict[str, dict]" = OrderedDict()
+_cache_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0, "remote_calls": 0}
+
+
+def _cache_get(key: str) -> dict | None:
+    with _cache_lock:
+        hit = _cache.get(key)
+        if hit is not None:
+            _cache.move_to_end(key)
+            _stats["hits"] += 1
+        else:
+            _stats["misses"] += 1
+        return hit
+
+
+def _cache_put(key: str, value: dict) -> None:
+    if _CACHE_SIZE <= 0:
+        return
+    with _cache_lock:
+        _cache[key] = value
+        _cache.move_to_end(key)
+        while len(_cache) > _CACHE_SIZE:
+            _cache.popitem(last=False)
+
+
+def cache_stats() -> dict:
+    with _cache_lock:
+        return {**_stats, "size": len(_cache), "capacity": _CACHE_SIZE}
+
+
+def _moderate_batch(texts: list[str]) -> list[dict]:
+    """Un singur apel Moderation API pentru un lot de texte (input listă)."""
+    with _cache_lock:
+        _stats["remote_calls"] += 1
+    resp = resilient_call(
+        "moderation", openai_client(max_retries=0).moderations.create,
+        hedge=True, model=_MODEL, input=[t or "" for t in texts],
+    )
+    return [
+        {
             "flagged": bool(r.flagged),
             "categories": dict(r.categories),
             "scores": dict(r.category_scores),
             "error": None,
         }
+        for r in resp.results
+    ]
+
+
+_batcher = MicroBatcher(_moderate_batch, max_batch=BATCH_MAX_SIZE, max_wait_ms=BATCH_MAX_WAIT_MS, name="moderation")
+
+
+def batch_stats() -> dict:
+    return _batcher.stats()
+
+
+metrics.register_stats("moderation_cache", cache_stats)
+metrics.register_stats("moderation_batcher", batch_stats)
+
+
+def moderate_text(text: str) -> dict:
+    """Returnează dict cu 'flagged', 'categories', 'scores' + 'error' dacă a eșuat."""
+    key = text_key(text)
+    cached = _cache_get(key)
+    metrics.record_cache("moderation", cached is not None)
+    if cached is not None:
+        return dict(cached)
+    try:
+        with metrics.stage("moderation_api"):
+            if BATCHING_ENABLED:
+                out = _batcher.call(text or "", timeout=stage_timeout(0.10))
+            else:
+                out = _moderate_batch([text or ""])[0]
     except Exception as e:
+        # erorile nu se cache-uiesc: următorul apel reîncearcă API-ul
         return {"flagged": False, "categories": {}, "scores": {}, "error": str(e)}
+    _cache_put(key, out)
+    return dict(out)
 
 def explain_categories(categories: dict) -> str:
     if not categories:
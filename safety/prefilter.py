@@ -0,0 +1,97 @@
+# safety/prefilter.py
+# Pre-filtru local de moderare: normalizare (diacritice, leetspeak) + regex-uri compilate, pe cuvinte întregi.
+# Două liste: insultele fără alt sens (blocate imediat, fără apel remote) și lista de rezervă,
+# cu termeni ambigui („Idiotul”, „The Hate U Give”, „Hitler” în istorie), folosită doar când
+# Moderation API e dezactivat sau nu răspunde.
+from __future__ import annotations
+import hashlib
+import re
+import unicodedata
+
+SLUR_WORDS = {"nigger", "nigga", "jidan"}
+
+FALLBACK_BAD_WORDS = {
+    "nigger","nigga","hitler","nazist","nazi","jidan","țigan","tigan",
+    "hate","ură","fuck","shit","idiot","prost","imbecil","handicapat"
+}
+
+# leetspeak -> litere (aplicat doar pe tokenuri care conțin deja litere, ca „1984” să rămână neatins)
+_LEET = str.maketrans({
+    "0": "o", "1": "i", "3": "e", "4": "a", "5": "s", "7": "t", "8": "b",
+    "@": "a", "$": "s", "!": "i", "|": "i", "+": "t",
+})
+_TOKEN_RE = re.compile(r"[\w@$!|+]+")
+_LETTER_RE = re.compile(r"[^\W\d_]")
+# separatori între litere izolate: „f.u.c.k”, „f u c k”, „f-u-c-k”
+_SPACED_RE = re.compile(r"\b(?:\w[\s.\-_*]+){2,}\w\b")
+
+
+def _fold(s: str) -> str:
+    """NFKD + elimină semnele combinate (ă->a, ț->t, é->e) + lowercase."""
+    s = unicodedata.normalize("NFKD", s or "")
+    s = "".join(ch for ch in s if not unicodedata.combining(ch))
+    return s.lower()
+
+
+def _deleet(m: re.Match) -> str:
+    tok = m.group(0)
+    if not _LETTER_RE.search(tok):
+        return tok
+    # „!”/„|”/„+” de la final sunt punctuație, nu litere („ură!” rămâne „ura!”)
+    core = tok.rstrip("!|+")
+    return core.translate(_LEET) + tok[len(core):]
+
+
+def normalize_for_filter(text: str) -> str:
+    """Forma canonică folosită de pre-filtru și drept cheie de cache pentru moderare."""
+    t = _fold(text)
+    t = _SPACED_RE.sub(lambda m: re.sub(r"[\s.\-_*]+", "", m.group(0)), t)
+    t = _TOKEN_RE.sub(_deleet, t)
+    t = re.sub(r"(\w)\1{2,}", r"\1\1", t)   # „fuuuuck” -> „fuuck”
+    return " ".join(t.split())
+
+
+def _compile(words) -> re.Pattern:
+    alts = set()
+    for w in words:
+        f = _fold(w).strip()
+        if not f:
+            continue
+        # fiecare literă poate fi repetată (după colapsarea la max 2 din normalize_for_filter)
+        alts.add("".join(re.escape(ch) + "+" for ch in f))
+    # ordonăm descrescător după lungime ca alternanța să prefere potrivirea cea mai lungă
+    body = "|".join(sorted(alts, key=len, reverse=True))
+    # doar cuvinte întregi: „Idiotul”, „nazism”, „shiitake”, „uragan” nu sunt prinse
+    return re.compile(rf"(?<![^\W_])(?:{body})(?![^\W_])")
+
+
+_SLUR_PATTERN = _compile(SLUR_WORDS)
+_FALLBACK_PATTERN = _compile(FALLBACK_BAD_WORDS | SLUR_WORDS)
+
+
+def _match(pattern: re.Pattern, text: str) -> str | None:
+    m = pattern.search(normalize_for_filter(text))
+    return m.group(0) if m else None
+
+
+def prefilter_match(text: str) -> str | None:
+    """Insulta găsită (formă normalizată) sau None; blocare imediată, înainte de Moderation API."""
+    return _match(_SLUR_PATTERN, text)
+
+
+def fallback_match(text: str) -> str | None:
+    """Termenul din lista de rezervă sau None; doar când Moderation API lipsește / a eșuat."""
+    return _match(_FALLBACK_PATTERN, text)
+
+
+def is_blocked(text: str) -> bool:
+    return prefilter_match(text) is not None
+
+
+def is_blocked_fallback(text: str) -> bool:
+    return fallback_match(text) is not None
+
+
+def text_key(text: str) -> str:
+    """Hash stabil al textului normalizat (cheie pentru cache-ul de moderare)."""
+    return hashlib.sha1(normalize_for_filter(text).encode("utf-8")).hexdigest()
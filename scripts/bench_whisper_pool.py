@@ -0,0 +1,73 @@
+# scripts/bench_whisper_pool.py
+# Compară latența STT offline: model încărcat la fiecare transcriere (comportamentul vechi)
+# vs. registrul de modele partajat (stt/whisper_pool.py).
+#
+#   python scripts/bench_whisper_pool.py data/sample.wav --size base --runs 5
+#   python scripts/bench_whisper_pool.py data/sample.wav --concurrency 4
+from __future__ import annotations
+import argparse, os, statistics, sys, time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# adaugă rădăcina repo-ului în PYTHONPATH
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from stt import whisper_pool
+from stt.audio import decode_audio
+
+
+def _transcribe(model, samples) -> str:
+    segments, _ = model.transcribe(samples, beam_size=5, vad_filter=True)
+    return " ".join((s.text or "").strip() for s in segments)
+
+
+def _fresh(size: str, samples) -> float:
+    from faster_whisper import WhisperModel
+    t0 = time.perf_counter()
+    model = WhisperModel(size, device="cpu", compute_type=whisper_pool.COMPUTE_TYPE)
+    _transcribe(model, samples)
+    return time.perf_counter() - t0
+
+
+def _pooled(size: str, samples) -> float:
+    t0 = time.perf_counter()
+    with whisper_pool.acquire(size) as model:
+        _transcribe(model, samples)
+    return time.perf_counter() - t0
+
+
+def _run(label: str, fn, size: str, samples, runs: int, concurrency: int) -> list[float]:
+    with ThreadPoolExecutor(max_workers=concurrency) as ex:
+        secs = list(ex.map(lambda _: fn(size, samples), range(runs)))
+    print(
+        f"{label:<8} runs={runs} conc={concurrency} • medie {statistics.mean(secs):.2f}s • "
+        f"p50 {statistics.median(secs):.2f}s • max {max(secs):.2f}s"
+    )
+    return secs
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Latență STT offline: model per cerere vs. pool partajat.")
+    ap.add_argument("audio", type=Path, help="fișier audio (orice format suportat de ffmpeg)")
+    ap.add_argument("--size", default=os.getenv("FWHISPER_MODEL", "base"), help="tiny / base / small")
+    ap.add_argument("--runs", type=int, default=5)
+    ap.add_argument("--concurrency", type=int, default=1)
+    args = ap.parse_args()
+
+    samples = decode_audio(args.audio).samples   # decodat o dată; ambele variante primesc același array
+    print(f"🎙️ {args.audio.name} • model {args.size}/{whisper_pool.COMPUTE_TYPE} • "
+          f"pool {whisper_pool.POOL_SIZE} workeri × {whisper_pool.CPU_THREADS} thread-uri")
+
+    fresh = _run("fresh", _fresh, args.size, samples, args.runs, args.concurrency)
+    t0 = time.perf_counter()
+    whisper_pool.warm_up([args.size])
+    print(f"warm-up pool: {time.perf_counter() - t0:.2f}s (o singură dată per proces)")
+    pooled = _run("pool", _pooled, args.size, samples, args.runs, args.concurrency)
+    print(f"➡️ câștig median per transcriere: {statistics.median(fresh) - statistics.median(pooled):.2f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,80 @@
+# scripts/check_import_budget.py
+# Gardă pentru timpul de import: modulele aplicației trebuie să se importe repede, fără cheie
+# OpenAI și fără să tragă după ele dependențele grele (încărcate abia la prima folosire / warm-up).
+# Rulează într-un interpretor curat (subprocess), cu `-X importtime`.
+#
+#   python scripts/check_import_budget.py                  # api.main + chatbot, buget 1500 ms
+#   python scripts/check_import_budget.py --budget-ms 800 --top 20 api.main
+from __future__ import annotations
+import argparse, json, os, subprocess, sys, time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+DEFAULT_MODULES = ["api.main", "chatbot"]
+# nu au voie să apară în sys.modules după import (se încarcă leneș)
+HEAVY_MODULES = ["chromadb", "openai", "pydub", "faster_whisper", "onnxruntime", "pyttsx3"]
+
+_PROBE = """
+import json, sys, time
+t0 = time.perf_counter()
+import {module}
+ms = (time.perf_counter() - t0) * 1000.0
+print(json.dumps({{"ms": ms, "loaded": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def _parse_importtime(stderr: str, top: int) -> list[tuple[int, str]]:
+    # linii: "import time:  self [us] | cumulative | imported package" -> cele mai scumpe după timpul propriu
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3:
+            continue
+        try:
+            rows.append((int(parts[0].strip()), parts[2].strip()))
+        except ValueError:
+            continue
+    rows.sort(reverse=True)
+    return rows[:top]
+
+
+def check(module: str, budget_ms: float, top: int) -> bool:
+    env = {k: v for k, v in os.environ.items() if k != "OPENAI_API_KEY"}   # importul nu are voie să ceară cheia
+    env["PYTHONPATH"] = ROOT + os.pathsep + env.get("PYTHONPATH", "")
+    env["PYTHONDONTWRITEBYTECODE"] = "1"
+    t0 = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _PROBE.format(module=module, heavy=HEAVY_MODULES)],
+        cwd=ROOT, env=env, capture_output=True, text=True,
+    )
+    wall_ms = (time.perf_counter() - t0) * 1000.0
+    if proc.returncode != 0:
+        tail = "\n".join(l for l in proc.stderr.splitlines() if not l.startswith("import time:"))[-2000:]
+        print(f"❌ {module}: importul a eșuat\n{tail}")
+        return False
+
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    ok = result["ms"] <= budget_ms and not result["loaded"]
+    mark = "✅" if ok else "❌"
+    print(f"{mark} {module}: {result['ms']:.0f} ms (buget {budget_ms:.0f} ms; proces {wall_ms:.0f} ms)")
+    if result["loaded"]:
+        print(f"   module grele încărcate la import: {', '.join(result['loaded'])}")
+    for us, name in _parse_importtime(proc.stderr, top):
+        print(f"   {us / 1000.0:>8.1f} ms (self)  {name}")
+    return ok
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Verifică bugetul de timp la importul modulelor aplicației.")
+    ap.add_argument("modules", nargs="*", default=DEFAULT_MODULES, help="module de verificat (implicit api.main chatbot)")
+    ap.add_argument("--budget-ms", type=float, default=float(os.getenv("IMPORT_BUDGET_MS", "1500")))
+    ap.add_argument("--top", type=int, default=10, help="cele mai scumpe importuri afișate per modul")
+    args = ap.parse_args()
+    results = [check(m, args.budget_ms, args.top) for m in args.modules]
+    return 0 if all(results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
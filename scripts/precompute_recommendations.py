@@ -0,0 +1,68 @@
+# scripts/precompute_recommendations.py
+# Pre-generează corpul canonic al recomandării pentru fiecare carte din catalog.
+# Reluabil: sare peste titlurile deja generate din conținutul curent (hash identic).
+#
+#   python scripts/precompute_recommendations.py --concurrency 4
+#   python scripts/precompute_recommendations.py --force --compact
+from __future__ import annotations
+import argparse, os, sys, time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+# adaugă rădăcina repo-ului în PYTHONPATH
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from chatbot import CHAT_MODEL, canonical_salt, generate_canonical_body
+from tools import reco_store
+from tools.summary_tool import list_titles
+
+
+def _one(title: str, h: str) -> tuple[str, float]:
+    t0 = time.perf_counter()
+    body = generate_canonical_body(title)
+    if not body:
+        raise RuntimeError("model a întors un răspuns gol")
+    reco_store.put(title, h, body, model=CHAT_MODEL)
+    return title, time.perf_counter() - t0
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Pre-generează recomandările canonice pentru catalog.")
+    ap.add_argument("--concurrency", type=int, default=4, help="apeluri LLM simultane (implicit 4)")
+    ap.add_argument("--force", action="store_true", help="regenerează tot, ignoră intrările la zi")
+    ap.add_argument("--compact", action="store_true", help="la final: o linie per titlu, doar titlurile din catalog")
+    args = ap.parse_args()
+
+    salt = canonical_salt()
+    titles = list_titles()
+    todo = []
+    for t in titles:
+        h = reco_store.book_hash(t, salt)
+        if args.force or not reco_store.has_fresh(t, h):
+            todo.append((t, h))
+
+    print(f"📚 {len(titles)} titluri în catalog • {len(titles) - len(todo)} la zi • {len(todo)} de generat")
+    ok = failed = 0
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, args.concurrency)) as ex:
+        futs = {ex.submit(_one, t, h): t for t, h in todo}
+        for fut in as_completed(futs):
+            title = futs[fut]
+            try:
+                _, secs = fut.result()
+                ok += 1
+                print(f"  ✅ {title} ({secs:.1f}s)")
+            except Exception as e:
+                failed += 1
+                print(f"  ⚠️ {title}: {e}")
+
+    if args.compact:
+        n = reco_store.compact(keep_titles=titles)
+        print(f"🧹 store compactat: {n} intrări")
+    print(f"Gata în {time.perf_counter() - t0:.1f}s • generate: {ok} • eșuate: {failed}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,102 @@
+# scripts/trace_summary.py
+# Rezumat al trace-urilor scrise de infra/tracing.py (data/traces/spans.jsonl + fișierele rotite).
+#
+#   python scripts/trace_summary.py                   # agregat per span + cele mai lente span-uri
+#   python scripts/trace_summary.py --top 20 --name llm.completion
+#   python scripts/trace_summary.py --trace <trace_id> # arborele unei cereri
+from __future__ import annotations
+import argparse, json, os, sys
+from pathlib import Path
+
+
+def _load(trace_dir: Path) -> list[dict]:
+    spans = []
+    for path in sorted(trace_dir.glob("spans.jsonl*")):
+        with path.open(encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    spans.append(json.loads(line))
+                except ValueError:
+                    continue  # linie trunchiată la rotire / oprire
+    return spans
+
+
+def _pct(values: list[float], q: float) -> float:
+    data = sorted(values)
+    return data[min(len(data) - 1, int(q * len(data)))] if data else 0.0
+
+
+def _print_aggregate(spans: list[dict]) -> None:
+    by_name: dict[str, list[dict]] = {}
+    for s in spans:
+        by_name.setdefault(s["name"], []).append(s)
+    rows = []
+    for name, items in by_name.items():
+        d = [s["duration_ms"] for s in items]
+        errors = sum(1 for s in items if s.get("status") == "error")
+        rows.append((name, len(items), _pct(d, 0.50), _pct(d, 0.95), max(d), sum(d), errors))
+    rows.sort(key=lambda r: r[5], reverse=True)
+    print(f"{'span':<34} {'count':>7} {'p50 ms':>10} {'p95 ms':>10} {'max ms':>10} {'total s':>9} {'err':>5}")
+    for name, n, p50, p95, mx, total, err in rows:
+        print(f"{name[:34]:<34} {n:>7} {p50:>10.1f} {p95:>10.1f} {mx:>10.1f} {total / 1000.0:>9.1f} {err:>5}")
+
+
+def _print_slowest(spans: list[dict], top: int) -> None:
+    print(f"\nCele mai lente {top} span-uri:")
+    for s in sorted(spans, key=lambda s: s["duration_ms"], reverse=True)[:top]:
+        attrs = ", ".join(f"{k}={v}" for k, v in (s.get("attrs") or {}).items() if v is not None)
+        flag = " ⚠️" if s.get("status") == "error" else ""
+        print(f"  {s['duration_ms']:>10.1f} ms  {s['name']:<28} trace={s['trace_id']}{flag}  {attrs}")
+
+
+def _print_tree(spans: list[dict], trace_id: str) -> int:
+    items = [s for s in spans if s["trace_id"] == trace_id]
+    if not items:
+        print(f"Trace inexistent: {trace_id}")
+        return 1
+    ids = {s["span_id"] for s in items}
+    children: dict[str | None, list[dict]] = {}
+    for s in items:
+        parent = s.get("parent_id") if s.get("parent_id") in ids else None
+        children.setdefault(parent, []).append(s)
+    t0 = min(s["start"] for s in items)
+
+    def walk(parent: str | None, depth: int) -> None:
+        for s in sorted(children.get(parent, []), key=lambda s: s["start"]):
+            offset = (s["start"] - t0) * 1000.0
+            err = f"  ⚠️ {s['error']}" if s.get("error") else ""
+            print(f"{'  ' * depth}{s['name']:<{40 - 2 * depth}} +{offset:>8.1f} ms  {s['duration_ms']:>9.1f} ms{err}")
+            walk(s["span_id"], depth + 1)
+
+    walk(None, 0)
+    return 0
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Rezumat al trace-urilor JSONL (infra/tracing.py).")
+    ap.add_argument("--dir", default=os.getenv("TRACE_DIR", "data/traces"), help="directorul cu spans.jsonl*")
+    ap.add_argument("--top", type=int, default=10, help="câte span-uri lente să afișeze (implicit 10)")
+    ap.add_argument("--name", help="doar span-urile cu acest nume")
+    ap.add_argument("--trace", help="afișează arborele unui trace")
+    args = ap.parse_args()
+
+    spans = _load(Path(args.dir))
+    if not spans:
+        print(f"Niciun span în {args.dir}")
+        return 1
+    if args.trace:
+        return _print_tree(spans, args.trace)
+    if args.name:
+        spans = [s for s in spans if s["name"] == args.name]
+    traces = {s["trace_id"] for s in spans}
+    print(f"🔎 {len(spans)} span-uri • {len(traces)} trace-uri\n")
+    _print_aggregate(spans)
+    _print_slowest(spans, args.top)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
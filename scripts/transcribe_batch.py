@@ -0,0 +1,73 @@
+# scripts/transcribe_batch.py
+# Transcrie în lot fișiere audio (import de cereri înregistrate) și scrie rezultatele ca JSONL:
+# o linie per fișier (text, durată, timpi de decodare / transcriere) + rezumat cu debitul
+# în secunde de audio procesate per secundă de ceas.
+#
+#   python scripts/transcribe_batch.py data/inregistrari/ --out data/transcrieri.jsonl --language ro
+#   python scripts/transcribe_batch.py a.m4a b.mp3 c.wav --mode process_pool --no-cache
+from __future__ import annotations
+import argparse, json, os, sys
+from pathlib import Path
+
+# adaugă rădăcina repo-ului în PYTHONPATH
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from stt.batch import BatchSummary, pick_mode, run_batch
+from stt.transcribe import SUPPORTED_AUDIO_TYPES
+
+
+def _collect(paths: list[Path]) -> list[Path]:
+    files = []
+    for p in paths:
+        if p.is_dir():
+            files += sorted(f for f in p.rglob("*") if f.suffix.lower().lstrip(".") in SUPPORTED_AUDIO_TYPES)
+        elif p.exists():
+            files.append(p)
+        else:
+            print(f"⚠️ lipsește: {p}")
+    return files
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Transcriere în lot (JSONL) cu modelul faster-whisper partajat.")
+    ap.add_argument("paths", nargs="+", type=Path, help="fișiere audio sau directoare (recursiv)")
+    ap.add_argument("--out", type=Path, default=Path("data/transcrieri.jsonl"))
+    ap.add_argument("--language", default="auto", help="auto sau cod ISO (ro, en, ...)")
+    ap.add_argument("--decode-workers", type=int, default=0, help="thread-uri de decodare (0 = nuclee CPU)")
+    ap.add_argument("--mode", choices=["batched", "process_pool", "threads"], default=None,
+                    help=f"implicit: {pick_mode()} (după versiunea faster-whisper / nuclee)")
+    ap.add_argument("--no-cache", dest="cache", action="store_false", help="ignoră cache-ul de transcrieri")
+    args = ap.parse_args()
+
+    files = _collect(args.paths)
+    if not files:
+        print("Niciun fișier audio.")
+        return 1
+    mode = args.mode or pick_mode()
+    print(f"🎙️ {len(files)} fișiere • mod {mode} • -> {args.out}")
+
+    args.out.parent.mkdir(parents=True, exist_ok=True)
+    summary = BatchSummary(mode)
+    with args.out.open("w", encoding="utf-8") as f:
+        results = run_batch(((str(p), p) for p in files), language=args.language,
+                            decode_workers=args.decode_workers, use_cache=args.cache, mode=mode)
+        for rec in results:
+            summary.add(rec)
+            f.write(json.dumps(rec, ensure_ascii=False) + "\n")
+            f.flush()
+            mark = {"ok": "✅", "cached": "♻️"}.get(rec["status"], "⚠️")
+            detail = rec["error"] if rec["status"] == "error" else f"{rec['duration_s']}s audio, {rec['transcribe_ms']:.0f} ms"
+            print(f"  {mark} {rec['file']} ({detail})")
+
+    s = summary.as_dict()
+    print(
+        f"➡️ {s['ok']} transcrise • {s['cached']} din cache • {s['error']} erori • "
+        f"{s['audio_s']:.0f}s audio în {s['wall_s']:.1f}s = {s['audio_s_per_wall_s']}× timp real"
+    )
+    return 0 if s["error"] == 0 else 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
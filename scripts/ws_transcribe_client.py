@@ -0,0 +1,62 @@
+# scripts/ws_transcribe_client.py
+# Client de test pentru /ws/transcribe: trimite un fișier audio ca flux PCM în ritm real (ca un microfon)
+# și afișează mesajele serverului (partial / final / transcript / retrieval / recommendation).
+#
+#   python scripts/ws_transcribe_client.py data/sample.wav
+#   python scripts/ws_transcribe_client.py nota.m4a --url ws://localhost:8000/ws/transcribe --speed 4 --no-recommend
+from __future__ import annotations
+import argparse, asyncio, json, os, sys, time
+from pathlib import Path
+
+# adaugă rădăcina repo-ului în PYTHONPATH
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from stt.audio import SAMPLE_RATE, decode_audio
+
+
+async def _run(args) -> int:
+    import numpy as np
+    import websockets   # vine cu uvicorn[standard]
+
+    pcm = (np.clip(decode_audio(args.audio).samples, -1.0, 1.0) * 32767.0).astype("<i2").tobytes()
+    frame = SAMPLE_RATE * 2 * args.frame_ms // 1000
+    query = f"?language={args.language}&recommend={'true' if args.recommend else 'false'}"
+    t0 = time.perf_counter()
+    async with websockets.connect(args.url + query, max_size=None) as ws:
+        async def reader():
+            async for raw in ws:
+                msg = json.loads(raw)
+                kind = msg.get("type")
+                at = f"{time.perf_counter() - t0:6.2f}s"
+                if kind in {"partial", "final"}:
+                    print(f"{at} {kind:<8} #{msg['segment']}: {msg['text']}")
+                elif kind == "recommendation":
+                    print(f"{at} recommendation: {msg.get('title')} ({msg.get('mode')})")
+                else:
+                    print(f"{at} {kind:<8} {json.dumps({k: v for k, v in msg.items() if k != 'type'}, ensure_ascii=False)[:200]}")
+
+        read = asyncio.create_task(reader())
+        for i in range(0, len(pcm), frame):
+            await ws.send(pcm[i:i + frame])
+            await asyncio.sleep(args.frame_ms / 1000.0 / args.speed)
+        print(f"{time.perf_counter() - t0:6.2f}s end      (audio trimis)")
+        await ws.send(json.dumps({"type": "end"}))
+        await read
+    return 0
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Trimite un fișier audio la /ws/transcribe, în ritm real.")
+    ap.add_argument("audio", type=Path)
+    ap.add_argument("--url", default="ws://localhost:8000/ws/transcribe")
+    ap.add_argument("--language", default="ro")
+    ap.add_argument("--frame-ms", type=int, default=100)
+    ap.add_argument("--speed", type=float, default=1.0, help=">1 = mai repede decât timpul real")
+    ap.add_argument("--no-recommend", dest="recommend", action="store_false")
+    return asyncio.run(_run(ap.parse_args()))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,102 @@
+# stt/audio.py
+# Decodare audio o singură dată, în memorie: orice format -> float32 mono 16 kHz (NumPy).
+# Durata vine din numărul de eșantioane; offline primește direct array-ul, online primește
+# bytes WAV construiți în memorie. Fără fișiere temporare și fără spawn-uri repetate de ffmpeg.
+from __future__ import annotations
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, BinaryIO, Union
+import hashlib, io, shutil, subprocess, wave
+
+if TYPE_CHECKING:
+    import numpy as np
+
+SAMPLE_RATE = 16000
+
+AudioSource = Union[str, Path, bytes, bytearray, BinaryIO, "DecodedAudio"]
+
+
+@dataclass(frozen=True)
+class DecodedAudio:
+    samples: "np.ndarray"          # float32, mono, [-1, 1]
+    sample_rate: int = SAMPLE_RATE
+
+    @property
+    def duration(self) -> float:
+        return len(self.samples) / float(self.sample_rate)
+
+    def digest(self) -> str:
+        """sha1 al conținutului decodat (identic pentru același audio, indiferent de container)."""
+        return hashlib.sha1(self.samples.tobytes()).hexdigest()
+
+    def to_wav_bytes(self) -> bytes:
+        """WAV PCM 16-bit în memorie (pentru STT online)."""
+        import numpy as np
+
+        pcm = (np.clip(self.samples, -1.0, 1.0) * 32767.0).astype("<i2")
+        buf = io.BytesIO()
+        with wave.open(buf, "wb") as w:
+            w.setnchannels(1)
+            w.setsampwidth(2)
+            w.setframerate(self.sample_rate)
+            w.writeframes(pcm.tobytes())
+        return buf.getvalue()
+
+
+def _decode_pyav(src) -> "np.ndarray":
+    # PyAV (dependență a faster-whisper): decodare + resampling în proces, fără ffmpeg extern
+    from faster_whisper.audio import decode_audio as fw_decode
+    return fw_decode(src, sampling_rate=SAMPLE_RATE)
+
+
+def _decode_ffmpeg(src) -> "np.ndarray":
+    # fallback: un singur proces ffmpeg, ieșire f32le pe stdout
+    import numpy as np
+
+    cmd = [shutil.which("ffmpeg") or "ffmpeg", "-hide_banner", "-loglevel", "error"]
+    data = None
+    if isinstance(src, (str, Path)):
+        cmd += ["-nostdin", "-i", str(src)]
+    else:
+        data = src.read()
+        cmd += ["-i", "pipe:0"]
+    cmd += ["-f", "f32le", "-ac", "1", "-ar", str(SAMPLE_RATE), "pipe:1"]
+    proc = subprocess.run(cmd, input=data, capture_output=True, check=False)
+    if proc.returncode != 0:
+        raise RuntimeError(f"ffmpeg nu a putut decoda audio: {proc.stderr.decode(errors='ignore')[-300:]}")
+    return np.frombuffer(proc.stdout, dtype=np.float32).copy()
+
+
+def decode_audio(source: AudioSource) -> DecodedAudio:
+    """Cale, bytes sau file-like -> DecodedAudio (16 kHz mono float32). DecodedAudio trece neschimbat."""
+    if isinstance(source, DecodedAudio):
+        return source
+    if isinstance(source, (bytes, bytearray)):
+        source = io.BytesIO(bytes(source))
+    try:
+        samples = _decode_pyav(source)
+    except ImportError:
+        if hasattr(source, "seek"):
+            source.seek(0)
+        samples = _decode_ffmpeg(source)
+    return DecodedAudio(samples=samples)
+
+
+def probe_duration(path: str | Path) -> float | None:
+    """Durata declarată în container (doar antet, fără decodare); None dacă nu se poate afla."""
+    try:
+        import av   # PyAV, instalat împreună cu faster-whisper
+    except ImportError:
+        av = None
+    if av is not None:
+        try:
+            with av.open(str(path)) as c:
+                if c.duration:
+                    return c.duration / av.time_base
+        except Exception:
+            pass
+    try:
+        with wave.open(str(path), "rb") as w:
+            return w.getnframes() / float(w.getframerate())
+    except Exception:
+        return None
@@ -0,0 +1,201 @@
+# stt/batch.py
+# Transcriere în lot pentru multe fișiere (scripts/transcribe_batch.py, POST /transcribe/batch):
+# decodare în paralel (thread-uri), transcriere cu modelul deja încărcat — inferență pe loturi
+# (BatchedInferencePipeline) unde faster-whisper o are, altfel pool-ul de procese din stt/longform.py.
+# Rezultatele vin pe măsură ce fișierele se termină (un dict per fișier, scris ca JSONL de apelant).
+from __future__ import annotations
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Iterable, Iterator
+import contextvars, os, queue, threading, time
+
+from config import STT_BATCH_SIZE, STT_BATCH_DECODE_WORKERS
+from infra import metrics
+from stt import cache as stt_cache
+from stt import longform, whisper_pool
+from stt.audio import AudioSource, decode_audio
+from stt.transcribe import _cache_model, _looks_bad, _offline_options, cached_transcript
+
+
+def _batched_pipeline_cls():
+    try:
+        from faster_whisper import BatchedInferencePipeline   # faster-whisper >= 1.1
+    except ImportError:
+        return None
+    return BatchedInferencePipeline
+
+
+def pick_mode() -> str:
+    """batched (un model, loturi de ferestre) | process_pool (câte un model per proces) | threads."""
+    if _batched_pipeline_cls() is not None:
+        return "batched"
+    return "process_pool" if longform.WORKERS > 1 else "threads"
+
+
+def _consume(segments, info) -> tuple[str, float, int, str | None]:
+    parts, logprob, count = [], 0.0, 0
+    for seg in segments:
+        t = (seg.text or "").strip()
+        if t:
+            parts.append(t)
+        if getattr(seg, "avg_logprob", None) is not None:
+            logprob += seg.avg_logprob
+            count += 1
+    return " ".join(parts), logprob, count, getattr(info, "language", None)
+
+
+class _Transcriber:
+    """submit(samples) -> Future[(text, logprob_sum, n_seg, limbă)], după modul ales."""
+
+    def __init__(self, mode: str, language: str, model_size: str):
+        self.mode = mode
+        self.model_size = model_size
+        self.options = _offline_options(language)
+        # batched / threads: câte un fir per slot din whisper_pool (workerii CTranslate2 ai modelului)
+        self._ex = None if mode == "process_pool" else ThreadPoolExecutor(
+            max_workers=whisper_pool.POOL_SIZE, thread_name_prefix="stt-batch",
+        )
+
+    def _run(self, samples):
+        with whisper_pool.acquire(self.model_size) as model:
+            if self.mode == "batched":
+                pipe = _batched_pipeline_cls()(model=model)
+                return _consume(*pipe.transcribe(samples, batch_size=STT_BATCH_SIZE, **self.options))
+            return _consume(*model.transcribe(samples, **self.options))
+
+    def submit(self, samples) -> Future:
+        if self._ex is None:
+            return longform.submit(samples, self.options, self.model_size)
+        return self._ex.submit(contextvars.copy_context().run, self._run, samples)
+
+    def close(self) -> None:
+        if self._ex is not None:
+            self._ex.shutdown(wait=False)
+
+
+def run_batch(
+    items: Iterable[tuple[str, AudioSource]],
+    language: str = "auto",
+    decode_workers: int = STT_BATCH_DECODE_WORKERS,
+    use_cache: bool = True,
+    mode: str | None = None,
+) -> Iterator[dict]:
+    """
+    `items` = (nume, sursă) — cale sau bytes. Întoarce câte un rezultat per fișier, în ordinea terminării:
+    {file, status: ok|cached|error, text, duration_s, language, decode_ms, transcribe_ms, error}.
+    Fișierele decodate dar netranscrise sunt limitate (prefetch), ca memoria să nu crească cu lotul.
+    """
+    items = list(items)
+    if not items:
+        return
+    model_size = os.getenv("FWHISPER_MODEL", "base")
+    mode = mode or pick_mode()
+    use_cache = use_cache and stt_cache.enabled()
+    tx = _Transcriber(mode, language, model_size)
+    workers = decode_workers if decode_workers > 0 else (os.cpu_count() or 2)
+    decode_ex = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="stt-decode")
+    tx_slots = longform.WORKERS if mode == "process_pool" else whisper_pool.POOL_SIZE
+    prefetch = threading.BoundedSemaphore(max(2, 2 * tx_slots))
+    out: "queue.Queue[dict]" = queue.Queue()
+    cache_model = _cache_model("offline", "")
+
+    def finish(rec: dict) -> None:
+        prefetch.release()
+        out.put(rec)
+
+    def transcribed(fut: Future, rec: dict, t1: float, digest: str, raw: str | None) -> None:
+        rec["transcribe_ms"] = round((time.perf_counter() - t1) * 1000.0, 1)
+        try:
+            text, logprob, count, lang = fut.result()
+        except Exception as e:
+            rec.update(status="error", error=f"{type(e).__name__}: {e}")
+        else:
+            rec.update(status="ok", text=text, language=lang,
+                       avg_logprob=round(logprob / count, 3) if count else None)
+            if use_cache and not _looks_bad(text):
+                keys = [stt_cache.make_key("pcm", digest, "offline", cache_model, language)]
+                if raw is not None:
+                    keys.append(stt_cache.make_key("raw", raw, "offline", cache_model, language))
+                stt_cache.put(keys, text, rec["duration_s"])
+        finish(rec)
+
+    def decode_one(name: str, src: AudioSource) -> None:
+        rec = {"file": name, "status": None, "text": None, "duration_s": None, "language": None,
+               "decode_ms": 0.0, "transcribe_ms": 0.0, "error": None}
+        try:
+            hit = cached_transcript(src, "offline", language=language) if use_cache else None
+            if hit is not None:
+                rec.update(status="cached", text=hit[0], duration_s=round(hit[1], 2))
+                finish(rec)
+                return
+            if use_cache:
+                stt_cache.record_miss()   # cached_transcript nu numără miss-ul; aici chiar transcriem
+            t0 = time.perf_counter()
+            with metrics.stage("stt_decode"):
+                audio = decode_audio(src)
+            rec["decode_ms"] = round((time.perf_counter() - t0) * 1000.0, 1)
+            rec["duration_s"] = round(audio.duration, 2)
+            raw = stt_cache.source_digest(src) if use_cache else None
+            digest = audio.digest()
+            t1 = time.perf_counter()
+            tx.submit(audio.samples).add_done_callback(lambda f: transcribed(f, rec, t1, digest, raw))
+        except Exception as e:
+            rec.update(status="error", error=f"{type(e).__name__}: {e}")
+            finish(rec)
+
+    stop = threading.Event()
+
+    def released_if_cancelled(fut: Future) -> None:
+        # decodare anulată (consumatorul a plecat): decode_one nu mai rulează, deci nici finish()
+        if fut.cancelled():
+            prefetch.release()
+
+    def produce() -> None:
+        for name, src in items:
+            prefetch.acquire()
+            if stop.is_set():
+                prefetch.release()
+                return
+            try:
+                fut = decode_ex.submit(contextvars.copy_context().run, decode_one, name, src)
+            except RuntimeError:   # executorul a fost oprit între verificare și submit
+                prefetch.release()
+                return
+            fut.add_done_callback(released_if_cancelled)
+
+    threading.Thread(target=produce, name="stt-batch-feed", daemon=True).start()
+    try:
+        # fără metrics.stage aici: generatorul poate fi consumat din alt context (StreamingResponse)
+        for _ in range(len(items)):
+            yield out.get()
+    finally:
+        # generator închis înainte de final (client deconectat): firul de alimentare se oprește la
+        # următorul slot, iar sloturile decodărilor anulate sunt eliberate (altfel acquire() ar aștepta la nesfârșit)
+        stop.set()
+        decode_ex.shutdown(wait=False, cancel_futures=True)
+        tx.close()
+
+
+class BatchSummary:
+    """Totaluri pentru raport: audio procesat / timp real = secunde de audio pe secundă de ceas."""
+
+    def __init__(self, mode: str):
+        self.mode = mode
+        self.t0 = time.perf_counter()
+        self.counts = {"ok": 0, "cached": 0, "error": 0}
+        self.audio_s = 0.0
+
+    def add(self, rec: dict) -> None:
+        self.counts[rec["status"]] = self.counts.get(rec["status"], 0) + 1
+        if rec["status"] != "error":
+            self.audio_s += rec.get("duration_s") or 0.0
+
+    def as_dict(self) -> dict:
+        wall = time.perf_counter() - self.t0
+        return {
+            "mode": self.mode,
+            "files": sum(self.counts.values()),
+            **self.counts,
+            "audio_s": round(self.audio_s, 2),
+            "wall_s": round(wall, 2),
+            "audio_s_per_wall_s": round(self.audio_s / wall, 2) if wall > 0 else None,
+        }
@@ -0,0 +1,177 @@
+# stt/cache.py
+# Cache adresat după conținut pentru transcrieri: cheie = hash(audio) + engine + model + limbă.
+# Două niveluri: LRU în memorie + fișiere JSON sub AUDIO_DIR/stt_cache (evacuare după dimensiunea totală).
+# Pe lângă hash-ul audio decodat, și octeții bruți ai fișierului sunt cheie: reîncărcarea aceluiași
+# fișier nu mai trece nici prin decodare (PyAV/ffmpeg), nici prin Whisper.
+from __future__ import annotations
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+import hashlib, json, os, threading, time
+
+from config import STT_CACHE_ENABLED, STT_CACHE_DIR, STT_CACHE_MEMORY_ITEMS, STT_CACHE_DISK_MB
+from infra import metrics
+
+_mem: "OrderedDict[str, tuple[str, float]]" = OrderedDict()
+_lock = threading.Lock()
+_disk_bytes: Optional[int] = None   # calculat leneș la prima scriere
+_stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "writes": 0, "disk_evictions": 0}
+
+
+def enabled() -> bool:
+    return STT_CACHE_ENABLED
+
+
+def source_digest(source) -> Optional[str]:
+    """sha1 al octeților bruți (cale sau bytes); None pentru alte surse (ex. audio deja decodat)."""
+    if isinstance(source, (bytes, bytearray)):
+        return hashlib.sha1(source).hexdigest()
+    if isinstance(source, (str, Path)):
+        h = hashlib.sha1()
+        with open(source, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                h.update(block)
+        return h.hexdigest()
+    return None
+
+
+def make_key(kind: str, digest: str, engine: str, model: str, language: str) -> str:
+    # kind: "raw" (octeți fișier) | "pcm" (eșantioane decodate)
+    raw = json.dumps([kind, digest, engine, model, (language or "auto").lower()])
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def _path(key: str) -> Path:
+    return Path(STT_CACHE_DIR) / key[:2] / f"{key}.json"
+
+
+def _mem_put(key: str, value: tuple[str, float]) -> None:
+    if STT_CACHE_MEMORY_ITEMS <= 0:
+        return
+    _mem[key] = value
+    _mem.move_to_end(key)
+    while len(_mem) > STT_CACHE_MEMORY_ITEMS:
+        _mem.popitem(last=False)
+
+
+def record_miss() -> None:
+    """Un miss per cerere: apelantul l-a constatat după una sau mai multe chei (get(count_miss=False))."""
+    with _lock:
+        _stats["misses"] += 1
+    metrics.record_cache("stt", False)
+
+
+def get(key: str, count_miss: bool = True) -> Optional[tuple[str, float]]:
+    """
+    (text, durată_secunde) din memorie sau de pe disc; None la miss.
+    count_miss=False: cererea mai încearcă alte chei, miss-ul se numără o dată, cu record_miss().
+    """
+    with _lock:
+        hit = _mem.get(key)
+        if hit is not None:
+            _mem.move_to_end(key)
+            _stats["memory_hits"] += 1
+    if hit is not None:
+        metrics.record_cache("stt", True)
+        return hit
+
+    p = _path(key)
+    try:
+        rec = json.loads(p.read_text(encoding="utf-8"))
+        hit = (str(rec["text"]), float(rec["duration"]))
+        os.utime(p)   # mtime = ultima folosire (LRU pe disc)
+    except (OSError, ValueError, KeyError, TypeError):
+        hit = None
+    if hit is None:
+        if count_miss:
+            record_miss()
+        return None
+    with _lock:
+        _stats["disk_hits"] += 1
+        _mem_put(key, hit)
+    metrics.record_cache("stt", True)
+    return hit
+
+
+def _scan_disk() -> int:
+    root = Path(STT_CACHE_DIR)
+    return sum(p.stat().st_size for p in root.glob("*/*.json")) if root.exists() else 0
+
+
+def _evict_disk(limit: int) -> None:
+    # cele mai vechi (după ultima folosire) până sub limită
+    global _disk_bytes
+    files = []
+    for p in Path(STT_CACHE_DIR).glob("*/*.json"):
+        try:
+            st = p.stat()
+        except OSError:
+            continue
+        files.append((st.st_mtime, st.st_size, p))
+    files.sort()
+    total = sum(f[1] for f in files)
+    for _, size, p in files:
+        if total <= limit:
+            break
+        try:
+            p.unlink()
+        except OSError:
+            continue
+        total -= size
+        _stats["disk_evictions"] += 1
+    _disk_bytes = total
+
+
+def put(keys: list[str], text: str, duration: float) -> None:
+    """Salvează rezultatul sub toate cheile date (octeți bruți + eșantioane decodate)."""
+    global _disk_bytes
+    value = (text, float(duration))
+    data = json.dumps({"text": text, "duration": float(duration), "created": time.time()}, ensure_ascii=False)
+    written = 0
+    for key in keys:
+        p = _path(key)
+        try:
+            p.parent.mkdir(parents=True, exist_ok=True)
+            tmp = p.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+            tmp.write_text(data, encoding="utf-8")
+            os.replace(tmp, p)   # atomic: cititorii nu văd niciodată un fișier pe jumătate scris
+            written += len(data.encode("utf-8"))
+        except OSError:
+            continue
+    limit = int(STT_CACHE_DISK_MB * 1024 * 1024)
+    with _lock:
+        for key in keys:
+            _mem_put(key, value)
+        _stats["writes"] += 1
+        if _disk_bytes is None:
+            _disk_bytes = _scan_disk()
+        else:
+            _disk_bytes += written
+        if _disk_bytes > limit:
+            _evict_disk(int(limit * 0.9))   # histerezis: nu evacuăm la fiecare scriere
+
+
+def clear() -> None:
+    global _disk_bytes
+    with _lock:
+        _mem.clear()
+        for p in Path(STT_CACHE_DIR).glob("*/*.json"):
+            try:
+                p.unlink()
+            except OSError:
+                pass
+        _disk_bytes = 0
+
+
+def cache_stats() -> dict:
+    with _lock:
+        return {
+            **_stats,
+            "memory_size": len(_mem),
+            "memory_capacity": STT_CACHE_MEMORY_ITEMS,
+            "disk_bytes": _disk_bytes if _disk_bytes is not None else -1,
+            "disk_limit_bytes": int(STT_CACHE_DISK_MB * 1024 * 1024),
+        }
+
+
+metrics.register_stats("stt_cache", cache_stats)
@@ -0,0 +1,178 @@
+# stt/jobs.py
+# Joburi de transcriere asincrone (POST /transcribe): fișierul încărcat pe disc e transcris de un pool
+# de workeri în fundal; starea (progres, segmente parțiale, text final, recomandare opțională)
+# e ținută în memorie și interogată prin GET /transcribe/{id}.
+from __future__ import annotations
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Optional
+import logging, threading, time, uuid
+
+from config import STT_JOB_WORKERS, STT_JOB_MAX_PENDING, STT_JOB_TTL_S, STT_MAX_SECONDS_API
+from infra import metrics, tracing
+from stt import whisper_pool
+from stt.audio import decode_audio
+from stt.transcribe import cached_transcript, transcribe_file
+
+log = logging.getLogger("smartlib.stt.jobs")
+
+WORKERS = STT_JOB_WORKERS if STT_JOB_WORKERS > 0 else whisper_pool.POOL_SIZE
+
+
+class JobRejected(Exception):
+    """Prea multe joburi în așteptare: clientul reîncearcă după `retry_after_s`."""
+
+    def __init__(self, retry_after_s: int):
+        super().__init__("coada de transcriere e plină")
+        self.retry_after_s = retry_after_s
+
+
+@dataclass
+class Job:
+    id: str
+    path: Path
+    engine: str
+    language: str
+    status: str = "queued"                     # queued | running | done | error
+    progress: float = 0.0                      # 0..1
+    segments: list[dict] = field(default_factory=list)
+    text: Optional[str] = None
+    duration_s: Optional[float] = None
+    cached: bool = False
+    error: Optional[str] = None
+    recommendation: Optional[dict] = None
+    created: float = field(default_factory=time.time)
+    started: Optional[float] = None
+    finished: Optional[float] = None
+
+    def view(self, since: int = 0) -> dict:
+        """
+        Instantaneu serializabil; `since` = primele segmente deja văzute de client (polling incremental).
+        Segmentele sunt în ordinea sosirii (bucățile long-form se termină în paralel, nu în ordine):
+        un segment nou nu deplasează niciodată unul deja trimis. Ordinea în fișier = după `start`.
+        """
+        return {
+            "id": self.id,
+            "status": self.status,
+            "progress": round(self.progress, 3),
+            "engine": self.engine,
+            "language": self.language,
+            "duration_s": self.duration_s,
+            "segments": self.segments[since:],
+            "segments_total": len(self.segments),
+            "text": self.text,
+            "cached": self.cached,
+            "error": self.error,
+            "recommendation": self.recommendation,
+            "queued_ms": round(((self.started or time.time()) - self.created) * 1000.0, 1),
+            "run_ms": round(((self.finished or time.time()) - self.started) * 1000.0, 1) if self.started else None,
+        }
+
+
+_jobs: dict[str, Job] = {}
+_lock = threading.Lock()
+_executor = ThreadPoolExecutor(max_workers=WORKERS, thread_name_prefix="stt-job")
+_stats = {"submitted": 0, "done": 0, "failed": 0, "rejected": 0, "cache_hits": 0}
+
+
+def _pending() -> int:
+    return sum(1 for j in _jobs.values() if j.status in ("queued", "running"))
+
+
+def _purge() -> None:
+    # joburile terminate se păstrează STT_JOB_TTL_S pentru polling, apoi dispar
+    cutoff = time.time() - STT_JOB_TTL_S
+    for jid in [j.id for j in _jobs.values() if j.finished and j.finished < cutoff]:
+        del _jobs[jid]
+
+
+def new_id() -> str:
+    return uuid.uuid4().hex
+
+
+def submit(
+    job_id: str,
+    path: Path,
+    engine: str = "offline",
+    language: str = "auto",
+    client=None,
+    then: Optional[Callable[[str], dict]] = None,
+    trace_id: Optional[str] = None,
+) -> Job:
+    """
+    Pune fișierul `path` în coada de transcriere (fișierul e șters după procesare).
+    `then(text)` — pas opțional după transcriere (ex. recomandarea), rezultatul ajunge în job.recommendation.
+    `trace_id` — trace-ul cererii de upload; jobul apare în același trace.
+    """
+    with _lock:
+        _purge()
+        if _pending() >= STT_JOB_MAX_PENDING:
+            _stats["rejected"] += 1
+            raise JobRejected(retry_after_s=5)
+        job = _jobs[job_id] = Job(id=job_id, path=Path(path), engine=engine, language=language)
+        _stats["submitted"] += 1
+    _executor.submit(_run, job, client, then, trace_id)
+    return job
+
+
+def status(job_id: str, since: int = 0) -> Optional[dict]:
+    """Starea jobului (vezi Job.view); None dacă nu există / a expirat."""
+    with _lock:
+        job = _jobs.get(job_id)
+        return job.view(since) if job is not None else None
+
+
+def _on_segment(job: Job, seg: dict) -> None:
+    with _lock:
+        job.segments.append({"seq": len(job.segments), "start": round(seg["start"], 2),
+                             "end": round(seg["end"], 2), "text": seg["text"]})
+        job.progress = max(job.progress, min(0.99, seg["progress"]))
+
+
+def _run(job: Job, client, then: Optional[Callable[[str], dict]], trace_id: Optional[str]) -> None:
+    job.status, job.started = "running", time.time()
+    try:
+        with tracing.start_trace("stt.job", trace_id=trace_id, job_id=job.id, engine=job.engine), \
+                metrics.stage("stt_job"):
+            hit = cached_transcript(job.path, job.engine, language=job.language)
+            if hit is not None:
+                job.text, job.duration_s = hit
+                job.cached = True
+                with _lock:
+                    _stats["cache_hits"] += 1
+            else:
+                with metrics.stage("stt_decode"):
+                    audio = decode_audio(job.path)
+                job.duration_s = round(audio.duration, 2)
+                if audio.duration > STT_MAX_SECONDS_API:
+                    raise ValueError(f"Audio prea lung: ~{int(audio.duration)}s (limita {STT_MAX_SECONDS_API}s).")
+                job.text, _ = transcribe_file(
+                    job.path, job.engine, client=client, language=job.language,
+                    decoded=audio, on_segment=lambda seg: _on_segment(job, seg),
+                )
+            job.progress = 1.0
+            if then is not None and job.text:
+                job.recommendation = then(job.text)
+        job.status = "done"
+        with _lock:
+            _stats["done"] += 1
+    except Exception as e:
+        log.warning("job STT %s eșuat: %s", job.id, e)
+        job.status, job.error = "error", f"{type(e).__name__}: {e}"
+        with _lock:
+            _stats["failed"] += 1
+    finally:
+        job.finished = time.time()
+        try:
+            job.path.unlink()
+        except OSError:
+            pass
+
+
+def jobs_stats() -> dict:
+    with _lock:
+        return {**_stats, "pending": _pending(), "tracked": len(_jobs), "workers": WORKERS}
+
+
+metrics.register_stats("stt_jobs", jobs_stats)
@@ -0,0 +1,241 @@
+# stt/longform.py
+# Transcriere paralelă pentru audio lung: buffer-ul de 16 kHz e tăiat la pauzele detectate de VAD
+# în bucăți de ~30 s cu suprapuneri mici; bucățile sunt transcrise într-un pool de procese
+# (fiecare proces cu modelul lui) și lipite la loc în ordine, cu deduplicarea suprapunerilor.
+from __future__ import annotations
+from concurrent.futures import Future, ProcessPoolExecutor, as_completed
+from typing import Callable, Optional
+import atexit, math, multiprocessing, os, re, threading, time
+
+from config import STT_CHUNK_S, STT_CHUNK_MAX_S, STT_CHUNK_OVERLAP_S, STT_LONGFORM_WORKERS
+from infra import metrics
+from stt import whisper_pool
+from stt.audio import DecodedAudio
+
+
+def _auto_workers() -> int:
+    n = STT_LONGFORM_WORKERS
+    return n if n > 0 else max(1, (os.cpu_count() or 2) // 2)
+
+
+WORKERS = _auto_workers()
+# thread-uri CTranslate2 per proces: nucleele împărțite egal, fără suprasubscriere
+WORKER_CPU_THREADS = max(1, (os.cpu_count() or 2) // WORKERS)
+
+_stats = {"jobs": 0, "chunks": 0, "audio_s": 0.0, "wall_s": 0.0}
+_stats_lock = threading.Lock()
+
+
+# ---------------- segmentare ----------------
+def _speech_spans(samples) -> list[tuple[int, int]]:
+    """Intervalele cu vorbire (în eșantioane), după VAD-ul Silero inclus în faster-whisper."""
+    from faster_whisper.vad import VadOptions, get_speech_timestamps
+
+    ts = get_speech_timestamps(samples, VadOptions(min_silence_duration_ms=300))
+    return [(int(t["start"]), int(t["end"])) for t in ts]
+
+
+def plan_chunks(
+    audio: DecodedAudio,
+    target_s: float = STT_CHUNK_S,
+    max_s: float = STT_CHUNK_MAX_S,
+    overlap_s: float = STT_CHUNK_OVERLAP_S,
+) -> list[tuple[int, int]]:
+    """
+    Limitele bucăților (start, end) în eșantioane, cu suprapunere inclusă.
+    Tăietura cade la mijlocul primei pauze după `target_s`; fără pauză până la `max_s` -> tăietură fixă.
+    """
+    n = len(audio.samples)
+    sr = audio.sample_rate
+    target, hard, overlap = int(target_s * sr), int(max_s * sr), int(overlap_s * sr)
+    if n <= hard:
+        return [(0, n)]
+
+    try:
+        spans = _speech_spans(audio.samples)
+    except ImportError:
+        spans = []
+    # candidații de tăiere: mijlocul fiecărei pauze dintre două intervale de vorbire
+    cuts = [(a_end + b_start) // 2 for (_, a_end), (b_start, _) in zip(spans, spans[1:])]
+
+    bounds, start, i = [], 0, 0
+    while n - start > hard:
+        while i < len(cuts) and cuts[i] - start < target:
+            i += 1
+        if i < len(cuts) and cuts[i] - start <= hard:
+            end = cuts[i]
+            i += 1
+        else:
+            end = start + hard
+        bounds.append((start, end))
+        start = end
+    bounds.append((start, n))
+    return [(max(0, s - overlap), min(n, e + overlap)) for s, e in bounds]
+
+
+# ---------------- lipire ----------------
+def _norm_word(w: str) -> str:
+    return re.sub(r"[^\w]", "", w.lower())
+
+
+def stitch(texts: list[str], max_overlap_words: int = 12) -> str:
+    """Concatenează textele bucăților; cuvintele repetate din zona de suprapunere apar o singură dată."""
+    out: list[str] = []
+    for text in texts:
+        words = text.split()
+        k = min(max_overlap_words, len(out), len(words))
+        while k > 0:
+            if [_norm_word(w) for w in out[-k:]] == [_norm_word(w) for w in words[:k]]:
+                break
+            k -= 1
+        out.extend(words[k:])
+    return " ".join(out)
+
+
+# ---------------- pool de procese ----------------
+_WORKER_MODEL = None
+
+
+def _init_worker(size: str, compute_type: str, cpu_threads: int) -> None:
+    # rulează o dată per proces: fiecare worker își ține propriul model
+    global _WORKER_MODEL
+    from faster_whisper import WhisperModel
+
+    _WORKER_MODEL = WhisperModel(
+        size, device=whisper_pool.DEVICE, compute_type=compute_type, cpu_threads=cpu_threads, num_workers=1,
+    )
+
+
+def _run_chunk(model, samples, options: dict) -> tuple[str, float, int, Optional[str]]:
+    segments, info = model.transcribe(samples, **options)
+    parts, logprob, count = [], 0.0, 0
+    for seg in segments:
+        t = (seg.text or "").strip()
+        if t:
+            parts.append(t)
+        if getattr(seg, "avg_logprob", None) is not None:
+            logprob += seg.avg_logprob
+            count += 1
+    return " ".join(parts), logprob, count, getattr(info, "language", None)
+
+
+def _worker_chunk(idx: int, samples, options: dict):
+    return (idx, *_run_chunk(_WORKER_MODEL, samples, options))
+
+
+def _worker_file(samples, options: dict):
+    return _run_chunk(_WORKER_MODEL, samples, options)
+
+
+_pools: dict[tuple[str, str], ProcessPoolExecutor] = {}
+_pools_lock = threading.Lock()
+
+
+def _pool(size: str, compute_type: str) -> ProcessPoolExecutor:
+    key = (size, compute_type)
+    with _pools_lock:
+        ex = _pools.get(key)
+        if ex is None:
+            # spawn: procesele nu moștenesc thread-urile / starea CTranslate2 a părintelui
+            ex = _pools[key] = ProcessPoolExecutor(
+                max_workers=WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(size, compute_type, WORKER_CPU_THREADS),
+            )
+        return ex
+
+
+def shutdown() -> None:
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for ex in pools:
+        ex.shutdown(wait=False, cancel_futures=True)
+
+
+atexit.register(shutdown)
+
+
+# ---------------- API ----------------
+def submit(samples, options: dict, model_size: str, compute_type: str = whisper_pool.COMPUTE_TYPE) -> Future:
+    """Un fișier întreg pe un proces din pool (transcriere în lot) -> Future[(text, logprob_sum, n_seg, limbă)]."""
+    return _pool(model_size, compute_type).submit(_worker_file, samples, options)
+
+
+def transcribe_long(
+    audio: DecodedAudio,
+    options: dict,
+    model_size: str,
+    compute_type: str = whisper_pool.COMPUTE_TYPE,
+    on_chunk: Callable[[int, int, float, float, str], None] | None = None,
+    cancel: threading.Event | None = None,
+) -> tuple[str, float, dict]:
+    """
+    Transcrie `audio` pe bucăți, în paralel. `options` = argumentele pentru model.transcribe().
+    `on_chunk(index, total, start_s, end_s, text)` e apelat pe măsură ce bucățile se termină (nu neapărat în ordine).
+    Returnează (text, durată_secunde, info_dict) ca _offline_whisper_transcribe.
+    `cancel` setat -> bucățile încă nepornite sunt anulate, textul conține doar ce s-a terminat.
+    """
+    t0 = time.perf_counter()
+    with metrics.stage("stt_chunking"):
+        bounds = plan_chunks(audio)
+    total = len(bounds)
+    results: list[tuple[str, float, int, Optional[str]] | None] = [None] * total
+
+    with metrics.stage("stt_longform"):
+        if total == 1 or WORKERS <= 1:
+            # o singură bucată / un singur worker: modelul partajat din proces, fără spawn
+            with whisper_pool.acquire(model_size, compute_type) as model:
+                for idx, (s, e) in enumerate(bounds):
+                    if cancel is not None and cancel.is_set():
+                        break
+                    results[idx] = _run_chunk(model, audio.samples[s:e], options)
+                    if on_chunk:
+                        on_chunk(idx, total, s / audio.sample_rate, e / audio.sample_rate, results[idx][0])
+        else:
+            ex = _pool(model_size, compute_type)
+            futs = [ex.submit(_worker_chunk, idx, audio.samples[s:e], options) for idx, (s, e) in enumerate(bounds)]
+            for fut in as_completed(futs):
+                if cancel is not None and cancel.is_set():
+                    for f in futs:
+                        f.cancel()
+                    break
+                idx, *res = fut.result()
+                results[idx] = tuple(res)
+                if on_chunk:
+                    s, e = bounds[idx]
+                    on_chunk(idx, total, s / audio.sample_rate, e / audio.sample_rate, res[0])
+
+    done = [r for r in results if r is not None]
+    text = stitch([r[0] for r in done])
+    logprob = sum(r[1] for r in done)
+    count = sum(r[2] for r in done)
+    langs = [r[3] for r in done if r[3]]
+    wall = time.perf_counter() - t0
+    dur = audio.duration
+    with _stats_lock:
+        _stats["jobs"] += 1
+        _stats["chunks"] += total
+        _stats["audio_s"] += dur
+        _stats["wall_s"] += wall
+    return text, dur, {
+        "detected_language": max(set(langs), key=langs.count) if langs else None,
+        "avg_logprob": logprob / count if count else -math.inf,
+        "duration": dur,
+        "chunks": total,
+        "workers": min(WORKERS, total),
+        "wall_s": round(wall, 3),
+        "realtime_factor": round(dur / wall, 2) if wall > 0 else None,
+    }
+
+
+def longform_stats() -> dict:
+    with _stats_lock:
+        s = dict(_stats)
+    s["workers"] = WORKERS
+    s["realtime_factor"] = round(s["audio_s"] / s["wall_s"], 2) if s["wall_s"] > 0 else None
+    return s
+
+
+metrics.register_stats("stt_longform", longform_stats)
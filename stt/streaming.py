@@ -0,0 +1,249 @@
+# stt/streaming.py
+# STT în timp real (WebSocket /ws/transcribe): cadre PCM -> segmentare VAD incrementală -> fiecare
+# segment închis e transcris de modelul faster-whisper deja încărcat (stt/whisper_pool.py).
+# Cât timp utilizatorul vorbește, segmentul deschis e transcris periodic, rapid (beam 1) -> rezultate parțiale.
+from __future__ import annotations
+from typing import Awaitable, Callable, Optional
+import asyncio, logging, os
+
+from config import (
+    STT_MAX_SECONDS_API, STT_STREAM_SILENCE_MS, STT_STREAM_MAX_SEGMENT_S, STT_STREAM_PARTIAL_MS,
+)
+from infra import metrics
+from stt import whisper_pool
+from stt.audio import SAMPLE_RATE
+
+log = logging.getLogger("smartlib.stt.streaming")
+
+FRAME_MS = 30
+_FRAME = SAMPLE_RATE * FRAME_MS // 1000
+_PRE_ROLL_FRAMES = 10          # 300 ms păstrate înainte de începutul vorbirii
+_MIN_SPEECH_FRAMES = 5         # sub 150 ms de vorbire = zgomot, segmentul e ignorat
+
+
+class SpeechSegmenter:
+    """
+    VAD incremental pe energie, cu prag adaptiv (nivelul zgomotului de fond urmărit pe cadrele fără vorbire).
+    feed() primește eșantioane float32 16 kHz și întoarce segmentele închise (vorbire + pauză >= silence_ms).
+    """
+
+    def __init__(self, silence_ms: int = STT_STREAM_SILENCE_MS, max_segment_s: float = STT_STREAM_MAX_SEGMENT_S):
+        import numpy as np
+
+        self._np = np
+        self.silence_frames = max(1, silence_ms // FRAME_MS)
+        self.max_frames = int(max_segment_s * 1000) // FRAME_MS
+        self.noise = 1e-3
+        self._tail = np.zeros(0, dtype=np.float32)      # rest sub un cadru
+        self._pre: list = []                             # cadre recente, înainte de vorbire
+        self._cur: list = []                             # segmentul deschis
+        self._speech_frames = 0
+        self._silence_run = 0
+        self.samples_seen = 0
+        self.seg_start = 0                               # eșantionul de început al segmentului deschis
+        self.trailing_silence_ms = 0                     # liniștea de după ultima vorbire (auto-end)
+
+    def _is_speech(self, frame) -> bool:
+        rms = float(self._np.sqrt(self._np.mean(frame * frame)) + 1e-9)
+        speech = rms > max(self.noise * 3.0, 0.01)
+        if not speech:
+            self.noise = 0.95 * self.noise + 0.05 * rms
+        return speech
+
+    def feed(self, samples) -> list[tuple[int, "object"]]:
+        np = self._np
+        buf = np.concatenate([self._tail, samples]) if len(self._tail) else samples
+        n = len(buf) // _FRAME
+        self._tail = buf[n * _FRAME:]
+        closed = []
+        for i in range(n):
+            frame = buf[i * _FRAME:(i + 1) * _FRAME]
+            pos = self.samples_seen
+            self.samples_seen += _FRAME
+            speech = self._is_speech(frame)
+            if not self._cur:
+                self.trailing_silence_ms = 0 if speech else self.trailing_silence_ms + FRAME_MS
+                if speech:
+                    self.seg_start = pos - len(self._pre) * _FRAME
+                    self._cur = self._pre + [frame]
+                    self._pre = []
+                    self._speech_frames, self._silence_run = 1, 0
+                else:
+                    self._pre = (self._pre + [frame])[-_PRE_ROLL_FRAMES:]
+                continue
+            self._cur.append(frame)
+            if speech:
+                self._speech_frames += 1
+                self._silence_run = 0
+            else:
+                self._silence_run += 1
+            if self._silence_run >= self.silence_frames or len(self._cur) >= self.max_frames:
+                seg = self._close()
+                if seg is not None:
+                    closed.append(seg)
+                self.trailing_silence_ms = self._silence_run * FRAME_MS
+        return closed
+
+    def _close(self):
+        cur, speech = self._cur, self._speech_frames
+        self._cur, self._speech_frames = [], 0
+        if speech < _MIN_SPEECH_FRAMES:
+            return None
+        return self.seg_start, self._np.concatenate(cur)
+
+    @property
+    def in_speech(self) -> bool:
+        return bool(self._cur)
+
+    @property
+    def open_len(self) -> int:
+        return len(self._cur) * _FRAME
+
+    def open_segment(self):
+        """Segmentul în curs (pentru rezultate parțiale) sau None."""
+        return self._np.concatenate(self._cur) if self._cur else None
+
+    def flush(self):
+        """Închide segmentul deschis (sfârșitul fluxului)."""
+        if not self._cur:
+            return None
+        if len(self._tail):
+            self._cur.append(self._tail)
+            self._tail = self._tail[:0]
+        return self._close()
+
+
+def transcribe_segment(samples, language: str = "auto", prompt: str = "", fast: bool = False) -> str:
+    """Un segment deja delimitat de VAD -> text, cu modelul partajat; fast = beam 1 (parțiale)."""
+    lang = None if (language or "auto").lower() == "auto" else language.lower()
+    with whisper_pool.acquire(os.getenv("FWHISPER_MODEL", "base")) as model:
+        segments, _ = model.transcribe(
+            samples,
+            language=lang,
+            task="transcribe",
+            vad_filter=False,                      # segmentarea e făcută deja
+            beam_size=1 if fast else 5,
+            temperature=0.0 if fast else [0.0, 0.2, 0.4],
+            condition_on_previous_text=False,
+            initial_prompt=prompt or None,         # finalele anterioare = context
+        )
+        return " ".join((s.text or "").strip() for s in segments).strip()
+
+
+Send = Callable[[dict], Awaitable[None]]
+
+
+class StreamingSession:
+    """
+    O sesiune WebSocket: `await feed(pcm)` pentru fiecare cadru binar, `await finish()` la final.
+    Mesaje trimise prin `send`: partial {segment, text}, final {segment, start, end, text}.
+    Finalele se transcriu în ordine, pe un singur task; parțialele doar când nu așteaptă nicio finală.
+    """
+
+    def __init__(self, send: Send, language: str = "auto", sample_rate: int = SAMPLE_RATE,
+                 encoding: str = "pcm16", auto_end_ms: int = 0):
+        import numpy as np
+
+        self._np = np
+        self.send = send
+        self.language = language
+        self.sample_rate = sample_rate
+        self.encoding = encoding
+        self.auto_end_ms = auto_end_ms
+        self.segmenter = SpeechSegmenter()
+        self.finals: list[str] = []
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._worker = asyncio.create_task(self._final_worker())
+        self._partial: Optional[asyncio.Task] = None
+        self._partial_at = 0
+        self._next_idx = 0
+        self.heard_speech = False
+
+    @property
+    def duration(self) -> float:
+        return self.segmenter.samples_seen / SAMPLE_RATE
+
+    def _to_float(self, data: bytes):
+        np = self._np
+        if self.encoding == "f32":
+            x = np.frombuffer(data[: len(data) // 4 * 4], dtype="<f4").astype(np.float32)
+        else:
+            x = np.frombuffer(data[: len(data) // 2 * 2], dtype="<i2").astype(np.float32) / 32768.0
+        if self.sample_rate != SAMPLE_RATE and len(x):
+            # reeșantionare liniară la 16 kHz (suficientă pentru vorbire)
+            n_out = int(round(len(x) * SAMPLE_RATE / self.sample_rate))
+            x = np.interp(np.linspace(0, len(x) - 1, n_out), np.arange(len(x)), x).astype(np.float32)
+        return x
+
+    async def feed(self, data: bytes) -> bool:
+        """Procesează un cadru; True dacă fluxul trebuie încheiat (limită de durată / liniște lungă după vorbire)."""
+        for start, samples in self.segmenter.feed(self._to_float(data)):
+            self._enqueue(start, samples)
+        if self.segmenter.in_speech:
+            self.heard_speech = True
+            n = self.segmenter.open_len
+            if n - self._partial_at >= STT_STREAM_PARTIAL_MS * SAMPLE_RATE // 1000 and self._queue.empty() \
+                    and (self._partial is None or self._partial.done()):
+                self._partial_at = n
+                self._partial = asyncio.create_task(
+                    self._send_partial(self._next_idx, self.segmenter.open_segment()),
+                )
+        if self.duration > STT_MAX_SECONDS_API:
+            return True
+        return bool(self.auto_end_ms and self.heard_speech and not self.segmenter.in_speech
+                    and self.segmenter.trailing_silence_ms >= self.auto_end_ms)
+
+    def _enqueue(self, start: int, samples) -> None:
+        self._queue.put_nowait((self._next_idx, start, samples))
+        self._next_idx += 1
+        self._partial_at = 0
+
+    async def _send_partial(self, idx: int, samples) -> None:
+        try:
+            with metrics.stage("stt_stream_partial"):
+                text = await asyncio.to_thread(transcribe_segment, samples, self.language, self._context(), True)
+        except Exception:
+            return   # parțialele sunt „best effort”
+        if text and idx == self._next_idx:   # segmentul încă deschis: altfel vine finala lui
+            await self.send({"type": "partial", "segment": idx, "text": text})
+
+    def _context(self) -> str:
+        return " ".join(self.finals)[-200:]
+
+    async def _final_worker(self) -> None:
+        while True:
+            item = await self._queue.get()
+            if item is None:
+                return
+            idx, start, samples = item
+            try:
+                with metrics.stage("stt_stream_final"):
+                    text = await asyncio.to_thread(transcribe_segment, samples, self.language, self._context())
+            except Exception as e:
+                # un segment eșuat nu oprește sesiunea: clientul află, următoarele segmente merg mai departe
+                log.warning("stream STT: segmentul %d eșuat: %s", idx, e)
+                await self.send({"type": "error", "segment": idx, "detail": f"{type(e).__name__}: {e}"})
+                continue
+            if text:
+                self.finals.append(text)
+            await self.send({
+                "type": "final", "segment": idx, "text": text,
+                "start": round(start / SAMPLE_RATE, 2), "end": round((start + len(samples)) / SAMPLE_RATE, 2),
+            })
+
+    async def finish(self) -> str:
+        """Închide ultimul segment, așteaptă finalele rămase; întoarce transcrierea completă."""
+        seg = self.segmenter.flush()
+        if seg is not None:
+            self._enqueue(*seg)
+        if self._partial is not None:
+            self._partial.cancel()
+        self._queue.put_nowait(None)
+        await self._worker
+        return " ".join(self.finals).strip()
+
+    async def close(self) -> None:
+        # deconectare bruscă: oprește task-urile fără să mai trimită nimic
+        for t in (self._partial, self._worker):
+            if t is not None and not t.done():
+                t.cancel()
@@ -1,16 +1,24 @@
 # stt/transcribe.py
 # -*- coding: utf-8 -*-
 from __future__ import annotations
-from pathlib import Path
-from typing import Tuple, Optional, List
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Tuple, Optional, List
 
+import contextvars
 import os
-import io
 import math
+import threading
+import time
 
-# pydub pentru conversia robustă a audio (necesită ffmpeg în PATH – în Docker e instalat)
-from pydub import AudioSegment
-from pydub.utils import which
+from config import (
+    STT_TIMEOUT_S, STT_LONGFORM_MIN_S,
+    STT_RACE_DELAY_S, STT_RACE_MIN_WORDS, STT_RACE_MIN_LOGPROB, STT_RACE_LANGUAGES,
+)
+from infra import metrics
+from infra.resilience import resilient_call
+from stt import cache as stt_cache
+from stt import longform, whisper_pool
+from stt.audio import AudioSource, DecodedAudio, decode_audio
 
 # OpenAI client e injectat din UI (doar pentru online STT)
 # from openai import OpenAI  # NU crea client aici, îl primești ca argument
@@ -18,64 +26,26 @@ from pydub.utils import which
 # --------- Setări generale ----------
 SUPPORTED_AUDIO_TYPES = {"mp3", "wav", "m4a", "ogg", "flac", "webm"}
 
-# Asigură binarele ffmpeg/ffprobe pentru pydub
-AudioSegment.converter = which("ffmpeg") or "ffmpeg"
-AudioSegment.ffprobe   = which("ffprobe") or "ffprobe"
-
-
-def audio_duration_seconds(p: Path) -> float:
-    """Durata estimată a fișierului audio (secunde)."""
-    seg = AudioSegment.from_file(p)
-    return len(seg) / 1000.0
-
-
-def _convert_to_wav16k_mono(src_path: Path) -> Path:
-    """
-    Convertor sigur -> WAV, 16kHz, mono, 16-bit PCM (format optim pentru STT).
-    Returnează calea către fișierul convertit.
-    """
-    seg = AudioSegment.from_file(src_path)
-    seg = seg.set_frame_rate(16000).set_channels(1).set_sample_width(2)  # 16-bit
-    out_path = src_path.with_suffix(".stt16.wav")
-    seg.export(out_path, format="wav")
-    return out_path
+def audio_duration_seconds(source: AudioSource) -> float:
+    """Durata (secunde) din numărul de eșantioane decodate; DecodedAudio nu se mai decodează."""
+    return decode_audio(source).duration
 
 
 # ---------------- OFFLINE (faster-whisper) ----------------
-def _offline_whisper_transcribe(
-    wav16_mono_path: Path,
-    language: str = "auto",
-    model_size: str = None,
-) -> Tuple[str, float, dict]:
-    """
-    Transcriere offline cu faster-whisper.
-    Returnează: (text, durată_secunde, info_dict)
-    """
-    try:
-        from faster_whisper import WhisperModel
-    except ImportError:
-        raise RuntimeError("Lipsete faster-whisper. Instalează: pip install faster-whisper")
-
-    if model_size is None:
-        model_size = os.getenv("FWHISPER_MODEL", "base")  # tiny/base/small
+_OFFLINE_PROMPT = (
+    "Context: discuție despre cărți, recomandări de lectură, autori, personaje, genuri. "
+    "Termeni precum: carte, roman, distopie, fantasy, magie, Tolkien, Orwell, Huxley, "
+    "detectiv, crimă, sf, prietenie, aventură, dragoste, război."
+)
 
-    # Compute type: int8 pentru CPU e ok; dacă ai AVX, e rapid; small = mai precis
-    model = WhisperModel(model_size, device="cpu", compute_type="int8")
 
+def _offline_options(language: str = "auto") -> dict:
     # Heuristici bune pentru vorbire casual:
     # - vad_filter: reduce părți cu zgomot
     # - beam_size: 5 → acuratețe mai bună
     # - language: "ro" forțează limba; None = autodetect
     lang = None if (language is None or language.lower() == "auto") else language.lower()
-
-    initial_prompt = (
-        "Context: discuție despre cărți, recomandări de lectură, autori, personaje, genuri. "
-        "Termeni precum: carte, roman, distopie, fantasy, magie, Tolkien, Orwell, Huxley, "
-        "detectiv, crimă, sf, prietenie, aventură, dragoste, război."
-    )
-
-    segments, info = model.transcribe(
-        str(wav16_mono_path),
+    return dict(
         language=lang,
         task="transcribe",
         vad_filter=True,
@@ -84,20 +54,52 @@ def _offline_whisper_transcribe(
         best_of=5,
         temperature=[0.0, 0.2, 0.4],
         condition_on_previous_text=True,
-        initial_prompt=initial_prompt,
+        initial_prompt=_OFFLINE_PROMPT,
     )
 
+
+# on_segment({"start", "end", "text", "progress"}) — segmente parțiale pe măsură ce sunt gata
+SegmentCallback = Callable[[dict], None]
+
+
+def _offline_whisper_transcribe(
+    audio: DecodedAudio,
+    language: str = "auto",
+    model_size: str = None,
+    on_segment: Optional[SegmentCallback] = None,
+    cancel: Optional[threading.Event] = None,
+) -> Tuple[str, float, dict]:
+    """
+    Transcriere offline cu faster-whisper.
+    Returnează: (text, durată_secunde, info_dict)
+    `cancel` setat -> decodarea se oprește la următorul segment (rezultat parțial).
+    """
+    if model_size is None:
+        model_size = os.getenv("FWHISPER_MODEL", "base")  # tiny/base/small
+
     text_parts: List[str] = []
     avg_logprob = 0.0
     seg_count = 0
-    for seg in segments:
-        t = (seg.text or "").strip()
-        if t:
-            text_parts.append(t)
-        # avg_logprob nu e mereu prezent, dar îl colectăm când există
-        if hasattr(seg, "avg_logprob") and seg.avg_logprob is not None:
-            avg_logprob += seg.avg_logprob
-            seg_count += 1
+    # modelul (int8 pe CPU) e încărcat o singură dată per proces; segmentele sunt leneșe,
+    # deci decodarea are loc în bucla de mai jos, cât timp ținem slotul din pool
+    with whisper_pool.acquire(model_size) as model:
+        segments, info = model.transcribe(
+            audio.samples,                   # array float32 16 kHz: fără citire de pe disc
+            **_offline_options(language),
+        )
+        for seg in segments:
+            if cancel is not None and cancel.is_set():
+                break
+            t = (seg.text or "").strip()
+            if t:
+                text_parts.append(t)
+                if on_segment:
+                    on_segment({"start": seg.start, "end": seg.end, "text": t,
+                                "progress": min(1.0, seg.end / audio.duration) if audio.duration else 1.0})
+            # avg_logprob nu e mereu prezent, dar îl colectăm când există
+            if hasattr(seg, "avg_logprob") and seg.avg_logprob is not None:
+                avg_logprob += seg.avg_logprob
+                seg_count += 1
 
     text = " ".join(text_parts).strip()
     if seg_count > 0:
@@ -105,7 +107,7 @@ def _offline_whisper_transcribe(
     else:
         avg_logprob = -math.inf
 
-    dur = audio_duration_seconds(wav16_mono_path)
+    dur = audio.duration
     info_dict = {
         "detected_language": getattr(info, "language", None),
         "avg_logprob": avg_logprob,
@@ -116,7 +118,7 @@ def _offline_whisper_transcribe(
 
 # ---------------- ONLINE (OpenAI) ----------------
 def _online_openai_transcribe(
-    wav16_mono_path: Path,
+    audio: DecodedAudio,
     client,
     model: str = "gpt-4o-mini-transcribe",
     language: str = "auto",
@@ -128,57 +130,206 @@ def _online_openai_transcribe(
     prompt_hint = (
         "Context: recomandări de cărți, autori, personaje, genuri, teme ca distopie, fantasy, magie, crimă."
     )
-    with open(wav16_mono_path, "rb") as f:
+    # retry-urile le face infra.resilience; SDK-ul nu mai reîncearcă în paralel
+    client = client.with_options(max_retries=0) if hasattr(client, "with_options") else client
+    used_model = model
+    # WAV construit în memorie; fiecare retry re-trimite aceiași bytes
+    wav_file = ("audio.wav", audio.to_wav_bytes(), "audio/wav")
+    with metrics.stage("stt_online"):
+        def _create(**kw):
+            return client.audio.transcriptions.create(file=wav_file, **kw)
+
         try:
-            resp = client.audio.transcriptions.create(
+            resp = resilient_call(
+                "stt", _create, timeout=STT_TIMEOUT_S,
                 model=model,
-                file=f,
                 language=lang_arg,           # respectă limba când e setată
                 prompt=prompt_hint
             )
             text = getattr(resp, "text", "") or ""
         except Exception:
             # fallback robust
-            f.seek(0)
-            resp = client.audio.transcriptions.create(
+            used_model = "whisper-1"
+            resp = resilient_call(
+                "stt", _create, timeout=STT_TIMEOUT_S,
                 model="whisper-1",
-                file=f,
                 language=lang_arg,
                 prompt=prompt_hint
             )
             text = getattr(resp, "text", "") or ""
 
-    dur = audio_duration_seconds(wav16_mono_path)
-    return text.strip(), dur, {"engine": "openai", "model": model, "language": lang_arg}
+    dur = audio.duration
+    metrics.record_cost("stt", used_model, metrics.audio_minutes_cost(used_model, dur))
+    return text.strip(), dur, {"engine": "openai", "model": used_model, "language": lang_arg}
 
 
 # ---------------- API principală ----------------
-def transcribe_file(
-    audio_path: Path,
-    engine: str = "offline",               # "offline" | "openai"
-    client=None,
-    model: str = "gpt-4o-mini-transcribe", # doar pentru online
-    language: str = "auto",                # "auto" sau cod ISO ("ro", "en", ...)
+def _looks_bad(text: str) -> bool:
+    # gol sau „gibberish” (prea puține cuvinte)
+    return (not text) or (len(text.split()) <= 2)
+
+
+def _chunk_reporter(on_segment: Optional[SegmentCallback]):
+    # longform raportează bucăți (index, total, bounds, text) -> segmente cu progres = bucăți gata / total
+    if on_segment is None:
+        return None
+    done = [0]
+
+    def report(idx: int, total: int, start_s: float, end_s: float, text: str) -> None:
+        done[0] += 1
+        on_segment({"start": start_s, "end": end_s, "text": text, "progress": done[0] / total})
+    return report
+
+
+def _offline(
+    audio: DecodedAudio,
+    language: str,
+    long_form: Optional[bool],
+    on_segment: Optional[SegmentCallback] = None,
+    cancel: Optional[threading.Event] = None,
+) -> Tuple[str, float, dict]:
+    model_size = os.getenv("FWHISPER_MODEL", "base")
+    if long_form is None:
+        long_form = audio.duration >= STT_LONGFORM_MIN_S
+    with metrics.stage("stt_offline"):
+        if long_form:
+            return longform.transcribe_long(
+                audio, _offline_options(language), model_size,
+                on_chunk=_chunk_reporter(on_segment), cancel=cancel,
+            )
+        return _offline_whisper_transcribe(
+            audio, language=language, model_size=model_size, on_segment=on_segment, cancel=cancel,
+        )
+
+
+# ---------------- RACE (offline + online pornit cu întârziere) ----------------
+RACE_WINS = metrics.counter("stt_race_total", "Curse STT offline/online, după câștigător.", ("winner",))
+RACE_SECONDS = metrics.histogram(
+    "stt_race_path_seconds", "Latența fiecărui drum din cursa STT (de la startul cursei).", ("engine", "outcome"),
+)
+_race_pool = ThreadPoolExecutor(max_workers=max(4, 2 * whisper_pool.POOL_SIZE), thread_name_prefix="stt-race")
+_race_lock = threading.Lock()
+_race_stats = {"races": 0, "offline_wins": 0, "online_wins": 0, "no_winner": 0, "online_started": 0}
+
+
+def _passes_quality(text: str, info: dict, language: str) -> bool:
+    """Număr minim de cuvinte, avg_logprob (doar offline îl are) și limba detectată."""
+    if len((text or "").split()) < STT_RACE_MIN_WORDS:
+        return False
+    lp = info.get("avg_logprob")
+    if lp is not None and lp < STT_RACE_MIN_LOGPROB:
+        return False
+    detected = info.get("detected_language")
+    want = None if (language is None or language.lower() == "auto") else language.lower()
+    allowed = {want} if want else set(STT_RACE_LANGUAGES)
+    return not (detected and allowed and detected not in allowed)
+
+
+def _race_transcribe(
+    audio: DecodedAudio,
+    client,
+    model: str,
+    language: str,
+    long_form: Optional[bool],
+    on_segment: Optional[SegmentCallback] = None,
 ) -> Tuple[str, float]:
     """
-    Transcrie fișierul audio cu engine-ul selectat. Întoarce (text, durata_secunde).
-    Face conversia la WAV 16k mono înainte de transcriere.
-    Dacă offline produce text „gibberish”, face fallback la online (dacă există client).
+    Pornește offline; după STT_RACE_DELAY_S (sau imediat, dacă offline a terminat deja prost) pornește și online.
+    Primul rezultat care trece _passes_quality câștigă; offline e oprit prin `cancel`, iar răspunsul online
+    întârziat e ignorat (cererea HTTP deja trimisă nu poate fi retrasă).
     """
-    audio_path = Path(audio_path)
-    wav_path = _convert_to_wav16k_mono(audio_path)
-
-    if engine.lower().startswith("off"):
-        text, dur, info = _offline_whisper_transcribe(
-            wav_path,
-            language=language,
-            model_size=os.getenv("FWHISPER_MODEL", "base")
-        )
+    if client is None:
+        raise RuntimeError("Ai ales engine='race' dar nu ai furnizat client OpenAI.")
+    cancel = threading.Event()
+    t0 = time.perf_counter()
+
+    def run(engine: str):
+        try:
+            if engine == "offline":
+                out = _offline(audio, language, long_form, on_segment, cancel)
+            else:
+                out = _online_openai_transcribe(audio, client, model=model, language=language)
+        except Exception:
+            RACE_SECONDS.observe(time.perf_counter() - t0, engine=engine, outcome="error")
+            raise
+        ok = _passes_quality(out[0], out[2], language)
+        outcome = "cancelled" if engine == "offline" and cancel.is_set() else ("pass" if ok else "fail")
+        RACE_SECONDS.observe(time.perf_counter() - t0, engine=engine, outcome=outcome)
+        return out, ok and outcome != "cancelled"
+
+    def start(engine: str):
+        futs[_race_pool.submit(contextvars.copy_context().run, run, engine)] = engine
+
+    def won(f) -> bool:
+        return f.exception() is None and f.result()[1]
+
+    futs: dict = {}
+    with metrics.stage("stt_race"):
+        start("offline")
+        done, _ = wait(list(futs), timeout=STT_RACE_DELAY_S)
+        if not any(won(f) for f in done):
+            start("online")
+
+        winner, best, last_exc = None, None, None
+        pending = set(futs)
+        while pending and winner is None:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for f in done:
+                if f.exception() is not None:
+                    last_exc = f.exception()
+                    continue
+                out, ok = f.result()
+                if ok:
+                    winner, best = futs[f], out
+                    break
+                # niciun drum nu trece verificările -> cel mai „bogat” rezultat
+                if out[0] and (best is None or len(out[0].split()) > len(best[0].split())):
+                    best = out
+        cancel.set()
+
+    with _race_lock:
+        _race_stats["races"] += 1
+        _race_stats["online_started"] += int("online" in futs.values())
+        _race_stats[f"{winner}_wins" if winner else "no_winner"] += 1
+    RACE_WINS.inc(winner=winner or "none")
+    if best is None:
+        if last_exc is not None:
+            raise last_exc
+        return "", audio.duration
+    return best[0], best[1]
+
+
+def race_stats() -> dict:
+    with _race_lock:
+        s = dict(_race_stats)
+    n = s["races"] or 1
+    s["offline_win_rate"] = round(s["offline_wins"] / n, 3)
+    s["online_win_rate"] = round(s["online_wins"] / n, 3)
+    s["online_start_rate"] = round(s["online_started"] / n, 3)
+    return s
+
+
+metrics.register_stats("stt_race", race_stats)
+
+
+def _transcribe_decoded(
+    audio: DecodedAudio,
+    engine: str,
+    client,
+    model: str,
+    language: str,
+    long_form: Optional[bool],
+    on_segment: Optional[SegmentCallback] = None,
+) -> Tuple[str, float]:
+    if engine == "race":
+        return _race_transcribe(audio, client, model, language, long_form, on_segment)
+
+    if engine == "offline":
+        text, dur, info = _offline(audio, language, long_form, on_segment)
 
         # Fallback: dacă iese gol sau pare „gibberish” și avem client → încearcă online
-        bad = (not text) or (len(text.split()) <= 2)
-        if bad and client is not None:
-            text2, dur2, _ = _online_openai_transcribe(wav_path, client, model=model, language=language)
+        if _looks_bad(text) and client is not None:
+            text2, dur2, _ = _online_openai_transcribe(audio, client, model=model, language=language)
             return (text2 or text or ""), (dur2 if dur2 else dur)
 
         return text, dur
@@ -187,5 +338,94 @@ def transcribe_file(
         # Online direct
         if client is None:
             raise RuntimeError("Ai ales engine='openai' dar nu ai furnizat client OpenAI.")
-        text, dur, _ = _online_openai_transcribe(wav_path, client, model=model, language=language)
+        text, dur, _ = _online_openai_transcribe(audio, client, model=model, language=language)
         return text, dur
+
+
+def _engine_name(engine: str) -> str:
+    engine = (engine or "offline").lower()
+    if engine == "race":
+        return "race"
+    return "offline" if engine.startswith("off") else "openai"
+
+
+def _cache_model(engine: str, model: str) -> str:
+    size = os.getenv("FWHISPER_MODEL", "base")
+    return {"offline": size, "race": f"{size}+{model}"}.get(engine, model)
+
+
+def cached_transcript(
+    source: AudioSource,
+    engine: str = "offline",
+    model: str = "gpt-4o-mini-transcribe",
+    language: str = "auto",
+) -> Optional[Tuple[str, float]]:
+    """
+    (text, durata) din cache după octeții bruți (cale / bytes), fără decodare; None la miss.
+    Miss-ul nu e numărat aici: apelantul transcrie apoi (transcribe_file / run_batch), care îl numără o dată.
+    """
+    if not stt_cache.enabled():
+        return None
+    engine = _engine_name(engine)
+    raw = stt_cache.source_digest(source)
+    if raw is None:
+        return None
+    return stt_cache.get(stt_cache.make_key("raw", raw, engine, _cache_model(engine, model), language), count_miss=False)
+
+
+def transcribe_file(
+    audio_path: AudioSource,
+    engine: str = "offline",               # "offline" | "openai" | "race"
+    client=None,
+    model: str = "gpt-4o-mini-transcribe", # doar pentru online
+    language: str = "auto",                # "auto" sau cod ISO ("ro", "en", ...)
+    long_form: Optional[bool] = None,      # None = automat, după durată (STT_LONGFORM_MIN_S)
+    use_cache: bool = True,
+    decoded: Optional[DecodedAudio] = None,  # eșantioanele lui audio_path, dacă apelantul le are deja
+    on_segment: Optional[SegmentCallback] = None,
+) -> Tuple[str, float]:
+    """
+    Transcrie audio cu engine-ul selectat. Întoarce (text, durata_secunde).
+    `audio_path`: cale, bytes, file-like sau DecodedAudio (deja decodat: nu se mai decodează).
+    Decodarea la 16 kHz mono se face o singură dată, în memorie; ambele engine-uri folosesc același buffer.
+    Offline, audio lung (long_form) e tăiat la pauze și transcris în paralel (stt/longform.py).
+    Dacă offline produce text „gibberish”, face fallback la online (dacă există client).
+    engine="race": offline și online în paralel (online pornit după STT_RACE_DELAY_S), câștigă primul rezultat bun.
+    Rezultatele bune sunt ținute în stt/cache.py: același fișier nu mai e nici decodat, nici transcris.
+    """
+    engine = _engine_name(engine)
+    cache_model = _cache_model(engine, model)
+    use_cache = use_cache and stt_cache.enabled()
+    keys: list[str] = []
+
+    if use_cache:
+        if hasattr(audio_path, "read"):
+            audio_path = audio_path.read()   # file-like: citit o dată, folosit pentru hash și decodare
+        raw = stt_cache.source_digest(audio_path)
+        if raw is not None:
+            keys.append(stt_cache.make_key("raw", raw, engine, cache_model, language))
+            hit = stt_cache.get(keys[-1], count_miss=False)
+            if hit is not None:
+                return hit
+
+    if decoded is not None:
+        audio = decoded
+    else:
+        with metrics.stage("stt_decode"):
+            audio = decode_audio(audio_path)
+
+    if use_cache:
+        # același audio în alt container / re-encodat -> aceleași eșantioane
+        keys.append(stt_cache.make_key("pcm", audio.digest(), engine, cache_model, language))
+        hit = stt_cache.get(keys[-1], count_miss=False)
+        if hit is not None:
+            if len(keys) > 1:
+                stt_cache.put(keys[:-1], *hit)   # alias pentru octeții bruți: data viitoare fără decodare
+            return hit
+        stt_cache.record_miss()   # un singur miss per cerere, oricâte chei s-au încercat
+
+    text, dur = _transcribe_decoded(audio, engine, client, model, language, long_form, on_segment)
+    # rezultatele „gibberish” nu intră în cache: cu client disponibil, data viitoare ar merge pe fallback
+    if use_cache and not _looks_bad(text):
+        stt_cache.put(keys, text, dur)
+    return text, dur
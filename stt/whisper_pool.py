@@ -0,0 +1,136 @@
+# stt/whisper_pool.py
+# Registru de modele faster-whisper la nivel de proces: fiecare (mărime, compute_type) se încarcă
+# o singură dată; transcrierile concurente sunt servite de workerii CTranslate2 ai aceluiași model
+# (num_workers), limitate de un semafor dimensionat după nucleele CPU.
+from __future__ import annotations
+from contextlib import contextmanager
+from typing import Iterator
+import os, threading, time
+
+from config import FWHISPER_POOL_SIZE, FWHISPER_CPU_THREADS
+from infra import metrics
+
+
+def _auto_pool_size() -> int:
+    n = FWHISPER_POOL_SIZE
+    return n if n > 0 else max(1, min(4, (os.cpu_count() or 2) // 2))
+
+
+def _auto_cpu_threads(pool_size: int) -> int:
+    n = FWHISPER_CPU_THREADS
+    return n if n > 0 else max(1, (os.cpu_count() or 2) // pool_size)
+
+
+DEVICE = os.getenv("FWHISPER_DEVICE", "cpu")
+COMPUTE_TYPE = os.getenv("FWHISPER_COMPUTE_TYPE", "int8")
+POOL_SIZE = _auto_pool_size()
+CPU_THREADS = _auto_cpu_threads(POOL_SIZE)
+
+
+class _Entry:
+    def __init__(self, size: str, compute_type: str):
+        self.size = size
+        self.compute_type = compute_type
+        self.model = None
+        self.load_lock = threading.Lock()
+        self.slots = threading.BoundedSemaphore(POOL_SIZE)
+        self.stats = {"loads": 0, "load_ms": 0.0, "acquires": 0, "wait_ms_total": 0.0, "inflight": 0}
+
+
+_lock = threading.Lock()
+_entries: dict[tuple[str, str], _Entry] = {}
+
+
+def _entry(size: str, compute_type: str) -> _Entry:
+    key = (size, compute_type)
+    with _lock:
+        e = _entries.get(key)
+        if e is None:
+            e = _entries[key] = _Entry(size, compute_type)
+        return e
+
+
+def _load(e: _Entry):
+    if e.model is not None:
+        return e.model
+    with e.load_lock:
+        if e.model is None:
+            try:
+                from faster_whisper import WhisperModel
+            except ImportError:
+                raise RuntimeError("Lipsește faster-whisper. Instalează: pip install faster-whisper")
+            t0 = time.perf_counter()
+            with metrics.stage("stt_model_load"):
+                e.model = WhisperModel(
+                    e.size, device=DEVICE, compute_type=e.compute_type,
+                    cpu_threads=CPU_THREADS, num_workers=POOL_SIZE,
+                )
+            e.stats["loads"] += 1
+            e.stats["load_ms"] = round((time.perf_counter() - t0) * 1000.0, 1)
+    return e.model
+
+
+@contextmanager
+def acquire(size: str, compute_type: str = COMPUTE_TYPE) -> Iterator:
+    """
+    `with acquire("base") as model: ...` — modelul partajat + un slot din pool.
+    Segmentele întoarse de model.transcribe() sunt leneșe: consumă-le în interiorul blocului.
+    """
+    e = _entry(size, compute_type)
+    model = _load(e)
+    t0 = time.perf_counter()
+    e.slots.acquire()
+    waited = (time.perf_counter() - t0) * 1000.0
+    with _lock:
+        e.stats["acquires"] += 1
+        e.stats["wait_ms_total"] += waited
+        e.stats["inflight"] += 1
+    try:
+        yield model
+    finally:
+        with _lock:
+            e.stats["inflight"] -= 1
+        e.slots.release()
+
+
+def warm_up(sizes: list[str] | None = None, compute_type: str = COMPUTE_TYPE) -> dict[str, float]:
+    """Încarcă modelele și rulează o transcriere pe 1s de liniște (alocă buffer-ele CTranslate2)."""
+    import numpy as np
+
+    out = {}
+    for size in sizes or []:
+        t0 = time.perf_counter()
+        with acquire(size, compute_type) as model:
+            segments, _ = model.transcribe(np.zeros(16000, dtype=np.float32), beam_size=1)
+            list(segments)
+        out[size] = round((time.perf_counter() - t0) * 1000.0, 1)
+    return out
+
+
+def preload_sizes() -> list[str]:
+    """Mărimile din FWHISPER_PRELOAD (ex. „base,small”); gol = nimic la pornire."""
+    return [s.strip() for s in os.getenv("FWHISPER_PRELOAD", "").split(",") if s.strip()]
+
+
+def pool_stats() -> dict:
+    with _lock:
+        return {
+            "pool_size": POOL_SIZE,
+            "cpu_threads": CPU_THREADS,
+            "models": {f"{k[0]}/{k[1]}": {**e.stats, "loaded": e.model is not None} for k, e in _entries.items()},
+        }
+
+
+def _metric_lines() -> list[str]:
+    with _lock:
+        items = list(_entries.items())
+    return metrics.gauge_lines(
+        "whisper_inflight", "Transcrieri offline în curs, per model.",
+        {(("model", f"{k[0]}/{k[1]}"),): e.stats["inflight"] for k, e in items},
+    ) + metrics.gauge_lines(
+        "whisper_load_ms", "Durata încărcării modelului (o dată per proces).",
+        {(("model", f"{k[0]}/{k[1]}"),): e.stats["load_ms"] for k, e in items},
+    )
+
+
+metrics.register_collector(_metric_lines)
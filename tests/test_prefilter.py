@@ -0,0 +1,48 @@
+# tests/test_prefilter.py
+# Pre-filtrul local nu trebuie să blocheze cereri obișnuite de cărți (titluri, teme istorice, cuvinte care
+# doar încep cu un termen din listă); insultele evidente sunt blocate imediat, inclusiv deghizate.
+import pytest
+
+from safety.prefilter import fallback_match, is_blocked, is_blocked_fallback, normalize_for_filter
+
+BOOK_QUERIES = [
+    "Vreau Idiotul de Dostoievski",
+    "The Hate U Give",
+    "o carte despre Hitler și al doilea război mondial",
+    "carte despre nazism",
+    "o carte despre ură și iubire",
+    "Ura! am terminat",
+    "rețete cu shiitake",
+    "un roman despre un uragan",
+    "ceva ca 1984 de Orwell",
+]
+
+
+@pytest.mark.parametrize("query", BOOK_QUERIES)
+def test_book_queries_are_not_blocked_before_moderation(query):
+    assert not is_blocked(query)
+
+
+@pytest.mark.parametrize("query", [
+    "Vreau Idiotul de Dostoievski",
+    "carte despre nazism",
+    "rețete cu shiitake",
+    "un roman despre un uragan",
+    "whatever",
+])
+def test_fallback_matches_whole_words_only(query):
+    assert fallback_match(query) is None
+
+
+@pytest.mark.parametrize("query", ["esti un idiot", "ce prost", "I hate this", "F.U.C.K off", "sh1t"])
+def test_fallback_catches_ambiguous_terms_when_moderation_is_unavailable(query):
+    assert is_blocked_fallback(query)
+
+
+@pytest.mark.parametrize("query", ["n1gger", "N I G G E R", "niiiigger", "jidan"])
+def test_slurs_are_blocked_immediately(query):
+    assert is_blocked(query)
+
+
+def test_normalize_keeps_digits_only_tokens():
+    assert normalize_for_filter("Cărți ca 1984!") == "carti ca 1984!"
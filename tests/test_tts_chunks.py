@@ -0,0 +1,74 @@
+# tests/test_tts_chunks.py
+# Limita de durată și împărțirea în bucăți pentru TTS (tts/synth.py): cazurile de margine.
+from tts.synth import audio_seconds, clip_text, estimate_seconds, plan_chunks
+
+LONG_SENTENCE = " ".join(f"cuvânt{i}" for i in range(200)) + "."
+
+
+def test_clip_single_sentence_longer_than_limit_is_cut_on_words():
+    text, truncated = clip_text(LONG_SENTENCE, "openai", 180, max_seconds=10)
+    assert truncated
+    assert text and LONG_SENTENCE.startswith(text)
+    assert estimate_seconds(text, "openai") <= 10
+
+
+def test_clip_text_without_punctuation():
+    raw = LONG_SENTENCE.rstrip(".")
+    text, truncated = clip_text(raw, "offline", 180, max_seconds=5)
+    assert truncated
+    assert raw.startswith(text)
+    assert len(text.split()) == 15   # 180 cuvinte / minut -> 15 cuvinte în 5 s
+
+
+def test_clip_keeps_short_text_untouched():
+    assert clip_text("Scurt. Foarte scurt.", "openai", 180, max_seconds=150) == ("Scurt. Foarte scurt.", False)
+    assert clip_text(LONG_SENTENCE, "openai", 180, max_seconds=0) == (LONG_SENTENCE, False)
+
+
+def test_plan_text_without_punctuation_is_split_on_words():
+    raw = LONG_SENTENCE.rstrip(".")
+    chunks = plan_chunks(raw, first_chars=50, max_chars=120)
+    assert len(chunks) > 1
+    assert len(chunks[0]) <= 50
+    assert all(len(c) <= 120 for c in chunks[1:])
+    assert " ".join(chunks) == raw
+
+
+def test_plan_first_sentence_longer_than_first_chunk():
+    first = "Aceasta este o primă frază destul de lungă, care depășește limita primei bucăți."
+    text = f"{first} A doua. A treia frază."
+    chunks = plan_chunks(text, first_chars=30, max_chars=400)
+    assert len(chunks[0]) <= 30
+    assert " ".join(chunks) == text
+    # restul primei fraze și frazele următoare încap într-o singură bucată normală
+    assert len(chunks) == 2
+
+
+def test_plan_single_word_longer_than_limit_stays_whole():
+    word = "x" * 80
+    assert plan_chunks(f"{word} scurt", first_chars=20, max_chars=40) == [word, "scurt"]
+
+
+def test_plan_empty_text():
+    assert plan_chunks("") == []
+    assert plan_chunks("   \n  ") == []
+
+
+def test_audio_seconds_mp3_constant_bitrate(tmp_path):
+    # antet ID3 gol + cadre MPEG-1 Layer III la 128 kbps: 16000 octeți = 1 s
+    frame = bytes([0xFF, 0xFB, 0x90, 0x00])
+    p = tmp_path / "a.mp3"
+    p.write_bytes(b"ID3\x04\x00\x00\x00\x00\x00\x00" + frame + b"\x00" * (16000 - len(frame)))
+    assert abs(audio_seconds(p) - 1.0) < 1e-6
+
+
+def test_audio_seconds_wav(tmp_path):
+    import wave
+
+    p = tmp_path / "a.wav"
+    with wave.open(str(p), "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(8000)
+        w.writeframes(b"\x00\x00" * 4000)
+    assert audio_seconds(p) == 0.5
@@ -0,0 +1,130 @@
+# tools/reco_store.py
+# Store pentru recomandări pre-generate offline (câte un corp canonic per carte din catalog).
+# Format: JSONL append-only; ultima linie pentru un titlu câștigă. Cheie: titlu + hash-ul conținutului.
+from __future__ import annotations
+from pathlib import Path
+import hashlib, json, os, threading, time
+
+from infra import metrics
+from tools.summary_tool import get_catalog_entry, get_summary_by_title
+
+STORE_PATH = Path(os.getenv("RECO_STORE_PATH", "data/reco_store.jsonl"))
+
+_lock = threading.Lock()
+_index: dict[str, dict] | None = None
+_hash_memo: dict[tuple[str, str], str] = {}
+_stats = {"hits": 0, "misses": 0, "stale": 0}
+
+
+def _norm(s: str) -> str:
+    return " ".join((s or "").strip().lower().split())
+
+
+def book_hash(title: str, salt: str = "") -> str:
+    """
+    Hash stabil al conținutului din care se generează recomandarea unei cărți
+    (intrarea din catalog + rezumatul tool-ului + `salt` = model / versiune prompt).
+    """
+    key = (_norm(title), salt)
+    h = _hash_memo.get(key)
+    if h is not None:
+        return h
+    entry = get_catalog_entry(title) or {}
+    raw = json.dumps({
+        "t": _norm(title),
+        "s": entry.get("summary", ""),
+        "f": entry.get("full_summary", ""),
+        "th": entry.get("themes", []),
+        "tool": get_summary_by_title(title),
+        "salt": salt,
+    }, ensure_ascii=False, sort_keys=True)
+    h = hashlib.sha1(raw.encode("utf-8")).hexdigest()
+    _hash_memo[key] = h
+    return h
+
+
+def _load() -> dict[str, dict]:
+    global _index
+    if _index is not None:
+        return _index
+    idx: dict[str, dict] = {}
+    if STORE_PATH.exists():
+        with STORE_PATH.open(encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    rec = json.loads(line)
+                except ValueError:
+                    continue  # linie trunchiată (job întrerupt) -> ignorată
+                if rec.get("title") and rec.get("body"):
+                    idx[_norm(rec["title"])] = rec
+    _index = idx
+    return idx
+
+
+def reload() -> int:
+    """Re-citește store-ul de pe disc (ex. după rularea jobului batch). Întoarce nr. de intrări."""
+    global _index
+    with _lock:
+        _index = None
+        _hash_memo.clear()
+        return len(_load())
+
+
+def lookup(title: str, expected_hash: str) -> dict | None:
+    """Intrarea pre-generată pentru `title`, doar dacă a fost generată din conținutul curent."""
+    with _lock:
+        rec = _load().get(_norm(title))
+        if rec is None:
+            _stats["misses"] += 1
+        elif rec.get("hash") != expected_hash:
+            _stats["stale"] += 1
+            rec = None
+        else:
+            _stats["hits"] += 1
+    metrics.record_cache("reco_store", rec is not None)
+    return rec
+
+
+def has_fresh(title: str, expected_hash: str) -> bool:
+    with _lock:
+        rec = _load().get(_norm(title))
+    return bool(rec) and rec.get("hash") == expected_hash
+
+
+def put(title: str, book_hash_: str, body: str, **extra) -> dict:
+    """Adaugă (append) o intrare; scrierea unei linii întregi face jobul reluabil după întrerupere."""
+    rec = {"title": title, "hash": book_hash_, "body": body, "created": int(time.time()), **extra}
+    line = json.dumps(rec, ensure_ascii=False) + "\n"
+    with _lock:
+        STORE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        with STORE_PATH.open("a", encoding="utf-8") as f:
+            f.write(line)
+            f.flush()
+            os.fsync(f.fileno())
+        _load()[_norm(title)] = rec
+    return rec
+
+
+def compact(keep_titles: list[str] | None = None) -> int:
+    """Rescrie store-ul cu o singură linie per titlu (opțional doar titlurile din catalog)."""
+    with _lock:
+        idx = _load()
+        keep = {_norm(t) for t in keep_titles} if keep_titles is not None else None
+        recs = [r for k, r in idx.items() if keep is None or k in keep]
+        tmp = STORE_PATH.with_suffix(STORE_PATH.suffix + ".tmp")
+        STORE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        with tmp.open("w", encoding="utf-8") as f:
+            for r in recs:
+                f.write(json.dumps(r, ensure_ascii=False) + "\n")
+        os.replace(tmp, STORE_PATH)
+        idx.clear()
+        idx.update({_norm(r["title"]): r for r in recs})
+        return len(recs)
+
+
+def store_stats() -> dict:
+    with _lock:
+        return {**_stats, "entries": len(_index or {})}
@@ -96,6 +96,16 @@ def _yaml_lookup(title: str) -> str | None:
     return None
 
 
+def get_catalog_entry(title: str) -> dict | None:
+    """Intrarea brută din YAML (summary, full_summary, themes) pentru un titlu, sau None."""
+    _yaml_lookup(title)  # populează cache-ul YAML
+    key = _norm(title)
+    for b in _YAML_CACHE or []:
+        if isinstance(b, dict) and _norm(b.get("title", "")) == key:
+            return b
+    return None
+
+
 # index pentru căutare case-insensitive
 _INDEX = {_norm(t): t for t in DETAILED_SUMMARIES.keys()}
 
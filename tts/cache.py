@@ -0,0 +1,127 @@
+# tts/cache.py
+# Cache adresat după conținut pentru audio TTS: cheie = hash(text + motor + voce/viteză/volum + format).
+# Fișierele stau sub AUDIO_DIR/tts_cache/<k[:2]>/<cheie>.<fmt>, cu metadate alături (<cheie>.json);
+# scrierile sunt atomice (tmp + os.replace), iar peste TTS_CACHE_MB se șterg cele folosite cel mai demult.
+from __future__ import annotations
+from pathlib import Path
+from typing import Optional
+import hashlib, json, os, threading, time, uuid
+
+from config import TTS_CACHE_ENABLED, TTS_CACHE_DIR, TTS_CACHE_MB
+from infra import metrics
+
+_lock = threading.Lock()
+_disk_bytes: Optional[int] = None   # calculat leneș la prima scriere
+_stats = {"hits": 0, "misses": 0, "writes": 0, "evictions": 0}
+# fișierele folosite în ultimele minute nu se evacuează: alt proces (UI / API) poate fi chiar pe cale să le redea
+_EVICT_GRACE_S = 300
+
+
+def enabled() -> bool:
+    return TTS_CACHE_ENABLED
+
+
+def make_key(engine: str, text: str, **params) -> str:
+    # params: doar ce schimbă audio-ul pentru motorul dat (openai: voce, format; offline: viteză, volum)
+    raw = json.dumps([engine, text, sorted(params.items())], ensure_ascii=False)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def _path(key: str, fmt: str) -> Path:
+    return Path(TTS_CACHE_DIR) / key[:2] / f"{key}.{fmt}"
+
+
+def tmp_path(key: str, fmt: str) -> Path:
+    """Fișier de lucru unic, în același director cu destinația (os.replace rămâne atomic)."""
+    p = _path(key, fmt)
+    p.parent.mkdir(parents=True, exist_ok=True)
+    return p.with_name(f"{key}.{uuid.uuid4().hex}.tmp.{fmt}")
+
+
+def get(key: str, fmt: str) -> Optional[tuple[Path, float, bool]]:
+    """(cale, durată_secunde, tăiat) pentru audio deja sintetizat; None la miss."""
+    p = _path(key, fmt)
+    meta = p.with_suffix(".json")
+    try:
+        rec = json.loads(meta.read_text(encoding="utf-8"))
+        hit = (p, float(rec["duration"]), bool(rec["truncated"]))
+        os.utime(p)   # mtime = ultima folosire (LRU); ridică OSError dacă audio-ul lipsește
+        if not p.exists():   # evacuat de alt proces între utime și verificare
+            hit = None
+    except (OSError, ValueError, KeyError, TypeError):
+        hit = None
+    with _lock:
+        _stats["hits" if hit is not None else "misses"] += 1
+    metrics.record_cache("tts", hit is not None)
+    return hit
+
+
+def _scan_disk() -> int:
+    root = Path(TTS_CACHE_DIR)
+    if not root.exists():
+        return 0
+    return sum(p.stat().st_size for p in root.glob("*/*") if p.suffix != ".json" and ".tmp." not in p.name)
+
+
+def _evict(limit: int, keep: Path) -> None:
+    # fișierele audio cele mai vechi (după ultima folosire), împreună cu metadatele lor, până sub limită;
+    # `keep` = fișierul abia scris, pe care apelantul urmează să-l servească
+    global _disk_bytes
+    files = []
+    recent = time.time() - _EVICT_GRACE_S
+    for p in Path(TTS_CACHE_DIR).glob("*/*"):
+        if p.suffix == ".json" or ".tmp." in p.name or p == keep:
+            continue
+        try:
+            st = p.stat()
+        except OSError:
+            continue
+        files.append((st.st_mtime, st.st_size, p))
+    files.sort()
+    total = sum(f[1] for f in files) + keep.stat().st_size
+    for mtime, size, p in files:
+        if total <= limit or mtime >= recent:
+            break
+        try:
+            # audio întâi: cât timp metadatele există, get() verifică și fișierul audio
+            p.unlink()
+            p.with_suffix(".json").unlink(missing_ok=True)
+        except OSError:
+            continue
+        total -= size
+        _stats["evictions"] += 1
+    _disk_bytes = total
+
+
+def put(key: str, fmt: str, tmp: Path, duration: float, truncated: bool) -> Path:
+    """Mută `tmp` (scris complet) la locul lui în cache și întoarce calea finală."""
+    global _disk_bytes
+    p = _path(key, fmt)
+    os.replace(tmp, p)   # atomic: un cititor vede fie fișierul vechi, fie pe cel complet
+    meta = p.with_suffix(".json")
+    meta_tmp = meta.with_name(f"{key}.{uuid.uuid4().hex}.tmp.json")
+    meta_tmp.write_text(json.dumps({"duration": float(duration), "truncated": bool(truncated),
+                                    "created": time.time()}), encoding="utf-8")
+    os.replace(meta_tmp, meta)   # metadatele apar ultimele: get() nu găsește niciodată audio incomplet
+    limit = int(TTS_CACHE_MB * 1024 * 1024)
+    with _lock:
+        _stats["writes"] += 1
+        if _disk_bytes is None:
+            _disk_bytes = _scan_disk()
+        else:
+            _disk_bytes += p.stat().st_size
+        if _disk_bytes > limit:
+            _evict(int(limit * 0.9), keep=p)   # histerezis: nu evacuăm la fiecare scriere
+    return p
+
+
+def cache_stats() -> dict:
+    with _lock:
+        return {
+            **_stats,
+            "disk_bytes": _disk_bytes if _disk_bytes is not None else -1,
+            "disk_limit_bytes": int(TTS_CACHE_MB * 1024 * 1024),
+        }
+
+
+metrics.register_stats("tts_cache", cache_stats)
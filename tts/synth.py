@@ -0,0 +1,293 @@
+# tts/synth.py
+# TTS (OpenAI tts-1 / offline pyttsx3) cu cache adresat după conținut (tts/cache.py):
+# același răspuns citit din nou, cu aceleași setări, e servit direct de pe disc, fără cost.
+# Cererile identice concurente împart o singură sinteză (single-flight).
+# Textul e împărțit pe fraze în bucăți sintetizate în paralel (prima, scurtă, poate fi redată imediat)
+# și lipite în ordine; limita de durată taie textul (durată estimată) înainte de sinteză, nu audio-ul după.
+from __future__ import annotations
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Optional
+import contextvars, re, shutil, uuid, wave
+
+from config import (
+    AUDIO_DIR, TTS_RATE, TTS_VOLUME,
+    TTS_CHUNK_CHARS, TTS_FIRST_CHUNK_CHARS, TTS_PARALLEL, TTS_OPENAI_CHARS_PER_S,
+)
+from infra import metrics
+from infra.singleflight import SingleFlight
+from tts import cache as tts_cache
+
+if TYPE_CHECKING:
+    from openai import OpenAI
+
+_flight = SingleFlight("tts")
+# limită per proces pentru apelurile tts-1 simultane (toate cererile împart pool-ul)
+_pool = ThreadPoolExecutor(max_workers=max(1, TTS_PARALLEL), thread_name_prefix="tts")
+
+_SENTENCE_END = re.compile(r"(?<=[.!?…;:])\s+|\n+")
+
+# on_chunk(idx, total, cale): bucata idx e gata (apelat în ordine, din firul apelantului)
+ChunkCallback = Callable[[int, int, Path], None]
+
+
+def split_sentences(text: str) -> list[str]:
+    return [s.strip() for s in _SENTENCE_END.split(text or "") if s and s.strip()]
+
+
+def estimate_seconds(text: str, engine: str, rate: int = TTS_RATE) -> float:
+    """Durata estimată a vorbirii: tts-1 după caractere/secundă, pyttsx3 după viteză (cuvinte/minut)."""
+    if engine == "openai":
+        return len(text) / max(1.0, TTS_OPENAI_CHARS_PER_S)
+    return len(text.split()) * 60.0 / max(1, int(rate))
+
+
+def clip_text(text: str, engine: str, rate: int, max_seconds: int) -> tuple[str, bool]:
+    """Frazele care încap în max_seconds (estimat); (text, tăiat). O primă frază prea lungă e tăiată pe cuvinte."""
+    if not max_seconds or estimate_seconds(text, engine, rate) <= max_seconds:
+        return text, False
+    kept, used = [], 0.0
+    for s in split_sentences(text):
+        d = estimate_seconds(s + " ", engine, rate)
+        if used + d > max_seconds:
+            if not kept:
+                words: list[str] = []
+                for w in s.split():
+                    if estimate_seconds(" ".join(words + [w]), engine, rate) > max_seconds:
+                        break
+                    words.append(w)
+                kept.append(" ".join(words))
+            break
+        kept.append(s)
+        used += d
+    return " ".join(kept).strip(), True
+
+
+def plan_chunks(text: str, first_chars: int = TTS_FIRST_CHUNK_CHARS, max_chars: int = TTS_CHUNK_CHARS) -> list[str]:
+    """
+    Fraze grupate în bucăți de până la max_chars; prima bucată până la first_chars (pornire rapidă).
+    O frază mai lungă decât bucata (sau text fără punctuație) e tăiată pe cuvinte; un singur cuvânt rămâne întreg.
+    """
+    chunks: list[str] = []
+    cur = ""
+    limit = lambda: first_chars if not chunks else max_chars
+    for s in split_sentences(text):
+        if cur and len(cur) + 1 + len(s) > limit():
+            chunks.append(cur)
+            cur = ""
+        if not cur and len(s) > limit():
+            for w in s.split():
+                if cur and len(cur) + 1 + len(w) > limit():
+                    chunks.append(cur)
+                    cur = w
+                else:
+                    cur = f"{cur} {w}" if cur else w
+            continue
+        cur = f"{cur} {s}" if cur else s
+    if cur:
+        chunks.append(cur)
+    return chunks
+
+
+def _openai_to_file(text: str, voice: str, fmt: str, out_path: Path, client: "OpenAI") -> None:
+    """TTS OpenAI (tts-1). Prefer streaming; fallback la .create()."""
+    with metrics.stage("tts_openai"):
+        try:
+            with client.audio.speech.with_streaming_response.create(
+                model="tts-1",
+                voice=voice,
+                response_format=fmt,
+                input=text,
+            ) as resp:
+                resp.stream_to_file(out_path)
+        except Exception:
+            resp = client.audio.speech.create(model="tts-1", voice=voice, input=text, response_format=fmt)
+            if hasattr(resp, "stream_to_file"):
+                resp.stream_to_file(out_path)
+            else:
+                data = getattr(resp, "read", lambda: None)() or getattr(resp, "content", None)
+                if not data:
+                    raise RuntimeError("TTS: răspuns neașteptat, fără bytes.")
+                out_path.write_bytes(data)
+    metrics.record_cost("tts", "tts-1", metrics.tts_cost("tts-1", len(text or "")))
+
+
+def _pyttsx3_to_file(text: str, rate: int, vol: float, out_path: Path) -> None:
+    """TTS offline (pyttsx3) -> .wav"""
+    try:
+        import pyttsx3
+    except ImportError:
+        raise RuntimeError("Lipsește `pyttsx3`. Instalează: `pip install pyttsx3`.") from None
+    with metrics.stage("tts_offline"):
+        eng = pyttsx3.init()
+        eng.setProperty("rate", int(rate))
+        eng.setProperty("volume", float(vol))
+        eng.save_to_file(text, str(out_path))
+        eng.runAndWait()
+
+
+def _strip_id3(data: bytes) -> bytes:
+    # tag ID3v2 la început: 10 octeți antet + dimensiune „syncsafe” (7 biți / octet)
+    if len(data) < 10 or data[:3] != b"ID3":
+        return data
+    size = (data[6] << 21) | (data[7] << 14) | (data[8] << 7) | data[9]
+    return data[10 + size:]
+
+
+def _wav_seconds(path: Path) -> Optional[float]:
+    try:
+        with wave.open(str(path), "rb") as w:
+            return w.getnframes() / float(w.getframerate())
+    except (OSError, EOFError, wave.Error):
+        return None
+
+
+# kbps după indexul din antetul cadrului, Layer III: MPEG-1 / MPEG-2 și 2.5
+_MP3_KBPS = {
+    3: (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),
+    2: (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+}
+
+
+def _mp3_seconds(path: Path) -> Optional[float]:
+    # tts-1 scrie mp3 cu bitrate constant: durata = octeți audio / bitrate din primul cadru
+    try:
+        data = _strip_id3(path.read_bytes())
+    except OSError:
+        return None
+    i = data.find(b"\xff")
+    while 0 <= i < len(data) - 3:
+        b1, b2 = data[i + 1], data[i + 2]
+        if b1 & 0xE0 == 0xE0 and (b1 >> 1) & 3 == 1:   # sincronizare + Layer III
+            kbps = _MP3_KBPS[3 if (b1 >> 3) & 3 == 3 else 2][b2 >> 4] if b2 >> 4 != 15 else 0
+            return (len(data) - i) * 8 / (kbps * 1000.0) if kbps else None
+        i = data.find(b"\xff", i + 1)
+    return None
+
+
+def audio_seconds(path: Path) -> Optional[float]:
+    """Durata unui fișier audio sintetizat: exactă pentru wav, din bitrate pentru mp3; None dacă nu se poate citi."""
+    return _wav_seconds(path) if path.suffix.lower() == ".wav" else _mp3_seconds(path)
+
+
+def _concat(parts: list[Path], fmt: str, out_path: Path) -> Optional[float]:
+    """Lipește bucățile în ordine, fără re-codare; durata exactă pentru wav, None pentru mp3."""
+    if fmt == "wav":
+        frames = 0
+        with wave.open(str(out_path), "wb") as out:
+            for i, p in enumerate(parts):
+                with wave.open(str(p), "rb") as w:
+                    if i == 0:
+                        out.setparams(w.getparams())
+                    n = w.getnframes()
+                    out.writeframes(w.readframes(n))
+                    frames += n
+            return frames / float(out.getframerate())
+    # mp3 = șir de cadre independente: octeții concatenați formează un mp3 valid
+    with open(out_path, "wb") as out:
+        for i, p in enumerate(parts):
+            data = p.read_bytes()
+            out.write(data if i == 0 else _strip_id3(data))
+    return None
+
+
+def _params(engine: str, voice: str, fmt: str, rate: int, vol: float) -> tuple[str, dict]:
+    # formatul efectiv + parametrii care intră în cheie (restul nu schimbă audio-ul motorului)
+    if engine == "openai":
+        return fmt, {"voice": voice, "format": fmt}
+    return "wav", {"rate": int(rate), "volume": round(float(vol), 2)}
+
+
+def _produce(text: str, engine: str, voice: str, fmt: str, rate: int, vol: float, client: Optional["OpenAI"],
+             key: Optional[str], on_chunk: Optional[ChunkCallback]) -> tuple[Path, float]:
+    if key is not None:
+        work = tts_cache.tmp_path(key, fmt)
+    else:
+        out_dir = Path(AUDIO_DIR); out_dir.mkdir(parents=True, exist_ok=True)
+        work = out_dir / f"tts_{uuid.uuid4().hex}.{fmt}"   # fără cache: nume unic, curățat de UI după o oră
+    parts_dir = work.with_name(f"parts.{work.name}")
+    parts_dir.mkdir(parents=True, exist_ok=True)
+    chunks = plan_chunks(text) or [text]
+    parts = [parts_dir / f"{i:03d}.{fmt}" for i in range(len(chunks))]
+
+    if engine == "openai" and client is None:
+        from infra.clients import openai_client
+        client = openai_client()
+
+    def one(i: int) -> Path:
+        if engine == "openai":
+            _openai_to_file(chunks[i], voice, fmt, parts[i], client)
+        else:
+            _pyttsx3_to_file(chunks[i], rate, vol, parts[i])
+        return parts[i]
+
+    futures = []
+    try:
+        with metrics.stage("tts_synth"):
+            if engine == "openai":
+                # tts-1: bucățile pleacă în paralel (limitat de _pool) și sunt consumate în ordine
+                futures = [_pool.submit(contextvars.copy_context().run, one, i) for i in range(len(chunks))]
+                ready = (f.result() for f in futures)
+            else:
+                # pyttsx3: un singur motor per proces, nesigur între thread-uri -> bucăți una după alta
+                ready = (one(i) for i in range(len(chunks)))
+            for i, p in enumerate(ready):
+                if on_chunk is not None:
+                    on_chunk(i, len(chunks), p)
+            if len(parts) == 1:
+                parts[0].replace(work)
+                exact = _wav_seconds(work) if fmt == "wav" else None
+            else:
+                exact = _concat(parts, fmt, work)
+        dur = exact if exact is not None else round(estimate_seconds(text, engine, rate), 1)
+        if key is None:
+            return work, dur
+        return tts_cache.put(key, fmt, work, dur, False), dur
+    except BaseException:
+        for f in futures:
+            f.cancel()
+        if key is not None:
+            work.unlink(missing_ok=True)
+        raise
+    finally:
+        shutil.rmtree(parts_dir, ignore_errors=True)
+
+
+def synthesize(
+    text: str,
+    engine: str = "openai",
+    voice: str = "alloy",
+    fmt: str = "mp3",
+    rate: int = TTS_RATE,
+    vol: float = TTS_VOLUME,
+    max_seconds: int = 150,
+    client: Optional["OpenAI"] = None,
+    use_cache: bool = True,
+    on_chunk: Optional[ChunkCallback] = None,
+) -> tuple[Path, float, bool]:
+    """
+    Text -> fișier audio: (cale, durată_secunde, tăiat la max_seconds).
+    engine: "openai" (tts-1, voce + format) | "offline" (pyttsx3, viteză + volum, mereu .wav).
+    Peste max_seconds (durată estimată), textul e scurtat la ultima frază care încape, înainte de sinteză.
+    `on_chunk` primește bucățile pe măsură ce sunt gata (redare timpurie); nu e apelat la cache hit.
+    """
+    if engine not in {"openai", "offline"}:
+        raise ValueError(f"engine TTS necunoscut: {engine!r}")
+    fmt, params = _params(engine, voice, fmt, rate, vol)
+    text, truncated = clip_text((text or "").strip(), engine, rate, max_seconds)
+    if not text:
+        raise ValueError("Text gol: nu am ce citi.")
+    if not (use_cache and tts_cache.enabled()):
+        path, dur = _produce(text, engine, voice, fmt, rate, vol, client, None, on_chunk)
+        return path, dur, truncated
+    # textul e deja scurtat la limită: cheia depinde doar de ce se sintetizează
+    key = tts_cache.make_key(engine, text, **params)
+    hit = tts_cache.get(key, fmt)
+    if hit is None:
+        path, dur = _flight.do(key, _produce, text, engine, voice, fmt, rate, vol, client, key, on_chunk)
+    else:
+        path, dur, _ = hit
+    return path, dur, truncated
+
+
+metrics.register_stats("tts_singleflight", _flight.stats)
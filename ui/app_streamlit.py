@@ -2,7 +2,7 @@
 # -*- coding: utf-8 -*-
 # Smart Librarian — Streamlit UI (RAG + Tool + TTS + STT + AI Images) cu dovezi RAG
 
-import os, sys, time, re
+import os, sys, time
 from pathlib import Path
 
 # --- permite importuri din rădăcina proiectului când rulăm din /ui ---
@@ -34,13 +34,23 @@ import config as CFG
 
 # ---- Config & defaults ------------------------------------------------------
 PERSIST_DIR     = CFG.PERSIST_DIR
-OPENAI_API_KEY  = CFG.OPENAI_API_KEY
+OPENAI_API_KEY  = CFG.require_openai_key()
 
 TTS_MODE_DEFAULT   = getattr(CFG, "TTS_MODE", "off")   # openai | offline | off
 TTS_VOICE_DEFAULT  = getattr(CFG, "TTS_VOICE", "alloy")
 TTS_FORMAT_DEFAULT = getattr(CFG, "TTS_FORMAT", "mp3") # mp3 | wav
 TTS_RATE_DEFAULT   = int(getattr(CFG, "TTS_RATE", 170))
 TTS_VOL_DEFAULT    = float(getattr(CFG, "TTS_VOLUME", 0.8))
+MAX_SECS_DEFAULT   = int(getattr(CFG, "STT_MAX_SECONDS_UI", 150))   # API-ul are limita lui (STT_MAX_SECONDS_API)
+TTS_ENGINES = {
+    "OpenAI tts-1 (plătit)": "openai",
+    "Offline pyttsx3 (gratuit)": "offline",
+}
+STT_ENGINES = {
+    "Offline (0$)": "offline",
+    "OpenAI gpt-4o-mini-transcribe (plătit)": "openai",
+    "Cursă offline / OpenAI (primul rezultat bun)": "race",
+}
 
 AUDIO_DIR = os.getenv(
     "AUDIO_DIR",
@@ -49,16 +59,21 @@ AUDIO_DIR = os.getenv(
 
 # ---- RAG & Chat -------------------------------------------------------------
 from rag.embed_store import load_summaries, init_vector_store
-from rag.retriever import debug_candidates, semantic_search
-from chatbot import chat
+from chatbot import chat_result
+from infra import metrics
 
 # ---- STT (upload + offline/online) -----------------------------------------
+from stt import whisper_pool
+from stt.audio import decode_audio
 from stt.transcribe import (
     transcribe_file,
+    cached_transcript,
     SUPPORTED_AUDIO_TYPES,
-    audio_duration_seconds,
 )
 
+# ---- TTS (openai / offline, cu cache de fișiere audio) ----------------------
+from tts.synth import audio_seconds, synthesize
+
 # ---- OpenAI client (TTS / Images / STT online) -----------------------------
 client = OpenAI(api_key=OPENAI_API_KEY)
 
@@ -81,66 +96,6 @@ st.caption(
 )
 
 # ---- utils -----------------------------------------------------------------
-def guess_title_from_answer(answer: str, known_titles: list[str] | None = None) -> str | None:
-    """
-    Extrage titlul recomandat din răspunsul asistentului.
-    Prioritate:
-    1) linia cu „Îți recomand …”
-    2) primul element din „Top potriviri (RAG)”
-    3) orice titlu 'quoted'
-    4) fallback: cel mai devreme match din known_titles
-    """
-    if not answer:
-        return None
-    txt = answer.strip()
-
-    # 1) „Îți recomand …”
-    patterns = [
-        r"Îți recomand[^:\n]*:\s*\*\*(.+?)\*\*",
-        r"Îți recomand[^\n]*?[„\"]\s*([^„”\"\n]+?)\s*[”\"]",
-        r"Recomandare[^:\n]*:\s*\*\*(.+?)\*\*",
-        r"Recomand[^\n]*?[„\"]\s*([^„”\"\n]+?)\s*[”\"]",
-    ]
-    for pat in patterns:
-        m = re.search(pat, txt, flags=re.IGNORECASE)
-        if m:
-            return m.group(1).strip()
-
-    # 2) Top potriviri: primul item
-    m = re.search(r"Top\s+potriviri.*?\n\s*1\.\s*([^\n·]+)", txt, flags=re.IGNORECASE | re.DOTALL)
-    if m:
-        return m.group(1).strip(" .")
-
-    # 3) quoted fallback
-    m = re.search(r"[„\"]\s*([^„”\"\n]+?)\s*[”\"]", txt)
-    if m:
-        return m.group(1).strip()
-
-    # 4) earliest match din known_titles
-    if known_titles:
-        low = txt.lower()
-        matches = []
-        for t in known_titles:
-            t_str = (t if isinstance(t, str) else str(t)).strip()
-            if not t_str:
-                continue
-            idx = low.find(t_str.lower())
-            if idx != -1:
-                matches.append((idx, t_str))
-        if matches:
-            matches.sort(key=lambda x: x[0])
-            return matches[0][1]
-
-    return None
-
-
-def _time_debug_candidates(q: str, k: int):
-    t0 = time.perf_counter()
-    tops = list(debug_candidates(q, collection, top_k=k))
-    ms = (time.perf_counter() - t0) * 1000.0
-    return tops, ms
-
-
 @st.cache_resource(show_spinner=False)
 def get_known_titles() -> list[str]:
     try:
@@ -167,25 +122,6 @@ def fmt_seconds(s: float) -> str:
     return f"{m:02d}:{s:02d}"
 
 
-def measure_and_enforce_limit(audio_path: Path, fmt: str, max_seconds: int) -> tuple[Path, float, bool]:
-    """Măsoară durata (pydub). Taie la max_seconds dacă e nevoie."""
-    try:
-        from pydub import AudioSegment
-        from pydub.utils import which
-        AudioSegment.converter = which("ffmpeg") or "ffmpeg"
-        AudioSegment.ffprobe   = which("ffprobe") or "ffprobe"
-    except Exception:
-        return audio_path, -1.0, False
-    seg = AudioSegment.from_file(audio_path)
-    dur = len(seg) / 1000.0
-    if max_seconds and dur > max_seconds:
-        seg = seg[: max_seconds * 1000]
-        cut_path = audio_path.with_name(f"{audio_path.stem}_cut{audio_path.suffix}")
-        seg.export(cut_path, format=fmt.lower())
-        return cut_path, max_seconds, True
-    return audio_path, dur, False
-
-
 def cleanup_old_audio(folder: str, max_age_seconds: int = 3600):
     try:
         p = Path(folder)
@@ -203,64 +139,16 @@ def cleanup_old_audio(folder: str, max_age_seconds: int = 3600):
 
 cleanup_old_audio(AUDIO_DIR, max_age_seconds=3600)
 
-# ---- TTS helpers ------------------------------------------------------------
-def tts_openai_tts1(text: str, voice: str = "alloy", fmt: str = "mp3", max_seconds: int = 150) -> tuple[Path, float, bool]:
-    """TTS OpenAI (tts-1). Prefer streaming; fallback la .create()."""
-    out_dir = Path(AUDIO_DIR); out_dir.mkdir(parents=True, exist_ok=True)
-    out_path = out_dir / f"tts1_{int(time.time())}.{fmt}"
 
-    try:
-        with client.audio.speech.with_streaming_response.create(
-            model="tts-1",
-            voice=voice,
-            response_format=fmt,
-            input=text,
-        ) as resp:
-            resp.stream_to_file(out_path)
-    except Exception:
-        try:
-            resp = client.audio.speech.create(model="tts-1", voice=voice, input=text, response_format=fmt)
-        except TypeError as e:
-            if "format" in str(e):
-                resp = client.audio.speech.create(model="tts-1", voice=voice, input=text, response_format=fmt)
-            else:
-                raise
-        if hasattr(resp, "stream_to_file"):
-            resp.stream_to_file(out_path)
-        else:
-            data = getattr(resp, "read", lambda: None)() or getattr(resp, "content", None)
-            if not data:
-                raise RuntimeError("TTS: răspuns neașteptat, fără bytes.")
-            out_path.write_bytes(data)
-
-    return measure_and_enforce_limit(out_path, fmt, max_seconds)
-
-
-def tts_offline_pyttsx3(text: str, rate: int = 170, vol: float = 0.8, max_seconds: int = 150) -> tuple[Path | None, float, bool]:
-    """TTS offline (pyttsx3) -> .wav"""
-    try:
-        import pyttsx3
-    except ImportError:
-        st.error("Lipsește `pyttsx3`. Instalează: `pip install pyttsx3`.")
-        return None, -1.0, False
-    out_dir = Path(AUDIO_DIR); out_dir.mkdir(parents=True, exist_ok=True)
-    out_path = out_dir / f"pyttsx3_{int(time.time())}.wav"
-    eng = pyttsx3.init()
-    eng.setProperty("rate", int(rate))
-    eng.setProperty("volume", float(vol))
-    eng.save_to_file(text, str(out_path))
-    eng.runAndWait()
-    return measure_and_enforce_limit(out_path, "wav", max_seconds)
-
-
-def render_audio(path: Path, duration_sec: float, was_truncated: bool):
+def render_audio(path: Path, duration_sec: float, was_truncated: bool, resume_s: int = 0):
+    # resume_s > 0: playerul înlocuiește redarea timpurie și continuă de unde a rămas
     if not path or not Path(path).exists():
         return
     mime = "audio/mpeg" if path.suffix.lower() == ".mp3" else "audio/wav"
     info = " (tăiat la limită)" if was_truncated else ""
     if duration_sec >= 0:
         st.caption(f"⏱️ Durată audio: {fmt_seconds(duration_sec)}{info}")
-    st.audio(str(path), format=mime)
+    st.audio(str(path), format=mime, start_time=resume_s, autoplay=resume_s > 0)
     with open(path, "rb") as f:
         st.download_button("⬇️ Descarcă audio", data=f, file_name=path.name, mime=mime, key="download_audio_btn")
 
@@ -274,6 +162,25 @@ def bootstrap_collection():
 
 collection, n_books = bootstrap_collection()
 
+# modelele STT offline (FWHISPER_PRELOAD) se încarcă în fundal, o dată per proces
+@st.cache_resource(show_spinner=False)
+def preload_whisper_models():
+    import threading
+    sizes = whisper_pool.preload_sizes()
+    if sizes:
+        threading.Thread(target=whisper_pool.warm_up, args=(sizes,), name="whisper-warm-up", daemon=True).start()
+    return sizes
+
+preload_whisper_models()
+
+# etapele STT / TTS din acest proces nu trec prin API: le expunem pe un /metrics propriu (UI_METRICS_PORT)
+@st.cache_resource(show_spinner=False)
+def start_metrics_endpoint() -> bool:
+    port = getattr(CFG, "UI_METRICS_PORT", 0)
+    return bool(port and CFG.METRICS_ENABLED and metrics.serve(port))
+
+start_metrics_endpoint()
+
 # ---- Session state ----------------------------------------------------------
 for key, default in [
     ("last_answer", ""),
@@ -282,7 +189,6 @@ for key, default in [
     ("last_audio_trunc", False),
     ("query_last", ""),
     ("last_title_auto", None),
-    ("known_titles_cache", None),
 ]:
     if key not in st.session_state:
         st.session_state[key] = default
@@ -310,11 +216,11 @@ with st.sidebar:
     st.selectbox("Format audio (tts-1)", ["mp3", "wav"], index=0 if TTS_FORMAT_DEFAULT == "mp3" else 1, key="audiofmt_sel")
     st.slider("Viteză (pyttsx3)", 100, 250, TTS_RATE_DEFAULT, key="tts_rate_slider")
     st.slider("Volum (pyttsx3)", 0.1, 1.0, float(TTS_VOL_DEFAULT), key="tts_vol_slider")
-    st.slider("Limită durată audio (sec)", 10, 300, 150, key="maxsecs_slider")
+    st.slider("Limită durată audio (sec)", 10, max(300, MAX_SECS_DEFAULT), MAX_SECS_DEFAULT, key="maxsecs_slider")
 
     st.markdown("---")
     st.subheader("🎙️ Speech-to-Text (manual)")
-    st.radio("Motor STT", ["Offline (0$)", "OpenAI gpt-4o-mini-transcribe (plătit)"], index=0, key="stt_choice_radio")
+    st.radio("Motor STT", list(STT_ENGINES), index=0, key="stt_choice_radio")
     stt_lang = st.selectbox(
     "Limba audio",
     ["auto", "ro", "en", "fr", "de", "es", "it", "pt"],
@@ -339,9 +245,13 @@ def run_recommendation(q: str):
         return
 
     try:
-        # Debug RAG (opțional)
+        # Răspunsul de recomandare (Top-K, dovezi și titlul vin în același rezultat)
+        with st.spinner("Gândesc o recomandare..."):
+            res = chat_result(q, collection, top_k=st.session_state.get("topk_slider", 5))
+
+        # Debug RAG (opțional) — fără re-interogarea vector store-ului
         if st.session_state.get("show_debug_chk"):
-            tops, rag_ms = _time_debug_candidates(q, st.session_state.get("topk_slider", 5))
+            tops, rag_ms = res.topk, res.timings.get("retrieval", 0.0)
             with st.expander(f"🔎 RAG (Top-{len(tops)}) • {rag_ms:.0f} ms", expanded=False):
                 st.caption(f"🔧 Caut semantic ca: `{q}`")
                 try:
@@ -386,7 +296,7 @@ def run_recommendation(q: str):
                     )
 
             # Snippete semantice pentru Top-K
-            ev = semantic_search(q, collection, top_k=st.session_state.get("topk_slider", 5))
+            ev = res.evidence
             with st.expander("🧭 Dovezi RAG (snippete pentru Top-K)", expanded=False):
                 if not ev:
                     st.caption("Nu am putut extrage snippete (colecție goală sau eroare).")
@@ -394,9 +304,7 @@ def run_recommendation(q: str):
                     for i, e in enumerate(ev, 1):
                         st.markdown(f"**{i}. {e['title']}** · dist: `{e['distance']:.4f}`\n\n> {e['snippet']}")
 
-        # Răspunsul de recomandare
-        with st.spinner("Gândesc o recomandare..."):
-            answer = chat(q, collection)
+        answer = res.answer_markdown
 
         # Persistă răspunsul + reset audio
         st.session_state["last_answer"] = answer
@@ -405,16 +313,8 @@ def run_recommendation(q: str):
         st.session_state["last_audio_trunc"] = False
         st.session_state["query_last"] = q
 
-        # Titluri cunoscute – cache în sesiune
-        known = st.session_state.get("known_titles_cache")
-        if not isinstance(known, list) or not known:
-            raw = get_known_titles()
-            known = [t.strip() for t in raw if isinstance(t, str) and t and t.strip()]
-            st.session_state["known_titles_cache"] = known
-
-        # Extrage titlul și îl „îngheață” pentru secțiunea de imagini
-        title = guess_title_from_answer(answer, known_titles=known)
-        st.session_state["last_title_auto"] = title
+        # Titlul ales vine direct din rezultat; îl „îngheață” pentru secțiunea de imagini
+        st.session_state["last_title_auto"] = res.title
 
     except Exception as e:
         st.error(f"Eroare: {e}")
@@ -433,35 +333,37 @@ if submitted:
     run_recommendation(st.session_state.get("query_text", ""))
 
 # ---- STT: încarcă fișier și întreabă ---------------------------------------
-st.markdown("### 🎙️ Transcrie un fișier audio (≤ 2:30)")
+st.markdown(f"### 🎙️ Transcrie un fișier audio (≤ {MAX_SECS_DEFAULT // 60}:{MAX_SECS_DEFAULT % 60:02d})")
 audio_file = st.file_uploader("Încarcă .mp3 / .wav / .m4a / .ogg", type=list(SUPPORTED_AUDIO_TYPES), key="uploader_audio")
 
-def _save_uploaded(tmp_dir: Path, file) -> Path:
-    tmp_dir.mkdir(parents=True, exist_ok=True)
-    p = tmp_dir / f"upload_{int(time.time())}_{file.name}"
-    with open(p, "wb") as f:
-        f.write(file.read())
-    return p
-
 if st.button("📝 Transcrie & întreabă", key="stt_btn", disabled=audio_file is None):
     if audio_file is None:
         st.warning("Încarcă un fișier audio.")
     else:
-        tmp_dir = Path(AUDIO_DIR) / "uploads"
-        path = _save_uploaded(tmp_dir, audio_file)
-        dur = audio_duration_seconds(path)
-        if dur > st.session_state.get("maxsecs_slider", 150):
-            st.error(f"Fișier prea lung: ~{int(dur)}s. Limita este {st.session_state.get('maxsecs_slider', 150)}s.")
-        else:
-            engine = "offline" if st.session_state.get("stt_choice_radio","Offline").startswith("Offline") else "openai"
+        engine = STT_ENGINES.get(st.session_state.get("stt_choice_radio"), "offline")
+        data = audio_file.getvalue()
+        # același fișier deja transcris -> din cache, fără decodare
+        cached = cached_transcript(data, engine, model="gpt-4o-mini-transcribe")
+        audio = None
+        if cached is None:
+            # decodare o singură dată, în memorie: durata și transcrierea folosesc același buffer
             try:
-                txt, real_dur = transcribe_file(path, engine, client=client, model="gpt-4o-mini-transcribe")
+                audio = decode_audio(data)
+            except Exception as e:
+                st.error(f"Nu pot decoda fișierul audio: {e}")
+        dur = cached[1] if cached is not None else (audio.duration if audio is not None else None)
+        if dur is not None and dur > st.session_state.get("maxsecs_slider", MAX_SECS_DEFAULT):
+            st.error(f"Fișier prea lung: ~{int(dur)}s. Limita este {st.session_state.get('maxsecs_slider', MAX_SECS_DEFAULT)}s.")
+        elif dur is not None:
+            try:
+                txt, real_dur = cached or transcribe_file(data, engine, client=client, model="gpt-4o-mini-transcribe", decoded=audio)
                 st.success(f"Transcriere (~{int(real_dur)}s) realizată.")
                 with st.expander("Text transcris"):
                     st.write(txt)
                 with st.spinner("Gândesc o recomandare..."):
-                    answer = chat(txt, collection)
-                st.session_state["last_answer"] = answer
+                    res = chat_result(txt, collection)
+                st.session_state["last_answer"] = res.answer_markdown
+                st.session_state["last_title_auto"] = res.title
                 st.session_state["last_audio_path"] = ""
                 st.session_state["last_audio_dur"] = -1.0
                 st.session_state["last_audio_trunc"] = False
@@ -490,29 +392,32 @@ else:
             wav_bytes = rec["bytes"]
 
     if wav_bytes:
-        tmp_dir = Path(AUDIO_DIR) / "mic"
-        tmp_dir.mkdir(parents=True, exist_ok=True)
-        wav_path = tmp_dir / f"mic_{int(time.time())}.wav"
-        wav_path.write_bytes(wav_bytes)
-
-        try:
-            dur = audio_duration_seconds(wav_path)
-        except Exception:
-            dur = -1
+        engine = STT_ENGINES.get(st.session_state.get("stt_choice_radio"), "offline")
+        stt_lang = st.session_state.get("stt_lang_sel", "ro")
+        cached = cached_transcript(wav_bytes, engine, model="gpt-4o-mini-transcribe", language=stt_lang)
+        audio = None
+        if cached is not None:
+            dur = cached[1]
+        else:
+            try:
+                audio = decode_audio(wav_bytes)
+                dur = audio.duration
+            except Exception:
+                dur = -1   # transcribe_file reîncearcă decodarea și raportează eroarea
 
-        max_secs = st.session_state.get("maxsecs_slider", 150)
+        max_secs = st.session_state.get("maxsecs_slider", MAX_SECS_DEFAULT)
         if dur != -1 and dur > max_secs:
             st.error(f"Înregistrarea are ~{int(dur)}s, limita este {max_secs}s.")
         else:
-            engine = "offline" if st.session_state.get("stt_choice_radio", "Offline").startswith("Offline") else "openai"
             try:
-                txt, real_dur = transcribe_file(wav_path, engine, client=client, model="gpt-4o-mini-transcribe", language=st.session_state.get("stt_lang_sel", "ro"))
+                txt, real_dur = cached or transcribe_file(wav_bytes, engine, client=client, model="gpt-4o-mini-transcribe", language=stt_lang, decoded=audio)
                 st.success(f"Transcriere (~{int(real_dur)}s) realizată din microfon.")
                 with st.expander("Text transcris (microfon)"):
                     st.write(txt)
                 with st.spinner("Gândesc o recomandare..."):
-                    answer = chat(txt, collection)
-                st.session_state["last_answer"] = answer
+                    res = chat_result(txt, collection)
+                st.session_state["last_answer"] = res.answer_markdown
+                st.session_state["last_title_auto"] = res.title
                 st.session_state["query_last"] = txt
                 st.session_state["last_audio_path"] = ""
                 st.session_state["last_audio_dur"] = -1.0
@@ -528,30 +433,42 @@ if st.session_state["last_answer"]:
         st.chat_message("user").write(last_q)
     st.chat_message("assistant").markdown(st.session_state["last_answer"])
 
+    resume_s = 0
     if st.button("🔈 Citește răspunsul", key="tts_btn"):
         try:
-            prev = st.session_state.get("last_audio_path")
-            if prev:
-                try:
-                    pprev = Path(prev)
-                    if pprev.exists():
-                        pprev.unlink()
-                except Exception:
-                    pass
-            if st.session_state.get("tts_choice_radio") == "OpenAI tts-1 (plătit)":
-                p, d, t = tts_openai_tts1(
+            # fișierele vin din cache-ul TTS (tts/cache.py): nu le ștergem, o nouă citire le refolosește
+            engine = TTS_ENGINES.get(st.session_state.get("tts_choice_radio"))
+            early = st.empty()
+            first: dict = {}
+
+            def play_first_chunk(idx: int, total: int, part: Path):
+                # răspuns lung: prima bucată pornește singură cât timp restul încă se sintetizează
+                if idx == 0 and total > 1:
+                    first.update(t0=time.monotonic(), secs=audio_seconds(part))
+                    with early.container():
+                        st.caption(f"▶️ Începutul răspunsului (încă {total - 1} bucăți în lucru)")
+                        st.audio(part.read_bytes(), format="audio/mpeg" if part.suffix == ".mp3" else "audio/wav",
+                                 autoplay=True)
+
+            if engine:
+                p, d, t = synthesize(
                     st.session_state["last_answer"],
+                    engine=engine,
                     voice=st.session_state.get("voice_input", TTS_VOICE_DEFAULT),
                     fmt=st.session_state.get("audiofmt_sel", "mp3"),
-                    max_seconds=st.session_state.get("maxsecs_slider", 150),
-                )
-            elif st.session_state.get("tts_choice_radio") == "Offline pyttsx3 (gratuit)":
-                p, d, t = tts_offline_pyttsx3(
-                    st.session_state["last_answer"],
                     rate=st.session_state.get("tts_rate_slider", TTS_RATE_DEFAULT),
                     vol=st.session_state.get("tts_vol_slider", TTS_VOL_DEFAULT),
-                    max_seconds=st.session_state.get("maxsecs_slider", 150),
+                    max_seconds=st.session_state.get("maxsecs_slider", MAX_SECS_DEFAULT),
+                    client=client,
+                    on_chunk=play_first_chunk,
                 )
+                if first:
+                    # fișierul complet ia locul primei bucăți, din punctul la care a ajuns redarea
+                    heard = time.monotonic() - first["t0"]
+                    if first["secs"] is not None:
+                        heard = min(heard, first["secs"])
+                    resume_s = int(heard)
+                    early.empty()
             else:
                 p, d, t = None, -1.0, False
             if p:
@@ -566,21 +483,18 @@ if st.session_state["last_answer"]:
             Path(st.session_state["last_audio_path"]),
             st.session_state["last_audio_dur"],
             st.session_state["last_audio_trunc"],
+            resume_s,
         )
 
 # === Imagini AI pentru recomandare (nu salvează pe disc) ====================
 st.markdown("### 🖼️ Imagine AI pentru recomandare")
 
-known_titles = get_known_titles()
+# titlul vine direct din ChatResult.title; None (refuz, mod degradat, fără potriviri) = titlu ales manual
 title_auto = st.session_state.get("last_title_auto")
 if not title_auto:
-    raw_known = st.session_state.get("known_titles_cache")
-    if not isinstance(raw_known, list) or not raw_known:
-        raw_known = get_known_titles()
-        raw_known = [t.strip() for t in raw_known if isinstance(t, str) and t and t.strip()]
-        st.session_state["known_titles_cache"] = raw_known
-    title_auto = guess_title_from_answer(st.session_state.get("last_answer", ""), known_titles=raw_known)
-    st.session_state["last_title_auto"] = title_auto
+    title_auto = st.selectbox(
+        "Titlu (răspunsul curent nu recomandă o carte)", [""] + get_known_titles(), key="img_title_manual",
+    ) or None
 
 colL, colR = st.columns([1, 1])
 with colL:
@@ -606,7 +520,7 @@ scene_text = st.text_area(
 disabled = not bool(title_auto)
 if st.button("🖼️ Generează imagine", key="img_generate_btn", disabled=disabled):
     if not title_auto:
-        st.error("❗ Nu am găsit automat titlul cărții în răspuns. Cere o recomandare mai întâi.")
+        st.error("❗ Alege un titlu sau cere o recomandare mai întâi.")
     else:
         try:
             with st.status("🎨 Generez imaginea...", expanded=True) as s:
@@ -639,7 +553,7 @@ if st.button("🖼️ Generează imagine", key="img_generate_btn", disabled=disa
             st.error(f"Eroare la generarea imaginii AI: {e}")
 else:
     if not title_auto:
-        st.info("ℹ️ Butonul este dezactivat până există un răspuns cu un titlu detectat.")
+        st.info("ℹ️ Butonul este dezactivat până există o recomandare sau un titlu ales.")
 
 st.markdown("---")
 st.caption("Smart Librarian — RAG + Tool • ChromaDB + OpenAI (mini chat models only) • Streamlit")